@@ -0,0 +1,99 @@
+# backend/benchmarks/bench_word_data.py
+# Microbenchmark: hydrating a 2,000-card list from raw JMdict JSON (old path)
+# vs. from the precomputed entries.word_data projection (new path).
+#
+#   python benchmarks/bench_word_data.py [--cards 2000] [--rounds 20]
+#
+# Uses synthetic JMdict-shaped entries so it runs without a database; it measures
+# the per-row Python work in services.flashcard_service, not the network transfer
+# (which shrinks by the same ratio as the payload sizes printed below).
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.search import _extract_word_schema_dict, _parse_word_json, _word_data_json, _word_from_columns  # noqa: E402
+
+_POS = ["n", "v1", "vt", "adj-i", "adj-na", "adv", "exp", "vs", "n-suf"]
+_WORDS = ["to eat", "food", "meal", "to live on", "rice", "dish", "to consume", "to bite", "cuisine", "snack"]
+
+
+def _fake_word(i: int) -> dict:
+    rnd = random.Random(i)
+    return {
+        "id": str(1000000 + i),
+        "kanji": [
+            {"common": rnd.random() < 0.5, "text": f"漢字{i}{k}", "tags": []}
+            for k in range(rnd.randint(1, 3))
+        ],
+        "kana": [
+            {"common": rnd.random() < 0.5, "text": f"かんじ{i}{k}", "tags": [], "appliesToKanji": ["*"]}
+            for k in range(rnd.randint(1, 3))
+        ],
+        "sense": [
+            {
+                "partOfSpeech": rnd.sample(_POS, 2),
+                "appliesToKanji": ["*"],
+                "appliesToKana": ["*"],
+                "related": [],
+                "antonym": [],
+                "field": [],
+                "dialect": [],
+                "misc": [],
+                "info": [],
+                "languageSource": [],
+                "gloss": [
+                    {"lang": "eng", "gender": None, "type": None, "text": rnd.choice(_WORDS)}
+                    for _ in range(rnd.randint(1, 4))
+                ],
+            }
+            for _ in range(rnd.randint(1, 5))
+        ],
+    }
+
+
+def _time(fn, rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="raw_json vs word_data hydration microbenchmark")
+    parser.add_argument("--cards", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    words = [_fake_word(i) for i in range(args.cards)]
+    raw_rows = [(w["id"], json.dumps(w, ensure_ascii=False)) for w in words]
+    compact_rows = [(w["id"], _word_data_json(w, entry_id=w["id"])) for w in words]
+
+    def old_path():
+        for entry_id, raw_json in raw_rows:
+            _extract_word_schema_dict(_parse_word_json(raw_json), entry_id=entry_id)
+
+    def new_path():
+        for entry_id, word_data in compact_rows:
+            _word_from_columns(entry_id, word_data, None)
+
+    old = _time(old_path, args.rounds)
+    new = _time(new_path, args.rounds)
+    raw_bytes = sum(len(r[1].encode("utf-8")) for r in raw_rows)
+    compact_bytes = sum(len(r[1].encode("utf-8")) for r in compact_rows)
+
+    print(f"{args.cards}-card list, median of {args.rounds} rounds")
+    print(f"  raw_json parse + extract: {statistics.median(old):8.2f} ms  ({raw_bytes / 1024:,.0f} KiB payload)")
+    print(f"  word_data parse:          {statistics.median(new):8.2f} ms  ({compact_bytes / 1024:,.0f} KiB payload)")
+    print(f"  speedup: {statistics.median(old) / statistics.median(new):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
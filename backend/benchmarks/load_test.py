@@ -0,0 +1,97 @@
+# backend/benchmarks/load_test.py
+# HTTP load test for the running API (needs `pip install httpx`).
+#
+#   uvicorn main:app --workers 1
+#   python benchmarks/load_test.py --concurrency 200 --duration 30
+#
+# Run once against the sync build and once against the async build to compare
+# req/s and p99 under the same mix of search / list / stats requests.
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/search?keyword=食べる",
+    "/api/search?keyword=eat",
+    "/api/search?keyword=する",
+    "/api/search?keyword=反抗的な態度",
+    "/api/lists",
+    "/api/stats/overview",
+    "/api/stats/heatmap",
+]
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+async def _worker(client: httpx.AsyncClient, paths: list[str], stop_at: float,
+                  latencies: list[float], errors: list[int]) -> None:
+    while time.perf_counter() < stop_at:
+        path = random.choice(paths)
+        started = time.perf_counter()
+        try:
+            resp = await client.get(path)
+            if resp.status_code >= 400:
+                errors.append(resp.status_code)
+        except httpx.HTTPError:
+            errors.append(0)
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(base_url: str, concurrency: int, duration: float, paths: list[str]) -> dict:
+    latencies: list[float] = []
+    errors: list[int] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        started = time.perf_counter()
+        stop_at = started + duration
+        await asyncio.gather(*[
+            _worker(client, paths, stop_at, latencies, errors) for _ in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        "base_url": base_url,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "requests": len(latencies),
+        "errors": len(errors),
+        "req_per_s": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2) if ordered else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent HTTP load test for the Gakuroku API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--path", action="append", help="request path (repeatable); defaults to a mixed set")
+    parser.add_argument("--json", action="store_true", help="print machine-readable result")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url, args.concurrency, args.duration, args.path or DEFAULT_PATHS))
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False))
+        return
+    print(f"{result['requests']} requests in {result['duration_s']}s "
+          f"({result['errors']} errors) at concurrency {result['concurrency']}")
+    print(f"  throughput: {result['req_per_s']} req/s")
+    print(f"  latency:    p50 {result['p50_ms']} ms | p95 {result['p95_ms']} ms | p99 {result['p99_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
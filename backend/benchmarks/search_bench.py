@@ -0,0 +1,308 @@
+# backend/benchmarks/search_bench.py
+# Search latency benchmark: replays a fixed query corpus against each search
+# engine and reports p50 / p95 / p99 latency and QPS per query class.
+#
+#   python benchmarks/search_bench.py [--file jmdict-eng-common-3.6.1.json] [--entries 20000]
+#   python benchmarks/search_bench.py --engine memory --engine sqlite --json --out before.json
+#
+# The dictionary is a fixed subset of the JMdict JSON: its first --entries words
+# plus every word spelled like a headword in vocab_json/n1-n5.json, so the JLPT
+# queries find their words whatever the subset size. The memory, snapshot and
+# sqlite engines are built from it in a temp directory. mysql searches the
+# configured database as it is; --load-mysql first imports the subset into it
+# (this replaces the dictionary there).
+#
+# Query classes (--queries per class, fixed --seed):
+#   kanji     JLPT headwords with kanji (毎朝)
+#   kana      their readings, and kana-only headwords (まいあさ)
+#   romaji    their romaji as written in the word lists (maiasa, dōkan)
+#   english   the first meaning of each word (every morning)
+#   sentence  text starting with a headword (毎朝は問題です)
+#   miss      keywords no entry matches
+#
+# Queries run one at a time, without the search cache. QPS is single-threaded
+# throughput: calls / total time spent in search.
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from import_task import INPUT_FILE, _build_rows, iter_word_texts, run_import, run_sqlite_export  # noqa: E402
+from services.dictionary_index import DictionaryIndex  # noqa: E402
+from services.search_cache import normalize_keyword  # noqa: E402
+
+VOCAB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "vocab_json")
+ENGINES = ["memory", "snapshot", "sqlite", "mysql"]
+QUERY_CLASSES = ["kanji", "kana", "romaji", "english", "sentence", "miss"]
+
+_PARTICLES = ["は", "が", "を", "に", "で", "の", "と", "も"]
+_ENDINGS = ["です", "でした", "だ", "ます", "ですか"]
+_HIRAGANA = "ぁぃぅぇぉゎゐゑゔゕゖ"
+
+
+# --- query corpus ---
+
+def _alternatives(text: str) -> list[str]:
+    """'アイデア / アイディア' -> both spellings; 'お・金持ち' -> 'お金持ち'."""
+    return [part.strip().replace("・", "") for part in (text or "").split("/") if part.strip()]
+
+
+def _first_meaning(meaning: str) -> str:
+    """'1.  windmill; 2.  pinwheel' -> 'windmill'; 'but, however' -> 'but'."""
+    first = re.split(r"[;,]", meaning or "")[0]
+    first = re.sub(r"^\s*\d+\.\s*", "", first)
+    first = re.sub(r"\([^)]*\)", "", first)
+    return " ".join(first.split())
+
+
+def load_vocab(vocab_dir: str = VOCAB_DIR) -> list[dict]:
+    vocab: list[dict] = []
+    for level in range(1, 6):
+        with open(os.path.join(vocab_dir, f"n{level}.json"), encoding="utf-8") as f:
+            vocab.extend(json.load(f))
+    return vocab
+
+
+def vocab_headwords(vocab: list[dict]) -> set[str]:
+    """Every spelling and reading in the word lists, for picking the JMdict subset."""
+    forms: set[str] = set()
+    for item in vocab:
+        forms.update(_alternatives(item.get("word")))
+        forms.update(_alternatives(item.get("furigana")))
+    return forms
+
+
+def build_corpus(vocab: list[dict], per_class: int, seed: int) -> dict[str, list[str]]:
+    rnd = random.Random(seed)
+    kanji: list[str] = []
+    kana: list[str] = []
+    romaji: list[str] = []
+    english: list[str] = []
+    for item in vocab:
+        words = _alternatives(item.get("word"))
+        readings = _alternatives(item.get("furigana"))
+        if readings:
+            kanji.extend(words[:1])
+            kana.extend(readings[:1])
+        else:
+            kana.extend(words[:1])
+        romaji.extend(_alternatives(item.get("romaji"))[:1])
+        meaning = _first_meaning(item.get("meaning"))
+        if meaning:
+            english.append(meaning)
+
+    def sample(pool: list[str]) -> list[str]:
+        pool = sorted(set(pool))
+        return rnd.sample(pool, min(per_class, len(pool)))
+
+    corpus = {
+        "kanji": sample(kanji),
+        "kana": sample(kana),
+        "romaji": sample(romaji),
+        "english": sample(english),
+    }
+    corpus["sentence"] = [
+        f"{rnd.choice(kanji)}{rnd.choice(_PARTICLES)}{rnd.choice(kanji)}{rnd.choice(_ENDINGS)}"
+        for _ in range(per_class)
+    ]
+    corpus["miss"] = [
+        "zqx" + "".join(rnd.choice("bcdfgjklqvwxz") for _ in range(5)) if i % 2 == 0
+        else "".join(rnd.choice(_HIRAGANA) for _ in range(4))
+        for i in range(per_class)
+    ]
+    return corpus
+
+
+# --- dictionary subset and engines ---
+
+def write_subset(path: str, out_path: str, entries: int, headwords: set[str]) -> int:
+    """The first `entries` words of the JMdict JSON plus those spelled like a JLPT headword."""
+    count = 0
+    with open(out_path, "w", encoding="utf-8") as out:
+        out.write('{"words": [\n')
+        for i, text in enumerate(iter_word_texts(path)):
+            if i >= entries:
+                word = json.loads(text)
+                forms = {k.get("text") for k in (word.get("kanji") or []) + (word.get("kana") or [])}
+                if not forms & headwords:
+                    continue
+            out.write(",\n" if count else "")
+            out.write(text)
+            count += 1
+        out.write("\n]}\n")
+    return count
+
+
+def build_memory_index(subset_path: str) -> DictionaryIndex:
+    batch = _build_rows(list(iter_word_texts(subset_path)))
+    gloss = dict(batch.defs)
+    entries = [
+        (w_id, headword, gloss.get(w_id, ""), json.loads(word_data))
+        for w_id, headword, _, word_data, _ in batch.entries
+    ]
+    return DictionaryIndex.build(
+        entries,
+        batch.kanji,
+        [(w_id, txt) for w_id, txt, _ in batch.reading],
+    )
+
+
+def _mysql_search():
+    from db_config import get_connection
+    from services.search import _gloss_index_ready, _rows_to_words, _search_query
+
+    def search(keyword: str, limit: int) -> list:
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(*_search_query(keyword, limit, gloss_index=_gloss_index_ready(cursor)))
+            return _rows_to_words(cursor.fetchall())
+        finally:
+            cursor.close()
+            conn.close()
+
+    return search
+
+
+def prepare_engine(engine: str, subset_path: str, workdir: str, load_mysql: bool):
+    """Return the engine's search(keyword, limit) function."""
+    if engine == "memory":
+        return build_memory_index(subset_path).search
+    if engine == "snapshot":
+        from services.dictionary_snapshot import Snapshot, write_snapshot
+
+        path = os.path.join(workdir, "dictionary.snapshot")
+        write_snapshot(build_memory_index(subset_path), path, "bench")
+        return Snapshot(path).index().search
+    if engine == "sqlite":
+        from services.sqlite_dictionary import SqliteDictionary
+
+        path = os.path.join(workdir, "jmdict.sqlite3")
+        run_sqlite_export(subset_path, path)
+        return SqliteDictionary(path).search
+    if engine == "mysql":
+        if load_mysql:
+            run_import(subset_path)
+        return _mysql_search()
+    raise ValueError(f"unknown engine {engine!r}")
+
+
+# --- measuring ---
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def _summary(latencies: list[float], hits: int, queries: int) -> dict:
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        "queries": queries,
+        "calls": len(ordered),
+        "hit_rate": round(hits / queries, 3) if queries else 0.0,
+        "qps": round(len(ordered) / total, 1) if total > 0 else 0.0,
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3) if ordered else 0.0,
+    }
+
+
+def run_engine(search, corpus: dict[str, list[str]], limit: int, rounds: int, warmup: int) -> dict:
+    classes: dict[str, dict] = {}
+    everything: list[float] = []
+    all_hits = all_queries = 0
+    for name, queries in corpus.items():
+        keywords = [normalize_keyword(q) for q in queries]
+        for _ in range(warmup):
+            for keyword in keywords:
+                search(keyword, limit)
+        latencies: list[float] = []
+        hits = 0
+        for round_no in range(rounds):
+            for keyword in keywords:
+                started = time.perf_counter()
+                found = search(keyword, limit)
+                latencies.append(time.perf_counter() - started)
+                if round_no == 0 and found:
+                    hits += 1
+        classes[name] = _summary(latencies, hits, len(keywords))
+        everything.extend(latencies)
+        all_hits += hits
+        all_queries += len(keywords)
+    return {"classes": classes, "all": _summary(everything, all_hits, all_queries)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Search latency benchmark over a JLPT query corpus")
+    parser.add_argument("--file", default=INPUT_FILE, help="jmdict-simplified JSON file")
+    parser.add_argument("--entries", type=int, default=20000, help="leading words of the file to keep")
+    parser.add_argument("--engine", action="append", choices=ENGINES,
+                        help="engine to run (repeatable); defaults to memory, snapshot and sqlite")
+    parser.add_argument("--load-mysql", action="store_true",
+                        help="import the subset into the configured database before the mysql run")
+    parser.add_argument("--queries", type=int, default=300, help="queries per class")
+    parser.add_argument("--rounds", type=int, default=3, help="timed passes over the corpus")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed passes before measuring")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print machine-readable result")
+    parser.add_argument("--out", default=None, help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    vocab = load_vocab()
+    corpus = build_corpus(vocab, args.queries, args.seed)
+    result = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "file": os.path.basename(args.file),
+        "settings": {
+            "entries": args.entries,
+            "queries": args.queries,
+            "rounds": args.rounds,
+            "warmup": args.warmup,
+            "limit": args.limit,
+            "seed": args.seed,
+        },
+        "engines": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="search_bench_") as workdir:
+        subset_path = os.path.join(workdir, "subset.json")
+        result["dictionary_entries"] = write_subset(args.file, subset_path, args.entries, vocab_headwords(vocab))
+        for engine in args.engine or ["memory", "snapshot", "sqlite"]:
+            started = time.perf_counter()
+            search = prepare_engine(engine, subset_path, workdir, args.load_mysql)
+            prepare_s = time.perf_counter() - started
+            measured = run_engine(search, corpus, args.limit, args.rounds, args.warmup)
+            result["engines"][engine] = {"prepare_s": round(prepare_s, 2), **measured}
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False))
+        return
+
+    print(f"{result['dictionary_entries']} entries, {args.queries} queries/class x {args.rounds} rounds")
+    for engine, measured in result["engines"].items():
+        print(f"\n{engine} (prepared in {measured['prepare_s']}s)")
+        print(f"  {'class':<9} {'hits':>5} {'qps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for name, row in list(measured["classes"].items()) + [("all", measured["all"])]:
+            print(f"  {name:<9} {row['hit_rate']:>5.0%} {row['qps']:>9.1f} "
+                  f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,15 @@ import sys
 import db_config
 import import_task
 import services.search as search
+from services.sqlite_dictionary import get_sqlite_dictionary
 
 def main_menu():
     try:
-        db_config.setup_database()
+        if search.SEARCH_ENGINE == "sqlite":
+            # Read-only dictionary file: no MySQL needed to search.
+            get_sqlite_dictionary()
+        else:
+            db_config.setup_database()
     except Exception as e:
         print(f"Error connecting to the database: {e}")
         return
@@ -17,12 +22,13 @@ def main_menu():
         print("="*30)
         print("1. Import Data (Run once initially)")
         print("2. Search")
-        print("3. Exit")
+        print("3. Find words at the start of a sentence")
+        print("4. Exit")
         
-        choice = input(" Choose an option (1-3): ").strip()
+        choice = input(" Choose an option (1-4): ").strip()
 
         if choice == '1':
-            confirm = input(" This will delete old data and re-import. Continue? (y/n): ")
+            confirm = input(" This will replace the dictionary data (flashcards are kept). Continue? (y/n): ")
             if confirm.lower() == 'y':
                 import_task.run_import()
         
@@ -37,6 +43,16 @@ def main_menu():
                     search.perform_search(keyword)
         
         elif choice == '3':
+            while True:
+                text = input("Enter a sentence (Kanji/Hiragana) "
+                "[q to quit] "
+                ).strip()
+                if text.lower() == 'q':
+                    break
+                if text:
+                    search.perform_prefix_search(text)
+
+        elif choice == '4':
             sys.exit()
         
         else:
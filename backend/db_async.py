@@ -0,0 +1,229 @@
+# backend/db_async.py
+# Async counterpart of db_config for the FastAPI routes. Uses mysql.connector.aio
+# with the same DB_CONFIG / POOL_CONFIG; cli.py and import_task.py keep using db_config.
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import date as Date
+from typing import Optional, Union
+
+import mysql.connector
+import mysql.connector.aio
+
+from db_config import DB_CONFIG, DICTIONARY_VERSION_KEY, DICTIONARY_META_SQL, POOL_CONFIG, STUDY_LOG_UPSERT_SQL
+
+
+class AsyncPooledConnection:
+    """Proxy around a pooled async connection. Awaiting close() returns it to the pool."""
+
+    def __init__(self, pool: "AsyncConnectionPool", conn, created_at: float):
+        self._pool = pool
+        self._conn = conn
+        self._created_at = created_at
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise mysql.connector.errors.OperationalError("Connection already returned to the pool")
+        return getattr(self._conn, name)
+
+    async def close(self) -> None:
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        await self._pool._release(conn, self._created_at)
+
+
+class AsyncConnectionPool:
+    """asyncio version of db_config.ConnectionPool (same sizing, health-check and metrics)."""
+
+    def __init__(self, connect_args: dict, size: int = 5, max_overflow: int = 10,
+                 timeout: float = 30.0, recycle: int = 1800, pre_ping: bool = True):
+        self._connect_args = dict(connect_args)
+        self.size = max(1, int(size))
+        self.max_overflow = max(0, int(max_overflow))
+        self.timeout = float(timeout)
+        self.recycle = int(recycle)
+        self.pre_ping = bool(pre_ping)
+
+        self._cond = asyncio.Condition()
+        self._idle: deque = deque()
+        self._open = 0
+        self._checked_out = 0
+
+        # metrics
+        self._created = 0
+        self._recycled = 0
+        self._invalidated = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def _connect(self):
+        conn = await mysql.connector.aio.connect(**self._connect_args)
+        self._created += 1
+        return conn, time.monotonic()
+
+    @staticmethod
+    async def _discard(conn) -> None:
+        try:
+            await conn.close()
+        except Exception:
+            pass
+
+    async def acquire(self) -> AsyncPooledConnection:
+        started = time.monotonic()
+        deadline = started + self.timeout
+        conn = None
+        created_at = 0.0
+
+        async with self._cond:
+            while True:
+                if self._idle:
+                    conn, created_at = self._idle.pop()
+                    break
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise mysql.connector.errors.PoolError(
+                        f"Connection pool exhausted ({self._open} open, waited {self.timeout:.1f}s)"
+                    )
+                try:
+                    await asyncio.wait_for(self._cond.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+            self._checked_out += 1
+            self._checkouts += 1
+            waited = time.monotonic() - started
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        try:
+            if conn is not None and self.recycle > 0 and time.monotonic() - created_at > self.recycle:
+                await self._discard(conn)
+                conn = None
+                self._recycled += 1
+            elif conn is not None and self.pre_ping and not await conn.is_connected():
+                await self._discard(conn)
+                conn = None
+                self._invalidated += 1
+
+            if conn is None:
+                conn, created_at = await self._connect()
+        except BaseException:
+            async with self._cond:
+                self._open -= 1
+                self._checked_out -= 1
+                self._cond.notify()
+            raise
+
+        return AsyncPooledConnection(self, conn, created_at)
+
+    async def _release(self, conn, created_at: float) -> None:
+        healthy = True
+        try:
+            await conn.rollback()
+        except Exception:
+            healthy = False
+
+        async with self._cond:
+            self._checked_out -= 1
+            if healthy and self._open <= self.size:
+                self._idle.append((conn, created_at))
+                conn = None
+            else:
+                self._open -= 1
+                if not healthy:
+                    self._invalidated += 1
+            self._cond.notify()
+
+        if conn is not None:
+            await self._discard(conn)
+
+    async def dispose(self) -> None:
+        async with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            await self._discard(conn)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "max_overflow": self.max_overflow,
+            "open": self._open,
+            "idle": len(self._idle),
+            "checked_out": self._checked_out,
+            "checkouts": self._checkouts,
+            "created": self._created,
+            "recycled": self._recycled,
+            "invalidated": self._invalidated,
+            "timeouts": self._timeouts,
+            "wait_time_total_ms": round(self._wait_total * 1000, 3),
+            "wait_time_avg_ms": round(self._wait_total * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+            "wait_time_max_ms": round(self._wait_max * 1000, 3),
+        }
+
+
+_pool: Optional[AsyncConnectionPool] = None
+
+
+def get_async_pool() -> AsyncConnectionPool:
+    global _pool
+    if _pool is None:
+        _pool = AsyncConnectionPool(DB_CONFIG, **POOL_CONFIG)
+    return _pool
+
+
+async def get_async_connection() -> AsyncPooledConnection:
+    return await get_async_pool().acquire()
+
+
+@asynccontextmanager
+async def async_connection():
+    conn = await get_async_connection()
+    try:
+        yield conn
+    finally:
+        await conn.close()
+
+
+def async_pool_stats() -> dict:
+    return _pool.stats() if _pool is not None else {}
+
+
+async def close_async_pool() -> None:
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.dispose()
+
+
+async def increment_study_log_async(log_date: Union[Date, str], delta: int = 1) -> None:
+    """Async variant of db_config.increment_study_log."""
+    async with async_connection() as conn:
+        cursor = await conn.cursor()
+        try:
+            await cursor.execute(STUDY_LOG_UPSERT_SQL, (log_date, int(delta)))
+            await conn.commit()
+        finally:
+            await cursor.close()
+
+
+async def get_dictionary_version_async() -> str:
+    """Async variant of db_config.get_dictionary_version."""
+    async with async_connection() as conn:
+        cursor = await conn.cursor()
+        try:
+            await cursor.execute(DICTIONARY_META_SQL, (DICTIONARY_VERSION_KEY,))
+            row = await cursor.fetchone()
+        finally:
+            await cursor.close()
+    return str(row[0]) if row else "0"
@@ -2,8 +2,12 @@
 import mysql.connector
 from dotenv import load_dotenv 
 import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from datetime import date as Date
-from typing import Union
+from typing import Optional, Union
 load_dotenv()
 
 DB_CONFIG = {
@@ -11,13 +15,270 @@ DB_CONFIG = {
     'user': os.getenv('DB_USER', 'root'),       
     'password': os.getenv('DB_PASSWORD'),       
     'database': os.getenv('DB_NAME'),
-    'port': int(os.getenv('DB_PORT')),
+    'port': int(os.getenv('DB_PORT', '3306')),
     'charset': 'utf8mb4', 
     'collation': 'utf8mb4_unicode_ci'
 }
 
+POOL_CONFIG = {
+    'size': int(os.getenv('DB_POOL_SIZE', '5')),
+    'max_overflow': int(os.getenv('DB_POOL_MAX_OVERFLOW', '10')),
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', '30')),
+    'recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+    'pre_ping': os.getenv('DB_POOL_PRE_PING', '1').lower() not in ('0', 'false', 'no'),
+}
+
+
+class PooledConnection:
+    """Proxy around a pooled MySQL connection.
+
+    Behaves like the underlying connection, except close() hands it back to the pool.
+    """
+
+    def __init__(self, pool: "ConnectionPool", conn, created_at: float):
+        self._pool = pool
+        self._conn = conn
+        self._created_at = created_at
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise mysql.connector.errors.OperationalError("Connection already returned to the pool")
+        return getattr(self._conn, name)
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        self._pool._release(conn, self._created_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """Thread-safe MySQL connection pool.
+
+    - `size` connections are kept open; up to `max_overflow` extra ones are opened
+      under load and closed again when returned.
+    - Checkout blocks up to `timeout` seconds, then raises PoolError.
+    - Idle connections older than `recycle` seconds are replaced, and with `pre_ping`
+      every checkout is health-checked so dead sockets never reach a service.
+    """
+
+    def __init__(self, connect_args: dict, size: int = 5, max_overflow: int = 10,
+                 timeout: float = 30.0, recycle: int = 1800, pre_ping: bool = True):
+        self._connect_args = dict(connect_args)
+        self.size = max(1, int(size))
+        self.max_overflow = max(0, int(max_overflow))
+        self.timeout = float(timeout)
+        self.recycle = int(recycle)
+        self.pre_ping = bool(pre_ping)
+
+        self._cond = threading.Condition()
+        self._idle: deque = deque()
+        self._open = 0
+        self._checked_out = 0
+
+        # metrics
+        self._created = 0
+        self._recycled = 0
+        self._invalidated = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _connect(self):
+        conn = mysql.connector.connect(**self._connect_args)
+        with self._cond:
+            self._created += 1
+        return conn, time.monotonic()
+
+    @staticmethod
+    def _discard(conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def acquire(self) -> PooledConnection:
+        started = time.monotonic()
+        deadline = started + self.timeout
+        conn = None
+        created_at = 0.0
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, created_at = self._idle.pop()
+                    break
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise mysql.connector.errors.PoolError(
+                        f"Connection pool exhausted ({self._open} open, waited {self.timeout:.1f}s)"
+                    )
+                self._cond.wait(remaining)
+
+            self._checked_out += 1
+            self._checkouts += 1
+            waited = time.monotonic() - started
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        try:
+            if conn is not None and self.recycle > 0 and time.monotonic() - created_at > self.recycle:
+                self._discard(conn)
+                conn = None
+                with self._cond:
+                    self._recycled += 1
+            elif conn is not None and self.pre_ping and not conn.is_connected():
+                self._discard(conn)
+                conn = None
+                with self._cond:
+                    self._invalidated += 1
+
+            if conn is None:
+                conn, created_at = self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._checked_out -= 1
+                self._cond.notify()
+            raise
+
+        return PooledConnection(self, conn, created_at)
+
+    def _release(self, conn, created_at: float) -> None:
+        # End whatever transaction the caller left open (including the implicit
+        # read snapshot of a plain SELECT) so the next user starts clean.
+        healthy = True
+        try:
+            conn.rollback()
+        except Exception:
+            healthy = False
+
+        with self._cond:
+            self._checked_out -= 1
+            if healthy and self._open <= self.size:
+                self._idle.append((conn, created_at))
+                conn = None
+            else:
+                self._open -= 1
+                if not healthy:
+                    self._invalidated += 1
+            self._cond.notify()
+
+        if conn is not None:
+            self._discard(conn)
+
+    def dispose(self) -> None:
+        """Close all idle connections (checked-out ones are closed when returned)."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": len(self._idle),
+                "checked_out": self._checked_out,
+                "checkouts": self._checkouts,
+                "created": self._created,
+                "recycled": self._recycled,
+                "invalidated": self._invalidated,
+                "timeouts": self._timeouts,
+                "wait_time_total_ms": round(self._wait_total * 1000, 3),
+                "wait_time_avg_ms": round(self._wait_total * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+                "wait_time_max_ms": round(self._wait_max * 1000, 3),
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+    return _pool
+
+
 def get_connection():
-    return mysql.connector.connect(**DB_CONFIG)
+    """Check out a pooled connection. Calling close() returns it to the pool."""
+    return get_pool().acquire()
+
+
+@contextmanager
+def connection():
+    """Context manager around get_connection() for code that shares one connection."""
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def pool_stats() -> dict:
+    return get_pool().stats() if _pool is not None else {}
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.dispose()
+            _pool = None
+
+
+# SM-2 state given to cards already marked memorized when the scheduling columns
+# are added (see setup_database).
+MEMORIZED_INTERVAL_DAYS = 15
+MEMORIZED_REPETITIONS = 3
+
+
+def _ensure_column(cursor, table: str, column: str, definition: str) -> bool:
+    """Add the column if it is missing; returns True when it was added."""
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """,
+        (table, column),
+    )
+    if cursor.fetchone()[0]:
+        return False
+    cursor.execute(f"ALTER TABLE `{table}` ADD COLUMN `{column}` {definition}")
+    return True
+
+
+def _ensure_index(cursor, table: str, index: str, definition: str) -> None:
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        """,
+        (table, index),
+    )
+    if not cursor.fetchone()[0]:
+        cursor.execute(f"ALTER TABLE `{table}` ADD {definition}")
+
 
 def setup_database():
     conn = get_connection()
@@ -30,6 +291,10 @@ def setup_database():
             id VARCHAR(20) PRIMARY KEY,
             primary_headword VARCHAR(100) NOT NULL,
             raw_json JSON NOT NULL,
+            -- Compact WordSchema projection of raw_json, written at import time.
+            word_data JSON NULL,
+            -- sha1 of the word's canonical JSON, compared by the delta import.
+            content_hash CHAR(40) NULL,
             created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
 
             INDEX idx_primary_headword (primary_headword)
@@ -60,9 +325,12 @@ def setup_database():
         CREATE TABLE IF NOT EXISTS entry_reading (
             entry_id VARCHAR(20) NOT NULL,
             reading_text VARCHAR(100) NOT NULL,
+            -- services.normalize.normalize_reading(reading_text): width/kana/long-vowel folded.
+            reading_norm VARCHAR(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NULL,
 
             PRIMARY KEY (entry_id, reading_text),
             INDEX idx_reading (reading_text),
+            INDEX idx_reading_norm (reading_norm),
             INDEX idx_entry_reading_entry (entry_id),
             CONSTRAINT fk_entry_reading_entry
                 FOREIGN KEY (entry_id) REFERENCES entries(id)
@@ -85,6 +353,42 @@ def setup_database():
           DEFAULT CHARSET=utf8mb4
           COLLATE=utf8mb4_unicode_ci;
         """,
+        # Inverted index of gloss_text words: exact / prefix / infix English matching
+        # without REGEXP or a full scan. One row per distinct word of an entry.
+        """
+        CREATE TABLE IF NOT EXISTS entry_gloss_tokens (
+            token VARCHAR(84) CHARACTER SET ascii COLLATE ascii_bin NOT NULL,
+            entry_id VARCHAR(20) NOT NULL,
+            -- offset of the first occurrence in the (accent-folded) gloss_text
+            position SMALLINT UNSIGNED NOT NULL,
+            -- 0-based sense the first occurrence belongs to
+            sense_rank SMALLINT UNSIGNED NOT NULL,
+
+            PRIMARY KEY (token, entry_id),
+            INDEX idx_gloss_tokens_entry (entry_id),
+            CONSTRAINT fk_entry_gloss_tokens_entry
+                FOREIGN KEY (entry_id) REFERENCES entries(id)
+                ON DELETE CASCADE
+        ) ENGINE=InnoDB
+          DEFAULT CHARSET=utf8mb4
+          COLLATE=utf8mb4_unicode_ci;
+        """,
+        # Character index: kanji code point -> entries whose kanji forms contain it,
+        # for "contains character" search (飲食 / 給食 for 食) without scanning entry_kanji.
+        """
+        CREATE TABLE IF NOT EXISTS entry_chars (
+            ch VARCHAR(1) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL,
+            entry_id VARCHAR(20) NOT NULL,
+
+            PRIMARY KEY (ch, entry_id),
+            INDEX idx_entry_chars_entry (entry_id),
+            CONSTRAINT fk_entry_chars_entry
+                FOREIGN KEY (entry_id) REFERENCES entries(id)
+                ON DELETE CASCADE
+        ) ENGINE=InnoDB
+          DEFAULT CHARSET=utf8mb4
+          COLLATE=utf8mb4_unicode_ci;
+        """,
         # --- List & Flashcard ---
         """
         CREATE TABLE IF NOT EXISTS vocab_lists (
@@ -103,11 +407,20 @@ def setup_database():
             entry_id VARCHAR(20) NOT NULL,
             note TEXT NULL,
             is_memorized TINYINT(1) NOT NULL DEFAULT 0,
+            -- SM-2 scheduling state (services.flashcard_service.schedule_review).
+            interval_days INT NOT NULL DEFAULT 0,
+            ease_factor DECIMAL(4,2) NOT NULL DEFAULT 2.50,
+            repetitions INT NOT NULL DEFAULT 0,
+            lapses INT NOT NULL DEFAULT 0,
+            due_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            last_reviewed_at DATETIME NULL,
             created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
 
             UNIQUE KEY unique_card (list_id, entry_id),
             INDEX idx_flashcards_list (list_id),
             INDEX idx_flashcards_entry (entry_id),
+            INDEX idx_flashcards_due (list_id, due_at),
+            INDEX idx_flashcards_list_created (list_id, created_at),
             CONSTRAINT fk_flashcards_list
                 FOREIGN KEY (list_id) REFERENCES vocab_lists(id)
                 ON DELETE CASCADE,
@@ -131,16 +444,65 @@ def setup_database():
           DEFAULT CHARSET=utf8mb4
           COLLATE=utf8mb4_unicode_ci;
         """,
+
+        # --- Dictionary metadata (version stamp bumped by every import) ---
+        """
+        CREATE TABLE IF NOT EXISTS dictionary_meta (
+            meta_key VARCHAR(50) PRIMARY KEY,
+            meta_value VARCHAR(255) NOT NULL,
+            updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB
+          DEFAULT CHARSET=utf8mb4
+          COLLATE=utf8mb4_unicode_ci;
+        """,
     ]
 
     for stmt in statements:
         cursor.execute(stmt)
 
+    # Columns added after the first release; CREATE TABLE IF NOT EXISTS won't add them.
+    _ensure_column(cursor, "entries", "word_data", "JSON NULL AFTER raw_json")
+    _ensure_column(cursor, "entries", "content_hash", "CHAR(40) NULL AFTER word_data")
+    _ensure_column(
+        cursor, "entry_reading", "reading_norm",
+        "VARCHAR(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NULL AFTER reading_text",
+    )
+    _ensure_index(cursor, "entry_reading", "idx_reading_norm", "INDEX idx_reading_norm (reading_norm)")
+    _ensure_column(cursor, "flashcards", "interval_days", "INT NOT NULL DEFAULT 0 AFTER is_memorized")
+    _ensure_column(cursor, "flashcards", "ease_factor", "DECIMAL(4,2) NOT NULL DEFAULT 2.50 AFTER interval_days")
+    _ensure_column(cursor, "flashcards", "repetitions", "INT NOT NULL DEFAULT 0 AFTER ease_factor")
+    _ensure_column(cursor, "flashcards", "lapses", "INT NOT NULL DEFAULT 0 AFTER repetitions")
+    if _ensure_column(cursor, "flashcards", "due_at", "DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP AFTER lapses"):
+        # Existing cards all became due now. Give the memorized ones the state of three
+        # passing reviews (1, 6, 15 days) and spread their next review over that interval,
+        # so the first queue after the upgrade is not the whole collection.
+        cursor.execute(
+            f"""
+            UPDATE flashcards
+            SET interval_days = {MEMORIZED_INTERVAL_DAYS},
+                repetitions = {MEMORIZED_REPETITIONS},
+                due_at = NOW() + INTERVAL (1 + MOD(id, {MEMORIZED_INTERVAL_DAYS})) DAY
+            WHERE is_memorized = 1
+            """
+        )
+    _ensure_column(cursor, "flashcards", "last_reviewed_at", "DATETIME NULL AFTER due_at")
+    _ensure_index(cursor, "flashcards", "idx_flashcards_due", "INDEX idx_flashcards_due (list_id, due_at)")
+    _ensure_index(
+        cursor, "flashcards", "idx_flashcards_list_created", "INDEX idx_flashcards_list_created (list_id, created_at)",
+    )
+
     conn.commit()
     cursor.close()
     conn.close()
 
 
+STUDY_LOG_UPSERT_SQL = """
+    INSERT INTO study_logs (`date`, `count`)
+    VALUES (%s, %s)
+    ON DUPLICATE KEY UPDATE `count` = `count` + VALUES(`count`)
+"""
+
+
 def increment_study_log(log_date: Union[Date, str], delta: int = 1) -> None:
     """Increment the study count for a given date.
 
@@ -149,15 +511,56 @@ def increment_study_log(log_date: Union[Date, str], delta: int = 1) -> None:
     conn = get_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute(
-            """
-            INSERT INTO study_logs (`date`, `count`)
-            VALUES (%s, %s)
-            ON DUPLICATE KEY UPDATE `count` = `count` + VALUES(`count`)
-            """,
-            (log_date, int(delta)),
-        )
+        cursor.execute(STUDY_LOG_UPSERT_SQL, (log_date, int(delta)))
         conn.commit()
     finally:
         cursor.close()
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+
+DICTIONARY_VERSION_KEY = "dictionary_version"
+DICTIONARY_META_SQL = "SELECT meta_value FROM dictionary_meta WHERE meta_key = %s"
+# Checksum of the search index snapshot written for the current version (services.dictionary_snapshot).
+SNAPSHOT_CHECKSUM_KEY = "snapshot_checksum"
+
+
+def bump_dictionary_version(cursor) -> None:
+    """Increment the dictionary version stamp; caller commits.
+
+    Anything derived from the entry tables (e.g. the search cache) keys on it.
+    """
+    cursor.execute(
+        """
+        INSERT INTO dictionary_meta (meta_key, meta_value)
+        VALUES (%s, '1')
+        ON DUPLICATE KEY UPDATE meta_value = CAST(meta_value AS UNSIGNED) + 1
+        """,
+        (DICTIONARY_VERSION_KEY,),
+    )
+
+
+def get_dictionary_meta(key: str) -> Optional[str]:
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(DICTIONARY_META_SQL, (key,))
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+    return str(row[0]) if row else None
+
+
+def set_dictionary_meta(cursor, key: str, value: str) -> None:
+    """Store a dictionary_meta value; caller commits."""
+    cursor.execute(
+        """
+        INSERT INTO dictionary_meta (meta_key, meta_value)
+        VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE meta_value = VALUES(meta_value)
+        """,
+        (key, value),
+    )
+
+
+def get_dictionary_version() -> str:
+    return get_dictionary_meta(DICTIONARY_VERSION_KEY) or "0"
@@ -1,8 +1,39 @@
 # backend/import_task.py
+import argparse
+import hashlib
 import json
 import os
+import shutil
+import sqlite3
+import tempfile
 import time
-from db_config import get_connection
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import mysql.connector
+from mysql.connector import errorcode
+
+from db_config import (
+    DB_CONFIG,
+    SNAPSHOT_CHECKSUM_KEY,
+    bump_dictionary_version,
+    get_connection,
+    get_dictionary_version,
+    set_dictionary_meta,
+    setup_database,
+)
+from services.normalize import (
+    GLOSS_TOKEN_MAX_LENGTH,
+    GLOSS_TOKEN_RE,
+    fold_collation,
+    fold_gloss,
+    kanji_chars,
+    normalize_reading,
+)
+from services.dictionary_index import DictionaryIndex, _TOKEN_RE
+from services.dictionary_snapshot import DICTIONARY_SNAPSHOT, write_snapshot
+from services.search import _parse_word_json, _word_data_json
+from services.sqlite_dictionary import SQLITE_FORMAT_VERSION, SQLITE_SCHEMA
 
 INPUT_FILE = 'jmdict-eng-common-3.6.1.json'
 
@@ -17,10 +48,20 @@ def _extract_primary_headword(word: dict) -> str:
     return ''
 
 
-def _extract_gloss_text(word: dict) -> str:
-    """Flatten English gloss into a single text field for search."""
-    glosses: list[str] = []
-    for sense in word.get('sense') or []:
+def _content_hash(word: dict) -> str:
+    """sha1 of the word's canonical JSON (sorted keys, no whitespace).
+
+    Canonical so that a word read back from entries.raw_json (which MySQL stores
+    with its own key order) hashes the same as the word in the source file.
+    """
+    canonical = json.dumps(word, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def _extract_glosses(word: dict) -> list[tuple[int, str]]:
+    """(sense index, English gloss) pairs, de-duplicated in order."""
+    glosses: list[tuple[int, str]] = []
+    for sense_rank, sense in enumerate(word.get('sense') or []):
         for gloss in sense.get('gloss') or []:
             # JMdict JSON uses objects like: {"lang":"eng", "text":"..."}
             if isinstance(gloss, dict):
@@ -28,142 +69,1166 @@ def _extract_gloss_text(word: dict) -> str:
                     continue
                 text = gloss.get('text')
                 if text:
-                    glosses.append(str(text))
+                    glosses.append((sense_rank, str(text)))
             elif isinstance(gloss, str):
                 # fallback if dataset shape differs
-                glosses.append(gloss)
+                glosses.append((sense_rank, gloss))
 
     # de-dup while preserving order
     seen: set[str] = set()
-    unique: list[str] = []
-    for g in glosses:
+    unique: list[tuple[int, str]] = []
+    for sense_rank, g in glosses:
         if g not in seen:
             seen.add(g)
-            unique.append(g)
-    return '; '.join(unique)
+            unique.append((sense_rank, g))
+    return unique
+
+
+def _gloss_token_rows(entry_id: str, glosses: list[tuple[int, str]]) -> list[tuple]:
+    """entry_gloss_tokens rows: (token, entry_id, position, sense_rank) for the first
+    occurrence of every word, position being its offset in the folded gloss_text."""
+    first: dict[str, tuple[int, int]] = {}
+    offset = 0
+    for sense_rank, gloss in glosses:
+        folded = fold_gloss(gloss)
+        for m in GLOSS_TOKEN_RE.finditer(folded):
+            token = m.group()
+            if len(token) <= GLOSS_TOKEN_MAX_LENGTH and token not in first:
+                first[token] = (min(offset + m.start(), 0xFFFF), sense_rank)
+        offset += len(folded) + 2  # '; ' separator
+    return [(token, entry_id, position, sense_rank) for token, (position, sense_rank) in first.items()]
+
+
+# --- Shadow tables ---
+#
+# A reimport loads into <table>_new copies while the live tables keep serving, then
+# swaps them in with one atomic RENAME TABLE. Parent table first.
+ENTRY_TABLES = ['entries', 'entry_kanji', 'entry_reading', 'entry_definitions', 'entry_gloss_tokens', 'entry_chars']
+SHADOW_SUFFIX = '_new'
+OLD_SUFFIX = '_old'
+
+
+def _prepare_shadow_tables(cursor) -> None:
+    """(Re)create empty <table>_new copies of the entry tables."""
+    for table in reversed(ENTRY_TABLES):
+        cursor.execute(f"DROP TABLE IF EXISTS `{table}{SHADOW_SUFFIX}`")
+        cursor.execute(f"DROP TABLE IF EXISTS `{table}{OLD_SUFFIX}`")
+    for table in ENTRY_TABLES:
+        # LIKE copies columns and indexes (incl. FULLTEXT) but not foreign keys;
+        # those are added after the load by _add_shadow_foreign_keys.
+        cursor.execute(f"CREATE TABLE `{table}{SHADOW_SUFFIX}` LIKE `{table}`")
 
 
-def _clear_old_entry_data(cursor) -> None:
-    """Clear entry-related tables before reimport.
+def _add_shadow_foreign_keys(cursor) -> None:
+    # Unnamed on purpose: InnoDB names them <table>_new_ibfk_N and renames them
+    # along with the table, so names never collide across reimports.
+    for table in ENTRY_TABLES[1:]:
+        cursor.execute(
+            f"""
+            ALTER TABLE `{table}{SHADOW_SUFFIX}`
+            ADD FOREIGN KEY (entry_id) REFERENCES `entries{SHADOW_SUFFIX}` (id) ON DELETE CASCADE
+            """
+        )
+
+
+def _flashcard_entry_fks(cursor) -> list[str]:
+    cursor.execute(
+        """
+        SELECT CONSTRAINT_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS
+        WHERE CONSTRAINT_SCHEMA = DATABASE()
+          AND TABLE_NAME = 'flashcards' AND REFERENCED_TABLE_NAME = 'entries'
+        """
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _swap_in_shadow_tables(conn, cursor) -> dict:
+    """Atomically replace the live entry tables with the shadow copies and keep
+    flashcards pointing at valid entries.
+
+    Flashcards whose entry id disappeared are remapped to the new entry with the
+    same primary headword; the rest are reported as orphans and removed.
     """
-    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
-    cursor.execute("TRUNCATE TABLE flashcards")
-    cursor.execute("TRUNCATE TABLE entry_definitions")
-    cursor.execute("TRUNCATE TABLE entry_reading")
-    cursor.execute("TRUNCATE TABLE entry_kanji")
-    cursor.execute("TRUNCATE TABLE entries")
-    cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
-
-def run_import():
-    if not os.path.exists(INPUT_FILE):
-        print(f"Không tìm thấy file '{INPUT_FILE}' trong thư mục.")
+    cursor.execute("SET SESSION foreign_key_checks = 0")
+    try:
+        # flashcards.entry_id would otherwise follow `entries` to entries_old.
+        for fk in _flashcard_entry_fks(cursor):
+            cursor.execute(f"ALTER TABLE flashcards DROP FOREIGN KEY `{fk}`")
+
+        renames = []
+        for table in ENTRY_TABLES:
+            renames.append(f"`{table}` TO `{table}{OLD_SUFFIX}`")
+            renames.append(f"`{table}{SHADOW_SUFFIX}` TO `{table}`")
+        cursor.execute("RENAME TABLE " + ", ".join(renames))
+        bump_dictionary_version(cursor)
+
+        cursor.execute(
+            f"""
+            UPDATE IGNORE flashcards f
+            JOIN `entries{OLD_SUFFIX}` o ON o.id = f.entry_id
+            JOIN (
+                SELECT primary_headword, MIN(id) AS id FROM entries GROUP BY primary_headword
+            ) n ON n.primary_headword = o.primary_headword
+            LEFT JOIN entries cur ON cur.id = f.entry_id
+            SET f.entry_id = n.id
+            WHERE cur.id IS NULL
+            """
+        )
+        remapped = cursor.rowcount
+
+        cursor.execute(
+            """
+            SELECT f.id, f.list_id, f.entry_id
+            FROM flashcards f
+            LEFT JOIN entries e ON e.id = f.entry_id
+            WHERE e.id IS NULL
+            """
+        )
+        orphans = [(int(r[0]), int(r[1]), str(r[2])) for r in cursor.fetchall()]
+        if orphans:
+            placeholders = ", ".join(["%s"] * len(orphans))
+            cursor.execute(
+                f"DELETE FROM flashcards WHERE id IN ({placeholders})",
+                tuple(o[0] for o in orphans),
+            )
+        conn.commit()
+
+        cursor.execute(
+            """
+            ALTER TABLE flashcards
+            ADD CONSTRAINT fk_flashcards_entry
+                FOREIGN KEY (entry_id) REFERENCES entries(id)
+                ON DELETE CASCADE
+            """
+        )
+        for table in reversed(ENTRY_TABLES):
+            cursor.execute(f"DROP TABLE IF EXISTS `{table}{OLD_SUFFIX}`")
+    finally:
+        cursor.execute("SET SESSION foreign_key_checks = 1")
+
+    return {"remapped": remapped, "orphans": orphans}
+
+
+def _verify_and_swap(conn, cursor, count: int) -> None:
+    """Check the shadow row count against the file, then swap it in."""
+    cursor.execute(f"SELECT COUNT(*) FROM `entries{SHADOW_SUFFIX}`")
+    imported_count = cursor.fetchone()[0]
+    print(f"Check in DB: {imported_count}/{count} records.")
+    if imported_count != count:
+        print(" Warning: number of records in DB does not match number of words in file.")
+        print(f" Live tables left untouched; inspect the *{SHADOW_SUFFIX} tables and re-run.")
         return
 
+    _add_shadow_foreign_keys(cursor)
+    conn.commit()
+
+    started = time.perf_counter()
+    report = _swap_in_shadow_tables(conn, cursor)
+    print(f"Swapped in new dictionary tables in {time.perf_counter() - started:.2f}s.")
+    _print_flashcard_report(report)
+
+
+def _print_flashcard_report(report: dict) -> None:
+    print(f"Flashcards remapped to new entry ids: {report['remapped']}.")
+    if report["orphans"]:
+        print(f" Warning: removed {len(report['orphans'])} flashcards whose entry no longer exists:")
+        for flashcard_id, list_id, entry_id in report["orphans"]:
+            print(f"   flashcard {flashcard_id} (list {list_id}, entry {entry_id})")
+
+
+class _RowBatch:
+    """Rows for the entry tables built from one chunk of words."""
+
+    __slots__ = ('entries', 'kanji', 'reading', 'defs', 'tokens', 'chars')
+
+    def __init__(self):
+        self.entries: list[tuple] = []
+        self.kanji: list[tuple] = []
+        self.reading: list[tuple] = []
+        self.defs: list[tuple] = []
+        self.tokens: list[tuple] = []
+        self.chars: list[tuple] = []
+
+
+def _add_word_rows(batch: _RowBatch, word: dict) -> None:
+    w_id = word.get('id')
+
+    primary_headword = _extract_primary_headword(word)
+    raw_json = json.dumps(word, ensure_ascii=False)
+    word_data = _word_data_json(word, entry_id=w_id)
+    batch.entries.append((w_id, primary_headword, raw_json, word_data, _content_hash(word)))
+
+    # Kanji spellings (all)
+    kanji_seen: set[str] = set()
+    for k in word.get('kanji') or []:
+        txt = (k or {}).get('text')
+        if not txt or txt in kanji_seen:
+            continue
+        kanji_seen.add(txt)
+        common = 1 if (k or {}).get('common') else 0
+        batch.kanji.append((w_id, txt, common))
+    batch.chars.extend((ch, w_id) for ch in kanji_chars(''.join(sorted(kanji_seen))))
+
+    # Readings (all)
+    reading_seen: set[str] = set()
+    for r in word.get('kana') or []:
+        txt = (r or {}).get('text')
+        if not txt or txt in reading_seen:
+            continue
+        reading_seen.add(txt)
+        batch.reading.append((w_id, txt, normalize_reading(txt)))
+
+    # Definitions (flattened English gloss) and their word index
+    glosses = _extract_glosses(word)
+    batch.defs.append((w_id, '; '.join(g for _, g in glosses)))
+    batch.tokens.extend(_gloss_token_rows(w_id, glosses))
+
+
+def _build_rows(word_texts: list[str]) -> _RowBatch:
+    """Worker entry point: JSON text of each word -> table rows."""
+    batch = _RowBatch()
+    for text in word_texts:
+        _add_word_rows(batch, json.loads(text))
+    return batch
+
+
+def iter_word_texts(path: str, chunk_chars: int = 1 << 20):
+    """Yield the JSON text of each element of the top-level "words" array.
+
+    The file is read in chunks and only one word is decoded at a time, so memory
+    stays bounded regardless of file size. Other top-level keys (tags, version,
+    ...) are small and skipped.
+    """
+    decoder = json.JSONDecoder()
+    ws = ' \t\r\n'
+
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = ''
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buf, pos, eof
+            if eof:
+                return False
+            chunk = f.read(chunk_chars)
+            if not chunk:
+                eof = True
+                return False
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip_ws() -> str:
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in ws:
+                    pos += 1
+                if pos < len(buf):
+                    return buf[pos]
+                if not fill():
+                    return ''
+
+        def decode():
+            # Only trust a value that is followed by more input (or EOF), so a
+            # number/literal cut at the chunk boundary is never accepted.
+            nonlocal pos
+            skip_ws()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    if end < len(buf) or eof:
+                        start, pos = pos, end
+                        return value, start, end
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill()
+
+        def expect(ch: str) -> None:
+            nonlocal pos
+            if skip_ws() != ch:
+                raise ValueError(f"Malformed JMdict JSON: expected '{ch}' at offset {pos}")
+            pos += 1
+
+        expect('{')
+        while True:
+            ch = skip_ws()
+            if ch == '}':
+                return
+            if ch == ',':
+                pos += 1
+                continue
+            key, _, _ = decode()
+            expect(':')
+            if key != 'words':
+                decode()
+                continue
+
+            expect('[')
+            while True:
+                ch = skip_ws()
+                if ch == ']':
+                    pos += 1
+                    break
+                if ch == ',':
+                    pos += 1
+                    continue
+                _, start, end = decode()
+                yield buf[start:end]
+
+
+def _chunked(items, size: int):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Table names take a suffix so the same statements load the shadow tables.
+SQL_ENTRIES = """
+    INSERT INTO entries{suffix} (id, primary_headword, raw_json, word_data, content_hash)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+SQL_KANJI = """
+    INSERT IGNORE INTO entry_kanji{suffix} (entry_id, kanji_text, is_common)
+    VALUES (%s, %s, %s)
+"""
+SQL_READING = """
+    INSERT IGNORE INTO entry_reading{suffix} (entry_id, reading_text, reading_norm)
+    VALUES (%s, %s, %s)
+"""
+SQL_DEFS = """
+    INSERT INTO entry_definitions{suffix} (entry_id, gloss_text)
+    VALUES (%s, %s)
+    ON DUPLICATE KEY UPDATE gloss_text = VALUES(gloss_text)
+"""
+SQL_GLOSS_TOKENS = """
+    INSERT IGNORE INTO entry_gloss_tokens{suffix} (token, entry_id, position, sense_rank)
+    VALUES (%s, %s, %s, %s)
+"""
+SQL_CHARS = """
+    INSERT IGNORE INTO entry_chars{suffix} (ch, entry_id)
+    VALUES (%s, %s)
+"""
+
+BATCH_SIZE = 2000
+_DEADLOCK_RETRIES = 3
+
+
+def _write_batch(batch: _RowBatch, suffix: str = '') -> int:
+    """Insert one batch on a pooled connection (called from writer threads)."""
+    for attempt in range(_DEADLOCK_RETRIES + 1):
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.executemany(SQL_ENTRIES.format(suffix=suffix), batch.entries)
+            if batch.kanji:
+                cursor.executemany(SQL_KANJI.format(suffix=suffix), batch.kanji)
+            if batch.reading:
+                cursor.executemany(SQL_READING.format(suffix=suffix), batch.reading)
+            if batch.defs:
+                cursor.executemany(SQL_DEFS.format(suffix=suffix), batch.defs)
+            if batch.tokens:
+                cursor.executemany(SQL_GLOSS_TOKENS.format(suffix=suffix), batch.tokens)
+            if batch.chars:
+                cursor.executemany(SQL_CHARS.format(suffix=suffix), batch.chars)
+            conn.commit()
+            return len(batch.entries)
+        except mysql.connector.Error as e:
+            conn.rollback()
+            # Parallel writers can deadlock on secondary-index inserts; retry those.
+            if e.errno != errorcode.ER_LOCK_DEADLOCK or attempt == _DEADLOCK_RETRIES:
+                raise
+        finally:
+            cursor.close()
+            conn.close()
+    return 0
+
+
+def _default_workers() -> int:
+    return max(1, os.cpu_count() or 1)
+
+
+def run_import(path: str = INPUT_FILE, workers: int = 0, writers: int = 4, batch_size: int = BATCH_SIZE):
+    """Stream the JMdict file into MySQL.
+
+    Words are parsed incrementally, turned into rows by `workers` processes and
+    inserted by `writers` threads, each with its own pooled connection. At most a
+    few batches per worker/writer are in flight, so peak memory does not depend on
+    the size of the file. Rows go into shadow tables that are swapped in at the end,
+    so search keeps working and flashcards survive the reimport.
+    """
+    if not os.path.exists(path):
+        print(f"Không tìm thấy file '{path}' trong thư mục.")
+        return
+
+    workers = workers or _default_workers()
+    writers = max(1, writers)
+
     conn = get_connection()
     cursor = conn.cursor()
 
-    print("Clearing old data (entries / kanji / reading / definitions / flashcards)...")
-    _clear_old_entry_data(cursor)
+    print("Preparing shadow tables (entries / kanji / reading / definitions / gloss tokens / chars)...")
+    setup_database()
+    _prepare_shadow_tables(cursor)
     conn.commit()
 
-    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    print(f"Starting import from '{path}' ({workers} parse workers, {writers} writers)...")
+    count = 0
+    start_time = time.time()
+
+    builders = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    pending_builds: deque = deque()
+    pending_writes: deque = deque()
+
+    def drain_writes(limit: int) -> None:
+        nonlocal count
+        while len(pending_writes) > limit:
+            count += pending_writes.popleft().result()
+            print(f"   -> Imported {count} entries...")
+
+    try:
+        with ThreadPoolExecutor(max_workers=writers) as writer_pool:
+
+            def drain_builds(limit: int) -> None:
+                while len(pending_builds) > limit:
+                    batch = pending_builds.popleft().result()
+                    pending_writes.append(writer_pool.submit(_write_batch, batch, SHADOW_SUFFIX))
+                    drain_writes(writers * 2)
+
+            for chunk in _chunked(iter_word_texts(path), batch_size):
+                if builders is None:
+                    pending_writes.append(writer_pool.submit(_write_batch, _build_rows(chunk), SHADOW_SUFFIX))
+                    drain_writes(writers * 2)
+                else:
+                    pending_builds.append(builders.submit(_build_rows, chunk))
+                    drain_builds(workers * 2)
+
+            drain_builds(0)
+            drain_writes(0)
+    finally:
+        if builders is not None:
+            builders.shutdown(cancel_futures=True)
+
+    duration = time.time() - start_time
+    rate = (count / duration) if duration > 0 else 0
+    print(f"Imported {count} words in {duration:.2f} seconds (~{rate:,.0f} words/second).")
+
+    try:
+        _verify_and_swap(conn, cursor, count)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# --- Bulk mode (LOAD DATA LOCAL INFILE) ---
+
+# Secondary / FULLTEXT indexes dropped while bulk loading and rebuilt afterwards.
+# Indexes backing the primary and foreign keys stay in place.
+_BULK_DEFERRED_INDEXES = [
+    ('entries', 'idx_primary_headword', 'INDEX idx_primary_headword (primary_headword)'),
+    ('entry_kanji', 'idx_kanji', 'INDEX idx_kanji (kanji_text)'),
+    ('entry_kanji', 'idx_entry_kanji_common', 'INDEX idx_entry_kanji_common (is_common)'),
+    ('entry_reading', 'idx_reading', 'INDEX idx_reading (reading_text)'),
+    ('entry_reading', 'idx_reading_norm', 'INDEX idx_reading_norm (reading_norm)'),
+    ('entry_definitions', 'ft_gloss', 'FULLTEXT INDEX ft_gloss (gloss_text)'),
+    ('entry_gloss_tokens', 'idx_gloss_tokens_entry', 'INDEX idx_gloss_tokens_entry (entry_id)'),
+    ('entry_chars', 'idx_entry_chars_entry', 'INDEX idx_entry_chars_entry (entry_id)'),
+]
+
+# (table, spool file, LOAD DATA duplicate handling, columns)
+_BULK_TABLES = [
+    ('entries', 'entries.tsv', 'IGNORE', ('id', 'primary_headword', 'raw_json', 'word_data', 'content_hash')),
+    ('entry_kanji', 'entry_kanji.tsv', 'IGNORE', ('entry_id', 'kanji_text', 'is_common')),
+    ('entry_reading', 'entry_reading.tsv', 'IGNORE', ('entry_id', 'reading_text', 'reading_norm')),
+    ('entry_definitions', 'entry_definitions.tsv', 'REPLACE', ('entry_id', 'gloss_text')),
+    ('entry_gloss_tokens', 'entry_gloss_tokens.tsv', 'IGNORE', ('token', 'entry_id', 'position', 'sense_rank')),
+    ('entry_chars', 'entry_chars.tsv', 'IGNORE', ('ch', 'entry_id')),
+]
+
+def _spool_escape(value) -> str:
+    if value is None:
+        return '\\N'
+    text = str(value)
+    if '\\' in text:
+        text = text.replace('\\', '\\\\')
+    return (
+        text.replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+        .replace('\0', '\\0')
+    )
+
+
+def _spool_line(row: tuple) -> str:
+    """One row in LOAD DATA's default TSV format (\\N for NULL, backslash escapes)."""
+    return '\t'.join(_spool_escape(v) for v in row) + '\n'
+
 
-    words_list = data.get('words', [])
-    total_words = len(words_list)
-    print(f"Found {total_words} words. Starting import...")
+def _index_exists(cursor, table: str, index: str) -> bool:
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        """,
+        (table, index),
+    )
+    return bool(cursor.fetchone()[0])
 
-    sql_entries = """
-        INSERT INTO entries (id, primary_headword, raw_json)
-        VALUES (%s, %s, %s)
+
+def _drop_deferred_indexes(cursor, suffix: str = '') -> None:
+    for table, index, _ in _BULK_DEFERRED_INDEXES:
+        if _index_exists(cursor, table + suffix, index):
+            cursor.execute(f"ALTER TABLE `{table}{suffix}` DROP INDEX `{index}`")
+
+
+def _rebuild_deferred_indexes(cursor, suffix: str = '') -> None:
+    by_table: dict[str, list[str]] = {}
+    for table, index, definition in _BULK_DEFERRED_INDEXES:
+        if not _index_exists(cursor, table + suffix, index):
+            by_table.setdefault(table + suffix, []).append(f"ADD {definition}")
+    # One ALTER per table so each table is rebuilt once.
+    for table, clauses in by_table.items():
+        cursor.execute(f"ALTER TABLE `{table}` " + ', '.join(clauses))
+
+
+def run_bulk_import(path: str = INPUT_FILE, workers: int = 0, batch_size: int = BATCH_SIZE,
+                    spool_dir: str = None):
+    """Import via TSV spool files + LOAD DATA LOCAL INFILE.
+
+    Loads into the shadow tables like run_import. Their secondary and FULLTEXT
+    indexes are dropped before the load and rebuilt once afterwards, with
+    unique/foreign key checks disabled for the session. Requires local_infile=ON
+    on the server.
     """
-    sql_kanji = """
-        INSERT IGNORE INTO entry_kanji (entry_id, kanji_text, is_common)
-        VALUES (%s, %s, %s)
+    if not os.path.exists(path):
+        print(f"Không tìm thấy file '{path}' trong thư mục.")
+        return
+
+    workers = workers or _default_workers()
+    own_spool_dir = spool_dir is None
+    spool_dir = spool_dir or tempfile.mkdtemp(prefix='gakuroku_import_')
+    os.makedirs(spool_dir, exist_ok=True)
+    timings: dict[str, float] = {}
+    count = 0
+
+    # 1) Parse + spool: rows are built in worker processes and appended to one TSV per table.
+    print(f"Parsing '{path}' into spool files in {spool_dir} ({workers} parse workers)...")
+    started = time.perf_counter()
+    spool_time = 0.0
+    files = {
+        table: open(os.path.join(spool_dir, filename), 'w', encoding='utf-8', newline='\n')
+        for table, filename, _, _ in _BULK_TABLES
+    }
+    builders = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    pending: deque = deque()
+
+    def spool(batch: _RowBatch) -> None:
+        nonlocal count, spool_time
+        t0 = time.perf_counter()
+        for table, rows in (('entries', batch.entries), ('entry_kanji', batch.kanji),
+                            ('entry_reading', batch.reading), ('entry_definitions', batch.defs),
+                            ('entry_gloss_tokens', batch.tokens), ('entry_chars', batch.chars)):
+            files[table].writelines(_spool_line(row) for row in rows)
+        spool_time += time.perf_counter() - t0
+        count += len(batch.entries)
+
+    try:
+        for chunk in _chunked(iter_word_texts(path), batch_size):
+            if builders is None:
+                spool(_build_rows(chunk))
+                continue
+            pending.append(builders.submit(_build_rows, chunk))
+            while len(pending) > workers * 2:
+                spool(pending.popleft().result())
+        while pending:
+            spool(pending.popleft().result())
+    finally:
+        if builders is not None:
+            builders.shutdown(cancel_futures=True)
+        for f in files.values():
+            f.close()
+    timings['parse'] = time.perf_counter() - started - spool_time
+    timings['spool'] = spool_time
+    print(f"   -> Spooled {count} entries.")
+
+    conn = mysql.connector.connect(
+        **DB_CONFIG,
+        allow_local_infile=True,
+        allow_local_infile_in_path=spool_dir,
+    )
+    cursor = conn.cursor()
+    try:
+        print("Preparing shadow tables (entries / kanji / reading / definitions / gloss tokens / chars)...")
+        setup_database()
+        _prepare_shadow_tables(cursor)
+        conn.commit()
+
+        cursor.execute("SET SESSION unique_checks = 0")
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        _drop_deferred_indexes(cursor, SHADOW_SUFFIX)
+
+        # 2) Load
+        started = time.perf_counter()
+        try:
+            for table, filename, duplicates, columns in _BULK_TABLES:
+                t0 = time.perf_counter()
+                cursor.execute(
+                    f"""
+                    LOAD DATA LOCAL INFILE %s {duplicates} INTO TABLE `{table}{SHADOW_SUFFIX}`
+                    CHARACTER SET utf8mb4
+                    FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+                    LINES TERMINATED BY '\\n'
+                    ({', '.join(columns)})
+                    """,
+                    (os.path.join(spool_dir, filename),),
+                )
+                conn.commit()
+                print(f"   -> Loaded {table} in {time.perf_counter() - t0:.2f}s")
+        finally:
+            timings['load'] = time.perf_counter() - started
+
+            # 3) Index build (also after a failed load, so the schema is left intact)
+            started = time.perf_counter()
+            _rebuild_deferred_indexes(cursor, SHADOW_SUFFIX)
+            timings['index build'] = time.perf_counter() - started
+
+            cursor.execute("SET SESSION unique_checks = 1")
+            cursor.execute("SET SESSION foreign_key_checks = 1")
+
+        total = sum(timings.values())
+        rate = (count / total) if total > 0 else 0
+        print(f"Imported {count} words in {total:.2f} seconds (~{rate:,.0f} words/second).")
+        for phase, seconds in timings.items():
+            print(f"   {phase:<12} {seconds:8.2f}s")
+
+        _verify_and_swap(conn, cursor, count)
+    finally:
+        cursor.close()
+        conn.close()
+        if own_spool_dir:
+            shutil.rmtree(spool_dir, ignore_errors=True)
+
+
+# --- Delta import ---
+
+SQL_ENTRIES_UPSERT = SQL_ENTRIES.format(suffix='') + """
+    ON DUPLICATE KEY UPDATE
+        primary_headword = VALUES(primary_headword),
+        raw_json = VALUES(raw_json),
+        word_data = VALUES(word_data),
+        content_hash = VALUES(content_hash)
+"""
+DELTA_BATCH_SIZE = 500
+
+
+def _hash_words(word_texts: list[str]) -> list[tuple[str, str]]:
+    """Worker entry point: JSON text of each word -> (id, content hash)."""
+    out = []
+    for text in word_texts:
+        word = json.loads(text)
+        out.append((str(word.get('id')), _content_hash(word)))
+    return out
+
+
+def _load_entry_hashes(cursor) -> dict[str, str]:
+    """id -> content hash for every stored entry.
+
+    Rows imported before content_hash existed are hashed from raw_json here, so
+    the first delta run after upgrading does not rewrite the whole dictionary.
     """
-    sql_reading = """
-        INSERT IGNORE INTO entry_reading (entry_id, reading_text)
-        VALUES (%s, %s)
+    cursor.execute(
+        """
+        SELECT id, content_hash, IF(content_hash IS NULL, raw_json, NULL)
+        FROM entries
+        """
+    )
+    hashes: dict[str, str] = {}
+    for entry_id, content_hash, raw_json in cursor.fetchall():
+        if content_hash is None:
+            content_hash = _content_hash(_parse_word_json(raw_json) or {})
+        hashes[str(entry_id)] = content_hash
+    return hashes
+
+
+def _apply_delta_batch(conn, cursor, batch: _RowBatch, replaced_ids: list[str]) -> None:
+    """Upsert one batch of added/changed words in its own transaction.
+
+    Entries are updated in place (never deleted) so flashcards keep pointing at
+    them; only the child rows of changed entries are deleted and rewritten.
     """
-    sql_defs = """
-        INSERT INTO entry_definitions (entry_id, gloss_text)
-        VALUES (%s, %s)
-        ON DUPLICATE KEY UPDATE gloss_text = VALUES(gloss_text)
+    if replaced_ids:
+        placeholders = ", ".join(["%s"] * len(replaced_ids))
+        for table in ENTRY_TABLES[1:]:
+            cursor.execute(f"DELETE FROM `{table}` WHERE entry_id IN ({placeholders})", tuple(replaced_ids))
+    cursor.executemany(SQL_ENTRIES_UPSERT, batch.entries)
+    if batch.kanji:
+        cursor.executemany(SQL_KANJI.format(suffix=''), batch.kanji)
+    if batch.reading:
+        cursor.executemany(SQL_READING.format(suffix=''), batch.reading)
+    if batch.defs:
+        cursor.executemany(SQL_DEFS.format(suffix=''), batch.defs)
+    if batch.tokens:
+        cursor.executemany(SQL_GLOSS_TOKENS.format(suffix=''), batch.tokens)
+    if batch.chars:
+        cursor.executemany(SQL_CHARS.format(suffix=''), batch.chars)
+    conn.commit()
+
+
+def _remove_entries(conn, cursor, entry_ids: list[str], batch_size: int) -> dict:
+    """Delete entries missing from the new release, keeping their flashcards.
+
+    As in a full reimport, a card on a removed entry is moved to the remaining
+    entry with the same primary headword (lowest id); cards with no such entry,
+    or whose list already has it, are the orphans deleted with the entry.
     """
+    removed = set(entry_ids)
+    remapped = 0
+    orphans: list[tuple[int, int, str]] = []
+    for start in range(0, len(entry_ids), batch_size):
+        chunk = tuple(entry_ids[start:start + batch_size])
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(
+            f"""
+            SELECT f.id, f.list_id, f.entry_id, e.primary_headword
+            FROM flashcards f
+            JOIN entries e ON e.id = f.entry_id
+            WHERE f.entry_id IN ({placeholders})
+            """,
+            chunk,
+        )
+        cards = cursor.fetchall()
+        if cards:
+            headwords = tuple({row[3] for row in cards})
+            cursor.execute(
+                f"SELECT primary_headword, id FROM entries WHERE primary_headword IN ({', '.join(['%s'] * len(headwords))})",
+                headwords,
+            )
+            targets: dict[str, str] = {}
+            for headword, entry_id in cursor.fetchall():
+                entry_id = str(entry_id)
+                if entry_id not in removed and (headword not in targets or entry_id < targets[headword]):
+                    targets[headword] = entry_id
+            for flashcard_id, list_id, entry_id, headword in cards:
+                target = targets.get(headword)
+                if target is not None:
+                    # IGNORE: the list may already have a card for the target entry.
+                    cursor.execute("UPDATE IGNORE flashcards SET entry_id = %s WHERE id = %s", (target, flashcard_id))
+                if target is not None and cursor.rowcount:
+                    remapped += 1
+                else:
+                    orphans.append((int(flashcard_id), int(list_id), str(entry_id)))
+        # Child rows and the orphaned flashcards go with ON DELETE CASCADE.
+        cursor.execute(f"DELETE FROM entries WHERE id IN ({placeholders})", chunk)
+        conn.commit()
+    return {"remapped": remapped, "orphans": orphans}
 
-    batch_entries: list[tuple] = []
-    batch_kanji: list[tuple] = []
-    batch_reading: list[tuple] = []
-    batch_defs: list[tuple] = []
-    count = 0
-    start_time = time.time()
 
-    BATCH_SIZE = 2000
+def run_delta_import(path: str = INPUT_FILE, workers: int = 0, batch_size: int = DELTA_BATCH_SIZE) -> dict:
+    """Apply only the differences between the JMdict file and the database.
 
-    for word in words_list:
-        w_id = word.get('id')
+    Every word is hashed (in `workers` processes) and compared with
+    entries.content_hash; added and changed words are written and removed ones
+    deleted, in transactions of `batch_size` entries. Unchanged entries are not
+    touched, so a weekly release costs seconds of write traffic.
+    """
+    summary = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+    if not os.path.exists(path):
+        print(f"Không tìm thấy file '{path}' trong thư mục.")
+        return summary
 
-        primary_headword = _extract_primary_headword(word)
-        raw_json = json.dumps(word, ensure_ascii=False)
-        batch_entries.append((w_id, primary_headword, raw_json))
+    workers = workers or _default_workers()
+    setup_database()
 
-        # Kanji spellings (all)
-        kanji_seen: set[str] = set()
-        for k in word.get('kanji') or []:
-            txt = (k or {}).get('text')
-            if not txt or txt in kanji_seen:
-                continue
-            kanji_seen.add(txt)
-            common = 1 if (k or {}).get('common') else 0
-            batch_kanji.append((w_id, txt, common))
-
-        # Readings (all)
-        reading_seen: set[str] = set()
-        for r in word.get('kana') or []:
-            txt = (r or {}).get('text')
-            if not txt or txt in reading_seen:
-                continue
-            reading_seen.add(txt)
-            batch_reading.append((w_id, txt))
-
-        # Definitions (flattened English gloss)
-        gloss_text = _extract_gloss_text(word)
-        batch_defs.append((w_id, gloss_text))
-
-        count += 1
-
-        if len(batch_entries) >= BATCH_SIZE:
-            cursor.executemany(sql_entries, batch_entries)
-            if batch_kanji:
-                cursor.executemany(sql_kanji, batch_kanji)
-            if batch_reading:
-                cursor.executemany(sql_reading, batch_reading)
-            if batch_defs:
-                cursor.executemany(sql_defs, batch_defs)
+    conn = get_connection()
+    cursor = conn.cursor()
+    started = time.perf_counter()
+    try:
+        stored = _load_entry_hashes(cursor)
+        print(f"Loaded {len(stored)} stored entry hashes; comparing with '{path}'...")
+
+        pending_texts: list[str] = []
+        pending_replaced: list[str] = []
+
+        def flush() -> None:
+            if pending_texts:
+                _apply_delta_batch(conn, cursor, _build_rows(pending_texts), pending_replaced)
+                pending_texts.clear()
+                pending_replaced.clear()
+
+        def compare(word_texts: list[str], hashes: list[tuple[str, str]]) -> None:
+            for text, (entry_id, content_hash) in zip(word_texts, hashes):
+                old_hash = stored.pop(entry_id, None)
+                if old_hash == content_hash:
+                    summary["unchanged"] += 1
+                    continue
+                if old_hash is None:
+                    summary["added"] += 1
+                else:
+                    summary["changed"] += 1
+                    pending_replaced.append(entry_id)
+                pending_texts.append(text)
+                if len(pending_texts) >= batch_size:
+                    flush()
+
+        chunks = _chunked(iter_word_texts(path), BATCH_SIZE)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as hashers:
+                in_flight: deque = deque()
+                for chunk in chunks:
+                    in_flight.append((chunk, hashers.submit(_hash_words, chunk)))
+                    if len(in_flight) >= workers * 2:
+                        chunk, future = in_flight.popleft()
+                        compare(chunk, future.result())
+                while in_flight:
+                    chunk, future = in_flight.popleft()
+                    compare(chunk, future.result())
+        else:
+            for chunk in chunks:
+                compare(chunk, _hash_words(chunk))
+        flush()
+
+        # Whatever was not seen in the file has been dropped from JMdict.
+        removed_ids = list(stored)
+        summary["removed"] = len(removed_ids)
+        flashcards = _remove_entries(conn, cursor, removed_ids, batch_size)
+
+        if summary["added"] or summary["changed"] or summary["removed"]:
+            bump_dictionary_version(cursor)
             conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    duration = time.perf_counter() - started
+    print(
+        f"Delta import finished in {duration:.2f}s: "
+        f"{summary['added']} added, {summary['changed']} changed, "
+        f"{summary['removed']} removed, {summary['unchanged']} unchanged."
+    )
+    if removed_ids:
+        _print_flashcard_report(flashcards)
+    return summary
+
+
+# --- SQLite dictionary file ---
+#
+# A self-contained, read-only copy of the dictionary for SEARCH_ENGINE=sqlite
+# (services.sqlite_dictionary): same rows as the MySQL import, no server needed.
+
+def run_sqlite_export(path: str = INPUT_FILE, out_path: str = 'jmdict.sqlite3',
+                      batch_size: int = BATCH_SIZE) -> int:
+    """Build the SQLite dictionary file from the JMdict JSON; returns the entry count.
+
+    Written to <out_path>.tmp and renamed into place, so processes that have the
+    previous file open keep reading a consistent copy.
+    """
+    tmp_path = out_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    start = time.time()
+    conn = sqlite3.connect(tmp_path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    count = 0
+    version = hashlib.sha1()
+    try:
+        for statement in SQLITE_SCHEMA:
+            conn.execute(statement)
 
-            batch_entries, batch_kanji, batch_reading, batch_defs = [], [], [], []
-            print(f"   -> Imported {count}/{total_words} entries...")
-
-    if batch_entries:
-        cursor.executemany(sql_entries, batch_entries)
-        if batch_kanji:
-            cursor.executemany(sql_kanji, batch_kanji)
-        if batch_reading:
-            cursor.executemany(sql_reading, batch_reading)
-        if batch_defs:
-            cursor.executemany(sql_defs, batch_defs)
+        hashes: list[tuple[str, str]] = []
+        for chunk in _chunked(iter_word_texts(path), batch_size):
+            batch = _build_rows(chunk)
+            common = {entry_id for entry_id, _, is_common in batch.kanji if is_common}
+            conn.executemany(
+                "INSERT OR IGNORE INTO entries (id, primary_headword, headword_key, is_common, word_data)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(w_id, headword, fold_collation(headword), 1 if w_id in common else 0, word_data)
+                 for w_id, headword, _, word_data, _ in batch.entries],
+            )
+            hashes.extend((w_id, content_hash) for w_id, _, _, _, content_hash in batch.entries)
+            conn.executemany(
+                "INSERT OR IGNORE INTO entry_kanji (form, entry_id, text) VALUES (?, ?, ?)",
+                [(fold_collation(txt), w_id, txt) for w_id, txt, _ in batch.kanji],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO entry_reading (form, entry_id, text) VALUES (?, ?, ?)",
+                [(fold_collation(txt), w_id, txt) for w_id, txt, _ in batch.reading],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO entry_reading_norm (reading_norm, entry_id) VALUES (?, ?)",
+                [(norm, w_id) for w_id, _, norm in batch.reading],
+            )
+            term_rows = []
+            for w_id, gloss_text in batch.defs:
+                gloss_key = fold_collation(gloss_text)
+                conn.execute(
+                    "INSERT OR REPLACE INTO entry_definitions (entry_id, gloss, gloss_key) VALUES (?, ?, ?)",
+                    (w_id, gloss_text, gloss_key),
+                )
+                tf: dict[str, int] = {}
+                for term in _TOKEN_RE.findall(gloss_key):
+                    tf[term] = tf.get(term, 0) + 1
+                term_rows.extend((term, w_id, n) for term, n in tf.items())
+            conn.executemany("INSERT OR REPLACE INTO gloss_terms (term, entry_id, tf) VALUES (?, ?, ?)", term_rows)
+            conn.executemany("INSERT OR IGNORE INTO entry_chars (ch, entry_id) VALUES (?, ?)", batch.chars)
+            count += len(batch.entries)
+            if count % (batch_size * 10) == 0:
+                print(f"   -> Exported {count} entries...")
+
+        print("Building search indexes...")
+        conn.execute("INSERT INTO gloss_fts (gloss_fts) VALUES ('rebuild')")
+        conn.execute("INSERT INTO gloss_vocab (term, df) SELECT term, COUNT(*) FROM gloss_terms GROUP BY term")
+
+        # Same data -> same version, whichever order the file lists the words in.
+        for w_id, content_hash in sorted(hashes):
+            version.update(f"{w_id}:{content_hash}\n".encode('utf-8'))
+        entry_count = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        conn.executemany(
+            "INSERT INTO dictionary_meta (meta_key, meta_value) VALUES (?, ?)",
+            [('format_version', SQLITE_FORMAT_VERSION),
+             ('dictionary_version', version.hexdigest()),
+             ('entry_count', str(entry_count))],
+        )
         conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
 
-    cursor.execute("SELECT COUNT(*) FROM entries")
-    imported_count = cursor.fetchone()[0]
+    os.replace(tmp_path, out_path)
+    print(f"SQLite dictionary written to {out_path}: {count} entries in {time.time() - start:.2f}s.")
+    return count
 
-    duration = time.time() - start_time
-    rate = (count / duration) if duration > 0 else 0
-    print(f"Imported {count} words in {duration:.2f} seconds (~{rate:,.0f} words/second).")
-    print(f"Check in DB: {imported_count}/{total_words} records.")
-    if imported_count != total_words:
-        print(" Warning: number of records in DB does not match number of words in file.")
-    
-    cursor.close()
-    conn.close()
\ No newline at end of file
+
+def write_dictionary_snapshot(path: str = DICTIONARY_SNAPSHOT) -> str:
+    """Write the search index snapshot for the current database and register its
+    checksum in dictionary_meta, so workers can tell it is up to date."""
+    start = time.time()
+    version = get_dictionary_version()
+    print(f"Building dictionary snapshot for version {version}...")
+    index = DictionaryIndex.from_mysql()
+    if get_dictionary_version() != version:
+        raise RuntimeError("The dictionary changed while the snapshot was built; run --snapshot-only again")
+    checksum = write_snapshot(index, path, version)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        set_dictionary_meta(cursor, SNAPSHOT_CHECKSUM_KEY, checksum)
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    size_mb = os.path.getsize(path) / (1 << 20)
+    print(f"Snapshot written to {path}: {len(index)} entries, {size_mb:.1f} MB in {time.time() - start:.2f}s.")
+    return checksum
+
+
+def backfill_word_data(batch_size: int = 2000) -> int:
+    """Fill entries.word_data for rows imported before the column existed."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    updated = 0
+    try:
+        while True:
+            cursor.execute(
+                "SELECT id, raw_json FROM entries WHERE word_data IS NULL LIMIT %s",
+                (batch_size,),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            batch = []
+            for entry_id, raw_json in rows:
+                word_obj = _parse_word_json(raw_json) or {}
+                batch.append((_word_data_json(word_obj, entry_id=entry_id), entry_id))
+            cursor.executemany("UPDATE entries SET word_data = %s WHERE id = %s", batch)
+            conn.commit()
+            updated += len(batch)
+            print(f"   -> Backfilled word_data for {updated} entries...")
+    finally:
+        cursor.close()
+        conn.close()
+    return updated
+
+
+def backfill_reading_norm(batch_size: int = 5000) -> int:
+    """Fill entry_reading.reading_norm for rows imported before the column existed."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    updated = 0
+    try:
+        while True:
+            cursor.execute(
+                "SELECT entry_id, reading_text FROM entry_reading WHERE reading_norm IS NULL LIMIT %s",
+                (batch_size,),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            cursor.executemany(
+                "UPDATE entry_reading SET reading_norm = %s WHERE entry_id = %s AND reading_text = %s",
+                [(normalize_reading(reading_text), entry_id, reading_text) for entry_id, reading_text in rows],
+            )
+            conn.commit()
+            updated += len(rows)
+            print(f"   -> Backfilled reading_norm for {updated} readings...")
+    finally:
+        cursor.close()
+        conn.close()
+    return updated
+
+
+def backfill_gloss_tokens(batch_size: int = 2000) -> int:
+    """Fill entry_gloss_tokens for databases imported before the table existed."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    done = 0
+    last_id = ''
+    try:
+        while True:
+            cursor.execute(
+                """
+                SELECT e.id, e.raw_json FROM entries e
+                WHERE e.id > %s
+                  AND NOT EXISTS (SELECT 1 FROM entry_gloss_tokens t WHERE t.entry_id = e.id)
+                ORDER BY e.id
+                LIMIT %s
+                """,
+                (last_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            token_rows = []
+            for entry_id, raw_json in rows:
+                token_rows.extend(_gloss_token_rows(entry_id, _extract_glosses(_parse_word_json(raw_json) or {})))
+            if token_rows:
+                cursor.executemany(SQL_GLOSS_TOKENS.format(suffix=''), token_rows)
+            conn.commit()
+            last_id = rows[-1][0]
+            done += len(rows)
+            print(f"   -> Indexed gloss words of {done} entries...")
+    finally:
+        cursor.close()
+        conn.close()
+    return done
+
+
+def backfill_entry_chars(batch_size: int = 2000) -> int:
+    """Fill entry_chars for databases imported before the table existed."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    done = 0
+    last_id = ''
+    try:
+        while True:
+            cursor.execute(
+                """
+                SELECT k.entry_id, GROUP_CONCAT(k.kanji_text SEPARATOR '')
+                FROM entry_kanji k
+                WHERE k.entry_id > %s
+                GROUP BY k.entry_id
+                ORDER BY k.entry_id
+                LIMIT %s
+                """,
+                (last_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            char_rows = [(ch, entry_id) for entry_id, forms in rows for ch in kanji_chars(forms or '')]
+            if char_rows:
+                cursor.executemany(SQL_CHARS.format(suffix=''), char_rows)
+            conn.commit()
+            last_id = rows[-1][0]
+            done += len(rows)
+            print(f"   -> Indexed kanji of {done} entries...")
+    finally:
+        cursor.close()
+        conn.close()
+    return done
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import JMdict JSON into MySQL")
+    parser.add_argument("--file", default=INPUT_FILE, help="jmdict-simplified JSON file")
+    parser.add_argument("--workers", type=int, default=0, help="row-building processes (default: CPU count)")
+    parser.add_argument("--writers", type=int, default=4, help="parallel insert connections")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="spool TSV files and LOAD DATA LOCAL INFILE with deferred index builds",
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="only write entries that were added, changed or removed since the last import",
+    )
+    parser.add_argument("--spool-dir", default=None, help="keep --bulk spool files in this directory")
+    parser.add_argument(
+        "--backfill-word-data",
+        action="store_true",
+        help="only fill entries.word_data for an existing import",
+    )
+    parser.add_argument(
+        "--backfill-reading-norm",
+        action="store_true",
+        help="only fill entry_reading.reading_norm for an existing import",
+    )
+    parser.add_argument(
+        "--backfill-gloss-tokens",
+        action="store_true",
+        help="only fill entry_gloss_tokens for an existing import",
+    )
+    parser.add_argument(
+        "--backfill-entry-chars",
+        action="store_true",
+        help="only fill entry_chars for an existing import",
+    )
+    parser.add_argument(
+        "--sqlite",
+        metavar="PATH",
+        default=None,
+        help="build a read-only SQLite dictionary file (SEARCH_ENGINE=sqlite) instead of importing into MySQL",
+    )
+    parser.add_argument(
+        "--snapshot",
+        metavar="PATH",
+        default=None,
+        help="after importing, write the binary search index snapshot workers map at startup",
+    )
+    parser.add_argument(
+        "--snapshot-only",
+        action="store_true",
+        help="only write the snapshot (to --snapshot PATH or DICTIONARY_SNAPSHOT) for the current database",
+    )
+    args = parser.parse_args()
+
+    if args.snapshot_only:
+        write_dictionary_snapshot(args.snapshot or DICTIONARY_SNAPSHOT)
+    elif args.backfill_word_data:
+        backfill_word_data()
+    elif args.backfill_reading_norm:
+        backfill_reading_norm()
+    elif args.backfill_gloss_tokens:
+        backfill_gloss_tokens()
+    elif args.backfill_entry_chars:
+        backfill_entry_chars()
+    elif args.sqlite:
+        run_sqlite_export(args.file, args.sqlite, batch_size=args.batch_size)
+    else:
+        if args.delta:
+            run_delta_import(args.file, workers=args.workers)
+        elif args.bulk:
+            run_bulk_import(args.file, workers=args.workers, batch_size=args.batch_size, spool_dir=args.spool_dir)
+        else:
+            run_import(args.file, workers=args.workers, writers=args.writers, batch_size=args.batch_size)
+        if args.snapshot:
+            write_dictionary_snapshot(args.snapshot)
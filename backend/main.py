@@ -1,10 +1,19 @@
 # backend/main.py
+import asyncio
 import logging
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from db_config import setup_database
+from db_async import async_pool_stats, close_async_pool
+from db_config import close_pool, pool_stats, setup_database
+from services.bm25 import load_bm25_index
+from services.dictionary_index import load_dictionary_index
+from services.search import SEARCH_ENGINE, SEARCH_ENGLISH, detect_gloss_index
+from services.search_cache import ranking_cache_stats, search_cache_stats
+from services.sqlite_dictionary import get_sqlite_dictionary
+from services.study_log_buffer import get_study_log_buffer, study_log_buffer_stats
+from services.suggest import get_suggest_index
 from dotenv import load_dotenv
 import os
 
@@ -18,12 +27,42 @@ load_dotenv()
 logger = logging.getLogger("gakuroku")
 logging.basicConfig(level=logging.INFO)
 
+def _warm_suggest_index() -> None:
+    try:
+        get_suggest_index()
+    except Exception as e:
+        logger.warning("Failed to build suggest index: %s", e)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    logger.info("Starting up... setting up database")
-    setup_database()
+    if SEARCH_ENGINE == "sqlite":
+        # Search, suggestions and BM25 read the dictionary file; lists / flashcards still need MySQL.
+        logger.info("Starting up... search served from the SQLite dictionary file")
+        get_sqlite_dictionary()
+    else:
+        logger.info("Starting up... setting up database")
+        setup_database()
+        detect_gloss_index()
+    if SEARCH_ENGINE == "memory":
+        try:
+            load_dictionary_index()
+        except Exception as e:
+            logger.warning("Failed to load in-memory dictionary index, using MySQL search: %s", e)
+    if SEARCH_ENGLISH == "bm25":
+        try:
+            load_bm25_index()
+        except Exception as e:
+            logger.warning("Failed to load BM25 index, English search stays on %s: %s", SEARCH_ENGINE, e)
+    # Build the autocomplete index in the background; early /suggest calls wait for it.
+    asyncio.get_running_loop().run_in_executor(None, _warm_suggest_index)
+    get_study_log_buffer().start()
     yield
     logger.info("Shutting down...")
+    # Write the buffered review counts while the pool is still open.
+    await get_study_log_buffer().stop()
+    await close_async_pool()
+    close_pool()
 
 app = FastAPI(
     title="Gakuroku API",
@@ -57,3 +96,14 @@ def read_root():
         "status": "running",
         "db_host": os.getenv("DB_HOST") # Test .env 
     }
+
+
+@app.get("/api/metrics")
+def read_metrics():
+    return {
+        "db_pool": pool_stats(),
+        "db_async_pool": async_pool_stats(),
+        "search_cache": search_cache_stats(),
+        "search_ranking_cache": ranking_cache_stats(),
+        "study_log_buffer": study_log_buffer_stats(),
+    }
@@ -4,9 +4,25 @@ from datetime import date
 import mysql.connector
 from fastapi import APIRouter, HTTPException
 
-from db_config import increment_study_log
-from schemas import FlashcardCreateSchema, FlashcardResponseSchema, FlashcardUpdateSchema
-from services.flashcard_service import create_flashcard, delete_flashcard, update_flashcard
+from schemas import (
+    FlashcardBulkCreateSchema,
+    FlashcardBulkResponseSchema,
+    FlashcardCreateSchema,
+    FlashcardResponseSchema,
+    FlashcardReviewBatchResponseSchema,
+    FlashcardReviewBatchSchema,
+    FlashcardReviewSchema,
+    FlashcardUpdateSchema,
+)
+from services.flashcard_service import (
+    add_flashcards_bulk_async,
+    create_flashcard_async,
+    delete_flashcard_async,
+    review_flashcard_async,
+    review_flashcards_async,
+    update_flashcard_async,
+)
+from services.study_log_buffer import record_reviews
 
 logger = logging.getLogger("gakuroku")
 
@@ -14,9 +30,9 @@ router = APIRouter(prefix="/api/flashcards", tags=["Flashcards"])
 
 
 @router.post("", response_model=FlashcardResponseSchema)
-def api_create_flashcard(payload: FlashcardCreateSchema):
+async def api_create_flashcard(payload: FlashcardCreateSchema):
     try:
-        return create_flashcard(payload.list_id, payload.entry_id, payload.note)
+        return await create_flashcard_async(payload.list_id, payload.entry_id, payload.note)
     except mysql.connector.IntegrityError as e:
         msg = str(e).lower()
         if "unique" in msg or "duplicate" in msg:
@@ -27,14 +43,42 @@ def api_create_flashcard(payload: FlashcardCreateSchema):
         raise HTTPException(status_code=503, detail="Database connection error")
 
 
+@router.post("/bulk", response_model=FlashcardBulkResponseSchema)
+async def api_create_flashcards_bulk(payload: FlashcardBulkCreateSchema):
+    """Add many entries to a list at once; reports duplicates and unknown entry ids."""
+    try:
+        report = await add_flashcards_bulk_async(payload.list_id, payload.entry_ids, payload.note)
+        if report is None:
+            raise HTTPException(status_code=404, detail="List not found")
+        return report
+    except mysql.connector.IntegrityError:
+        raise HTTPException(status_code=400, detail="Invalid list_id")
+    except mysql.connector.Error as e:
+        logger.exception("Database error in POST /api/flashcards/bulk: %s", e)
+        raise HTTPException(status_code=503, detail="Database connection error")
+
+
+@router.post("/reviews", response_model=FlashcardReviewBatchResponseSchema, response_model_exclude_none=True)
+async def api_review_flashcards(payload: FlashcardReviewBatchSchema):
+    """Submit a study session's reviews at once: one transaction, one study log update."""
+    try:
+        return await review_flashcards_async(
+            [(review.flashcard_id, review.grade) for review in payload.reviews],
+            include_word_data=payload.include_word_data,
+        )
+    except mysql.connector.Error as e:
+        logger.exception("Database error in POST /api/flashcards/reviews: %s", e)
+        raise HTTPException(status_code=503, detail="Database connection error")
+
+
 @router.patch("/{flashcard_id}", response_model=FlashcardResponseSchema)
-def api_update_flashcard(flashcard_id: int, payload: FlashcardUpdateSchema):
+async def api_update_flashcard(flashcard_id: int, payload: FlashcardUpdateSchema):
     try:
-        updated = update_flashcard(flashcard_id, payload.is_memorized, payload.note)
+        updated = await update_flashcard_async(flashcard_id, payload.is_memorized, payload.note)
         if updated is None:
             raise HTTPException(status_code=404, detail="Flashcard not found")
         try:
-            increment_study_log(date.today())
+            await record_reviews(date.today())
         except Exception as e:
             logger.warning("Failed to increment study log: %s", e)
         return updated
@@ -43,10 +87,26 @@ def api_update_flashcard(flashcard_id: int, payload: FlashcardUpdateSchema):
         raise HTTPException(status_code=503, detail="Database connection error")
 
 
+@router.post("/{flashcard_id}/review", response_model=FlashcardResponseSchema)
+async def api_review_flashcard(flashcard_id: int, payload: FlashcardReviewSchema):
+    try:
+        reviewed = await review_flashcard_async(flashcard_id, payload.grade)
+        if reviewed is None:
+            raise HTTPException(status_code=404, detail="Flashcard not found")
+        try:
+            await record_reviews(date.today())
+        except Exception as e:
+            logger.warning("Failed to increment study log: %s", e)
+        return reviewed
+    except mysql.connector.Error as e:
+        logger.exception("Database error in POST /api/flashcards/%s/review: %s", flashcard_id, e)
+        raise HTTPException(status_code=503, detail="Database connection error")
+
+
 @router.delete("/{flashcard_id}")
-def api_delete_flashcard(flashcard_id: int):
+async def api_delete_flashcard(flashcard_id: int):
     try:
-        deleted = delete_flashcard(flashcard_id)
+        deleted = await delete_flashcard_async(flashcard_id)
         if not deleted:
             raise HTTPException(status_code=404, detail="Flashcard not found")
         return {"deleted": True}
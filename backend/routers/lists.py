@@ -1,11 +1,26 @@
 import logging
+from typing import Literal, Optional
 
 import mysql.connector
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
-from schemas import FlashcardResponseSchema, ListCreateSchema, ListResponseSchema, ListUpdateSchema
-from services.flashcard_service import get_flashcards_by_list
-from services.list_service import create_list, delete_list, get_lists, update_list
+from schemas import (
+    FlashcardPageSchema,
+    FlashcardResponseSchema,
+    ListCreateSchema,
+    ListResponseSchema,
+    ListUpdateSchema,
+)
+from services.flashcard_service import (
+    MAX_PAGE_SIZE,
+    get_due_flashcards_async,
+    get_flashcards_by_list_async,
+    get_flashcards_page_async,
+    probe_flashcards_stream,
+    stream_flashcards_ndjson,
+)
+from services.list_service import create_list_async, delete_list_async, get_lists_async, update_list_async
 
 logger = logging.getLogger("gakuroku")
 
@@ -13,27 +28,27 @@ router = APIRouter(prefix="/api/lists", tags=["Lists"])
 
 
 @router.get("", response_model=list[ListResponseSchema])
-def api_get_lists():
+async def api_get_lists():
     try:
-        return get_lists()
+        return await get_lists_async()
     except mysql.connector.Error as e:
         logger.exception("Database error in GET /api/lists: %s", e)
         raise HTTPException(status_code=503, detail="Database connection error")
 
 
 @router.post("", response_model=ListResponseSchema)
-def api_create_list(payload: ListCreateSchema):
+async def api_create_list(payload: ListCreateSchema):
     try:
-        return create_list(payload.name)
+        return await create_list_async(payload.name)
     except mysql.connector.Error as e:
         logger.exception("Database error in POST /api/lists: %s", e)
         raise HTTPException(status_code=503, detail="Database connection error")
 
 
 @router.patch("/{list_id}", response_model=ListResponseSchema)
-def api_update_list(list_id: int, payload: ListUpdateSchema):
+async def api_update_list(list_id: int, payload: ListUpdateSchema):
     try:
-        updated = update_list(list_id, payload.name, payload.description)
+        updated = await update_list_async(list_id, payload.name, payload.description)
         if updated is None:
             raise HTTPException(status_code=404, detail="List not found")
         return updated
@@ -43,9 +58,9 @@ def api_update_list(list_id: int, payload: ListUpdateSchema):
 
 
 @router.delete("/{list_id}")
-def api_delete_list(list_id: int):
+async def api_delete_list(list_id: int):
     try:
-        deleted = delete_list(list_id)
+        deleted = await delete_list_async(list_id)
         if not deleted:
             raise HTTPException(status_code=404, detail="List not found")
         return {"deleted": True}
@@ -55,9 +70,48 @@ def api_delete_list(list_id: int):
 
 
 @router.get("/{list_id}/flashcards", response_model=list[FlashcardResponseSchema])
-def api_get_flashcards(list_id: int):
+async def api_get_flashcards(list_id: int):
     try:
-        return get_flashcards_by_list(list_id)
+        return await get_flashcards_by_list_async(list_id)
     except mysql.connector.Error as e:
         logger.exception("Database error in GET /api/lists/%s/flashcards: %s", list_id, e)
         raise HTTPException(status_code=503, detail="Database connection error")
+
+
+@router.get("/{list_id}/flashcards/page", response_model=FlashcardPageSchema, response_model_exclude_none=True)
+async def api_get_flashcards_page(
+    list_id: int,
+    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    word_data: Literal["full", "slim", "none"] = "full",
+):
+    """Keyset-paginated cards, newest first: pass the previous page's `next_cursor`.
+    `word_data=slim` returns headword, reading and first-sense glosses; `none` omits it."""
+    try:
+        return await get_flashcards_page_async(list_id, limit, cursor, word_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except mysql.connector.Error as e:
+        logger.exception("Database error in GET /api/lists/%s/flashcards/page: %s", list_id, e)
+        raise HTTPException(status_code=503, detail="Database connection error")
+
+
+@router.get("/{list_id}/flashcards/stream")
+async def api_stream_flashcards(list_id: int, word_data: Literal["full", "slim", "none"] = "full"):
+    """All cards of a list as NDJSON (one card per line), newest first, streamed as rows arrive."""
+    try:
+        await probe_flashcards_stream(list_id)
+    except mysql.connector.Error as e:
+        logger.exception("Database error in GET /api/lists/%s/flashcards/stream: %s", list_id, e)
+        raise HTTPException(status_code=503, detail="Database connection error")
+    return StreamingResponse(stream_flashcards_ndjson(list_id, word_data), media_type="application/x-ndjson")
+
+
+@router.get("/{list_id}/flashcards/due", response_model=list[FlashcardResponseSchema])
+async def api_get_due_flashcards(list_id: int, limit: int = Query(default=20, ge=1, le=200)):
+    """The next `limit` cards due for review, most overdue first (new cards are due at once)."""
+    try:
+        return await get_due_flashcards_async(list_id, limit)
+    except mysql.connector.Error as e:
+        logger.exception("Database error in GET /api/lists/%s/flashcards/due: %s", list_id, e)
+        raise HTTPException(status_code=503, detail="Database connection error")
@@ -1,10 +1,24 @@
 import logging
+from typing import Optional
 
 import mysql.connector
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 
-from schemas import WordSchema
-from services.search import search_entries
+from schemas import (
+    SearchBatchRequestSchema,
+    SearchBatchResultSchema,
+    SearchPageSchema,
+    SuggestionSchema,
+    WordSchema,
+)
+from services.search import (
+    find_prefix_words_async,
+    search_contains_async,
+    search_entries_async,
+    search_entries_batch_async,
+    search_page_async,
+)
+from services.suggest import MAX_SUGGESTIONS, suggest_async
 
 logger = logging.getLogger("gakuroku")
 
@@ -12,11 +26,90 @@ router = APIRouter(prefix="/api/search", tags=["Search"])
 
 
 @router.get("", response_model=list[WordSchema])
-def api_search(keyword: str):
+async def api_search(
+    keyword: str,
+    limit: int = Query(default=10, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+):
     try:
-        return search_entries(keyword)
+        if offset:
+            # Deeper pages are slices of the cached ranking, not a new ranking query.
+            return (await search_page_async(keyword, limit, offset))["items"]
+        return await search_entries_async(keyword, limit)
     except mysql.connector.Error as e:
         logger.exception("Database error in /api/search: %s", e)
         raise HTTPException(status_code=503, detail="Database connection error")
     except Exception:
         raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/page", response_model=SearchPageSchema)
+async def api_search_page(
+    keyword: str,
+    limit: int = Query(default=10, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = None,
+):
+    """Paginated search: use `offset`, or the `next_cursor` of the previous page."""
+    try:
+        return await search_page_async(keyword, limit, offset, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except mysql.connector.Error as e:
+        logger.exception("Database error in /api/search/page: %s", e)
+        raise HTTPException(status_code=503, detail="Database connection error")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/suggest", response_model=list[SuggestionSchema])
+async def api_search_suggest(prefix: str, limit: int = Query(default=10, ge=1, le=MAX_SUGGESTIONS)):
+    """Autocomplete: headwords, readings and gloss words starting with prefix, common and short first."""
+    try:
+        return await suggest_async(prefix, limit)
+    except mysql.connector.Error as e:
+        logger.exception("Database error in /api/search/suggest: %s", e)
+        raise HTTPException(status_code=503, detail="Database connection error")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/prefixes", response_model=list[WordSchema])
+async def api_search_prefixes(text: str, limit: int = Query(default=20, ge=1, le=100)):
+    """Words whose kanji or reading is a prefix of text (e.g. a pasted sentence), longest first."""
+    try:
+        return await find_prefix_words_async(text, limit)
+    except mysql.connector.Error as e:
+        logger.exception("Database error in /api/search/prefixes: %s", e)
+        raise HTTPException(status_code=503, detail="Database connection error")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/contains", response_model=list[WordSchema])
+async def api_search_contains(chars: str, limit: int = Query(default=20, ge=1, le=100)):
+    """Words whose kanji spelling contains every kanji of chars anywhere (食 -> 食事, 飲食, 給食)."""
+    try:
+        return await search_contains_async(chars, limit)
+    except mysql.connector.Error as e:
+        logger.exception("Database error in /api/search/contains: %s", e)
+        raise HTTPException(status_code=503, detail="Database connection error")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/batch", response_model=list[SearchBatchResultSchema])
+async def api_search_batch(payload: SearchBatchRequestSchema):
+    """Search many keywords (e.g. the tokens of a sentence) in one request; results keep the query order."""
+    try:
+        queries = [(q.keyword, q.limit) for q in payload.queries]
+        results = await search_entries_batch_async(queries)
+        return [
+            {"keyword": q.keyword, "results": words}
+            for q, words in zip(payload.queries, results)
+        ]
+    except mysql.connector.Error as e:
+        logger.exception("Database error in /api/search/batch: %s", e)
+        raise HTTPException(status_code=503, detail="Database connection error")
+    except Exception:
+        raise HTTPException(status_code=500, detail="Internal server error")
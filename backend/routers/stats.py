@@ -4,7 +4,7 @@ import mysql.connector
 from fastapi import APIRouter, HTTPException
 
 from schemas import HeatmapDaySchema, OverviewStatsSchema
-from services.stat_service import get_heatmap_stats_last_365_days, get_overview_stats
+from services.stat_service import get_heatmap_stats_last_365_days_async, get_overview_stats_async
 
 logger = logging.getLogger("gakuroku")
 
@@ -12,18 +12,18 @@ router = APIRouter(prefix="/api/stats", tags=["Stats"])
 
 
 @router.get("/heatmap", response_model=list[HeatmapDaySchema])
-def api_get_heatmap_stats():
+async def api_get_heatmap_stats():
     try:
-        return get_heatmap_stats_last_365_days()
+        return await get_heatmap_stats_last_365_days_async()
     except mysql.connector.Error as e:
         logger.exception("Database error in GET /api/stats/heatmap: %s", e)
         raise HTTPException(status_code=503, detail="Database connection error")
 
 
 @router.get("/overview", response_model=OverviewStatsSchema)
-def api_get_overview_stats():
+async def api_get_overview_stats():
     try:
-        return get_overview_stats()
+        return await get_overview_stats_async()
     except mysql.connector.Error as e:
         logger.exception("Database error in GET /api/stats/overview: %s", e)
         raise HTTPException(status_code=503, detail="Database connection error")
@@ -1,7 +1,8 @@
 # backend/schemas.py
 from __future__ import annotations
 
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Union
 
 from pydantic import BaseModel, ConfigDict, Field, RootModel
 
@@ -28,6 +29,32 @@ class SearchResponse(RootModel[List[WordSchema]]):
 
     pass
 
+
+class SuggestionSchema(BaseModel):
+    text: str
+    kind: str = Field(..., description="kanji, reading or gloss")
+    is_common: bool = False
+
+
+class SearchPageSchema(BaseModel):
+    items: List[WordSchema] = Field(default_factory=list)
+    next_cursor: Optional[str] = Field(default=None, description="Pass as `cursor` to get the next page")
+    total: int = Field(..., ge=0, description="Number of ranked results (capped)")
+
+
+class SearchBatchQuerySchema(BaseModel):
+    keyword: str = Field(min_length=1, max_length=200)
+    limit: int = Field(default=10, ge=1, le=100)
+
+
+class SearchBatchRequestSchema(BaseModel):
+    queries: List[SearchBatchQuerySchema] = Field(min_length=1, max_length=100)
+
+
+class SearchBatchResultSchema(BaseModel):
+    keyword: str
+    results: List[WordSchema] = Field(default_factory=list)
+
 # List - Flashcard
 
 
@@ -51,20 +78,111 @@ class FlashcardCreateSchema(BaseModel):
     note: Optional[str] = Field(default=None, max_length=2000)
 
 
+class FlashcardBulkCreateSchema(BaseModel):
+    list_id: int = Field(gt=0)
+    entry_ids: List[str] = Field(min_length=1, max_length=1000)
+    note: Optional[str] = Field(default=None, max_length=2000)
+
+
+class FlashcardBulkItemSchema(BaseModel):
+    entry_id: str
+    id: int = Field(..., description="Flashcard id")
+
+
+class FlashcardBulkDuplicateSchema(BaseModel):
+    entry_id: str
+    id: Optional[int] = Field(None, description="Flashcard id; null if the card was deleted meanwhile")
+
+
+class FlashcardBulkResponseSchema(BaseModel):
+    list_id: int
+    added: List[FlashcardBulkItemSchema] = Field(default_factory=list)
+    duplicates: List[FlashcardBulkDuplicateSchema] = Field(default_factory=list, description="Already in the list")
+    invalid: List[str] = Field(default_factory=list, description="Not dictionary entry ids")
+
+
 class FlashcardUpdateSchema(BaseModel):
     is_memorized: bool
     note: Optional[str] = Field(default=None, max_length=2000)
 
 
+class FlashcardReviewSchema(BaseModel):
+    grade: int = Field(..., ge=0, le=5, description="SM-2 recall grade: 0-2 forgotten, 3 hard, 4 good, 5 easy")
+
+
+class FlashcardWordSlimSchema(BaseModel):
+    kanji: Optional[str] = None
+    kana: str
+    is_common: bool = False
+    gloss: str = Field(..., description="Glosses of the first sense")
+
+
+class FlashcardListItemSchema(BaseModel):
+    id: int
+    list_id: int
+    entry_id: str
+    note: Optional[str] = None
+    is_memorized: bool
+    interval_days: int = 0
+    ease_factor: float = 2.5
+    repetitions: int = 0
+    lapses: int = 0
+    due_at: Optional[datetime] = None
+    last_reviewed_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    word_data: Optional[Union[WordSchema, FlashcardWordSlimSchema]] = None
+
+
+class FlashcardPageSchema(BaseModel):
+    items: List[FlashcardListItemSchema] = Field(default_factory=list)
+    next_cursor: Optional[str] = Field(default=None, description="Pass as `cursor` to get the next page")
+
+
+class FlashcardReviewItemSchema(BaseModel):
+    flashcard_id: int = Field(gt=0)
+    grade: int = Field(..., ge=0, le=5)
+
+
+class FlashcardReviewBatchSchema(BaseModel):
+    reviews: List[FlashcardReviewItemSchema] = Field(min_length=1, max_length=500)
+    include_word_data: bool = Field(default=False, description="Return full cards instead of schedule states")
+
+
 class FlashcardResponseSchema(BaseModel):
     id: int
     list_id: int
     entry_id: str
     note: Optional[str] = None
     is_memorized: bool
+    interval_days: int = 0
+    ease_factor: float = 2.5
+    repetitions: int = 0
+    lapses: int = 0
+    due_at: Optional[datetime] = None
+    last_reviewed_at: Optional[datetime] = None
     word_data: WordSchema
 
 
+class FlashcardReviewResultSchema(BaseModel):
+    id: int
+    is_memorized: bool
+    interval_days: int
+    ease_factor: float
+    repetitions: int
+    lapses: int
+    due_at: datetime
+    last_reviewed_at: Optional[datetime] = None
+    list_id: Optional[int] = None
+    entry_id: Optional[str] = None
+    note: Optional[str] = None
+    word_data: Optional[WordSchema] = None
+
+
+class FlashcardReviewBatchResponseSchema(BaseModel):
+    results: List[FlashcardReviewResultSchema] = Field(default_factory=list)
+    missing: List[int] = Field(default_factory=list, description="Flashcard ids that do not exist")
+
+
 # --- Dashboard / Stats ---
 
 
@@ -77,4 +195,5 @@ class OverviewStatsSchema(BaseModel):
     total_reviews: int = Field(..., ge=0)
     mastered_words: int = Field(..., ge=0)
     current_streak: int = Field(..., ge=0)
-    longest_streak: int = Field(..., ge=0)
\ No newline at end of file
+    longest_streak: int = Field(..., ge=0)
+
@@ -0,0 +1,221 @@
+# backend/seed_jlpt.py
+# Create one flashcard deck per JLPT level from vocab_json/n1.json ... n5.json.
+#
+#   python seed_jlpt.py                 # all levels -> lists "JLPT N5" ... "JLPT N1"
+#   python seed_jlpt.py --levels 5 4 --dry-run --show-unresolved
+#
+# Each word / furigana pair is resolved to a JMdict entry id through the
+# entry_kanji / entry_reading indexes, all levels in one batched lookup, and
+# the entries are added with the bulk flashcard insert. Re-running is safe:
+# existing decks are reused and cards already in them are reported as duplicates.
+import argparse
+import json
+import os
+import re
+import time
+
+from db_config import get_connection, setup_database
+from services.flashcard_service import add_flashcards_bulk
+from services.normalize import kanji_chars, normalize_reading
+
+VOCAB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'vocab_json')
+LEVELS = [5, 4, 3, 2, 1]
+LIST_NAME = 'JLPT N{level}'
+LOOKUP_CHUNK_SIZE = 2000
+
+# Annotations in the word lists: "（感）", "(=やる)", an unclosed "（1000".
+_NOTE_RE = re.compile(r'[（(][^）)]*[）)]?')
+_PAREN_RE = re.compile(r'[（()）]')
+
+
+def load_level(level: int, vocab_dir: str = VOCAB_DIR) -> list[dict]:
+    with open(os.path.join(vocab_dir, f'n{level}.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _forms(text: str, keep_parenthesized: bool = False) -> list[str]:
+    """Spellings in a word-list field.
+
+    "アイデア / アイディア" -> both; "お・金持ち" -> "お金持ち", "金持ち" (optional
+    prefix); annotations in parentheses are dropped. With keep_parenthesized,
+    "あたたか(い)" also gives "あたたかい" (okurigana written in parentheses).
+    """
+    forms: list[str] = []
+    for part in (text or '').split('/'):
+        variants = [_NOTE_RE.sub('', part)]
+        if keep_parenthesized:
+            variants.append(_PAREN_RE.sub('', part))
+        for variant in variants:
+            pieces = [p.strip() for p in variant.split('・')]
+            candidates = [''.join(pieces)]
+            if len(pieces) > 1:
+                candidates.append(''.join(pieces[1:]))
+            for form in candidates:
+                form = ''.join(form.split())
+                if form and form not in forms:
+                    forms.append(form)
+    return forms
+
+
+def word_forms(item: dict) -> tuple[list[str], list[str]]:
+    """(kanji spellings, readings) of a word-list item.
+
+    Kana-only words have an empty furigana (or a note such as "（感）" in it);
+    their word is the reading.
+    """
+    words = _forms(item.get('word'))
+    if not any(kanji_chars(w) for w in words):
+        return [], words
+    return [w for w in words if kanji_chars(w)], _forms(item.get('furigana'), keep_parenthesized=True)
+
+
+def _lookup_query(kanji: list[str], readings: list[str]) -> tuple[str, list]:
+    parts = []
+    params: list = []
+    if kanji:
+        parts.append(
+            f"""
+            SELECT 'k', k.kanji_text, k.entry_id, k.is_common, e.primary_headword
+            FROM entry_kanji k
+            JOIN entries e ON e.id = k.entry_id
+            WHERE k.kanji_text IN ({', '.join(['%s'] * len(kanji))})
+            """
+        )
+        params.extend(kanji)
+    if readings:
+        parts.append(
+            f"""
+            SELECT 'r', r.reading_text, r.entry_id, 0, e.primary_headword
+            FROM entry_reading r
+            JOIN entries e ON e.id = r.entry_id
+            WHERE r.reading_text IN ({', '.join(['%s'] * len(readings))})
+            """
+        )
+        params.extend(readings)
+    return ' UNION ALL '.join(parts), params
+
+
+class _FormIndex:
+    """Entries by kanji spelling and by reading, from the lookup rows."""
+
+    def __init__(self):
+        self.kanji: dict[str, set[str]] = {}
+        self.readings: dict[str, set[str]] = {}
+        self.readings_norm: dict[str, set[str]] = {}
+        self.common: set[str] = set()
+        self.headword: dict[str, str] = {}
+
+    def add(self, kind: str, text: str, entry_id: str, is_common: int, headword: str) -> None:
+        entry_id = str(entry_id)
+        self.headword[entry_id] = headword
+        if kind == 'k':
+            self.kanji.setdefault(text, set()).add(entry_id)
+            if is_common:
+                self.common.add(entry_id)
+        else:
+            self.readings.setdefault(text, set()).add(entry_id)
+            self.readings_norm.setdefault(normalize_reading(text), set()).add(entry_id)
+
+    def with_reading(self, readings: list[str]) -> set[str]:
+        found = set().union(*(self.readings.get(r, ()) for r in readings))
+        if not found:
+            # The lookup is collation-insensitive (e.g. katakana vs hiragana); so is this fallback.
+            found = set().union(*(self.readings_norm.get(normalize_reading(r), ()) for r in readings))
+        return found
+
+    def resolve(self, kanji: list[str], readings: list[str]):
+        """The entry id of a word, or None."""
+        if kanji:
+            candidates = set().union(*(self.kanji.get(k, ()) for k in kanji))
+            if candidates:
+                read = self.with_reading(readings)
+                return min(candidates, key=lambda e: (e not in read, e not in self.common, int(e)))
+        candidates = self.with_reading(readings)
+        if not candidates:
+            return None
+        # A kana word is the entry written in kana (けれど), not a kanji word read the same.
+        spelled = set(kanji or readings)
+        return min(candidates, key=lambda e: (self.headword.get(e) not in spelled, e not in self.common, int(e)))
+
+
+def build_form_index(cursor, items: list[dict]) -> _FormIndex:
+    kanji: set[str] = set()
+    readings: set[str] = set()
+    for item in items:
+        k, r = word_forms(item)
+        kanji.update(k)
+        readings.update(r)
+
+    index = _FormIndex()
+    kanji_list, reading_list = sorted(kanji), sorted(readings)
+    for i in range(0, max(len(kanji_list), len(reading_list)), LOOKUP_CHUNK_SIZE):
+        sql, params = _lookup_query(kanji_list[i:i + LOOKUP_CHUNK_SIZE], reading_list[i:i + LOOKUP_CHUNK_SIZE])
+        cursor.execute(sql, params)
+        for row in cursor.fetchall():
+            index.add(*row)
+    return index
+
+
+def _deck_id(cursor, name: str, description: str) -> int:
+    cursor.execute("SELECT id FROM vocab_lists WHERE name = %s ORDER BY id LIMIT 1", (name,))
+    row = cursor.fetchone()
+    if row:
+        return int(row[0])
+    cursor.execute("INSERT INTO vocab_lists (name, description) VALUES (%s, %s)", (name, description))
+    return int(cursor.lastrowid)
+
+
+def seed_jlpt(levels: list[int] = LEVELS, vocab_dir: str = VOCAB_DIR, dry_run: bool = False,
+              show_unresolved: bool = False) -> dict:
+    """Create / fill one deck per level; returns a summary per level."""
+    start = time.time()
+    vocab = {level: load_level(level, vocab_dir) for level in levels}
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        index = build_form_index(cursor, [item for items in vocab.values() for item in items])
+        print(f"Resolved word forms in {time.time() - start:.2f}s.")
+
+        summary = {}
+        for level, items in vocab.items():
+            entry_ids: list[str] = []
+            unresolved: list[str] = []
+            for item in items:
+                entry_id = index.resolve(*word_forms(item))
+                if entry_id is None:
+                    unresolved.append(item.get('word') or '')
+                elif entry_id not in entry_ids:
+                    entry_ids.append(entry_id)
+
+            name = LIST_NAME.format(level=level)
+            result = {'words': len(items), 'entries': len(entry_ids), 'unresolved': len(unresolved)}
+            if not dry_run and entry_ids:
+                list_id = _deck_id(cursor, name, f"JLPT N{level} vocabulary (vocab_json/n{level}.json)")
+                conn.commit()
+                report = add_flashcards_bulk(list_id, entry_ids)
+                result.update(list_id=list_id, added=len(report['added']), duplicates=len(report['duplicates']))
+            summary[name] = result
+
+            print(f"{name}: {len(items)} words -> {len(entry_ids)} entries, {len(unresolved)} unresolved"
+                  + (f", {result['added']} added, {result['duplicates']} already in the deck" if 'added' in result else ''))
+            if show_unresolved and unresolved:
+                print("   unresolved: " + ', '.join(unresolved))
+    finally:
+        cursor.close()
+        conn.close()
+
+    print(f"Done in {time.time() - start:.2f}s.")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create JLPT flashcard decks from vocab_json")
+    parser.add_argument("--levels", type=int, nargs="+", choices=LEVELS, default=LEVELS)
+    parser.add_argument("--vocab-dir", default=VOCAB_DIR)
+    parser.add_argument("--dry-run", action="store_true", help="only resolve the words and report")
+    parser.add_argument("--show-unresolved", action="store_true", help="list the words with no JMdict entry")
+    args = parser.parse_args()
+
+    setup_database()
+    seed_jlpt(args.levels, args.vocab_dir, dry_run=args.dry_run, show_unresolved=args.show_unresolved)
@@ -0,0 +1,198 @@
+# backend/services/bm25.py
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import math
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from db_config import get_connection
+from services.normalize import GLOSS_TOKEN_RE, fold_gloss
+from services.sqlite_dictionary import get_sqlite_dictionary
+
+logger = logging.getLogger("gakuroku")
+
+# Okapi BM25 parameters.
+BM25_K1 = 1.2
+BM25_B = 0.75
+# A word in the first sense counts this many times (BM25F-style field weight):
+# the first sense is the one a learner means when typing an English word.
+FIRST_SENSE_WEIGHT = 2.0
+# Score multiplier for entries with a common kanji form.
+COMMON_BOOST = 1.2
+
+
+class BM25Index:
+    """In-process BM25 ranking of entries by their English glosses.
+
+    Entries are numbered 0..n-1. Postings are flat arrays: the entries having
+    terms[t] are postings[offsets[t]:offsets[t + 1]], with their (sense-weighted)
+    term frequencies in tfs at the same positions. Scoring a query touches only
+    the postings of its words, and the best k are picked with a heap.
+
+    Unlike MATCH ... AGAINST every word is indexed: no stopword list, no minimum
+    token size. Frequent words simply get a low idf.
+    """
+
+    def __init__(self, entry_ids: Sequence[str], is_common: bytes, doc_len: Sequence[float],
+                 terms: Sequence[str], offsets: Sequence[int], postings: Sequence[int],
+                 tfs: Sequence[float]):
+        self.entry_ids = entry_ids
+        self.is_common = is_common
+        self.doc_len = doc_len
+        self.terms = terms
+        self.offsets = offsets
+        self.postings = postings
+        self.tfs = tfs
+        self.avg_len = (sum(doc_len) / len(doc_len)) if len(doc_len) else 0.0
+
+    def __len__(self) -> int:
+        return len(self.entry_ids)
+
+    @classmethod
+    def build(cls, entries: Iterable[Tuple[str, Sequence[Sequence[str]], int]]) -> "BM25Index":
+        """entries: (entry id, glosses of each sense in order, is_common)."""
+        entry_ids: List[str] = []
+        is_common = bytearray()
+        doc_len = array("f")
+        postings: Dict[str, Dict[int, float]] = {}
+
+        for entry_id, senses, common in entries:
+            n = len(entry_ids)
+            entry_ids.append(str(entry_id))
+            is_common.append(1 if common else 0)
+            length = 0.0
+            for sense_rank, glosses in enumerate(senses):
+                weight = FIRST_SENSE_WEIGHT if sense_rank == 0 else 1.0
+                for gloss in glosses:
+                    for token in GLOSS_TOKEN_RE.findall(fold_gloss(gloss)):
+                        doc = postings.setdefault(token, {})
+                        doc[n] = doc.get(n, 0.0) + weight
+                        length += weight
+            doc_len.append(length)
+
+        terms = sorted(postings)
+        offsets = array("I", [0])
+        flat = array("I")
+        tfs = array("f")
+        for term in terms:
+            for n, tf in sorted(postings[term].items()):
+                flat.append(n)
+                tfs.append(tf)
+            offsets.append(len(flat))
+
+        return cls(entry_ids, bytes(is_common), doc_len, terms, offsets, flat, tfs)
+
+    @classmethod
+    def from_mysql(cls) -> "BM25Index":
+        """Load every entry's per-sense English glosses (word_data) and common flag."""
+        # services.search imports this module for the English search path.
+        from services.search import _word_from_columns
+
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT entry_id FROM entry_kanji WHERE is_common = 1")
+            common = {str(row[0]) for row in cursor.fetchall()}
+            cursor.execute(
+                """
+                SELECT id, word_data, IF(word_data IS NULL, raw_json, NULL)
+                FROM entries
+                ORDER BY id
+                """
+            )
+            entries = []
+            for entry_id, word_data, raw_json in cursor:
+                word = _word_from_columns(entry_id, word_data, raw_json)
+                if word is None:
+                    continue
+                senses = [sense.get("glosses") or [] for sense in word.get("senses") or []]
+                entries.append((str(entry_id), senses, str(entry_id) in common))
+        finally:
+            cursor.close()
+            conn.close()
+        return cls.build(entries)
+
+    @classmethod
+    def from_sqlite(cls, dictionary) -> "BM25Index":
+        """Same entries from the SQLite dictionary file (word_data is always filled there)."""
+        entries = []
+        for entry_id, is_common, word_data in dictionary.query(
+            "SELECT id, is_common, word_data FROM entries ORDER BY id"
+        ):
+            word = json.loads(word_data)
+            senses = [sense.get("glosses") or [] for sense in word.get("senses") or []]
+            entries.append((str(entry_id), senses, bool(is_common)))
+        return cls.build(entries)
+
+    def _term_number(self, term: str) -> int:
+        t = bisect_left(self.terms, term)
+        if t < len(self.terms) and self.terms[t] == term:
+            return t
+        return -1
+
+    def scores(self, keyword: str) -> Dict[int, float]:
+        """BM25 score of every entry containing at least one word of keyword."""
+        total = len(self)
+        k1, b, avg_len = BM25_K1, BM25_B, self.avg_len or 1.0
+        doc_len = self.doc_len
+        scores: Dict[int, float] = {}
+        for term in set(GLOSS_TOKEN_RE.findall(fold_gloss(keyword))):
+            t = self._term_number(term)
+            if t < 0:
+                continue
+            lo, hi = self.offsets[t], self.offsets[t + 1]
+            df = hi - lo
+            idf = math.log(1.0 + (total - df + 0.5) / (df + 0.5))
+            for n, tf in zip(self.postings[lo:hi], self.tfs[lo:hi]):
+                norm = tf + k1 * (1.0 - b + b * doc_len[n] / avg_len)
+                scores[n] = scores.get(n, 0.0) + idf * tf * (k1 + 1.0) / norm
+        return scores
+
+    def top(self, keyword: str, limit: int = 10) -> List[Tuple[int, float]]:
+        """(entry number, score) of the best `limit` entries, best first."""
+        is_common = self.is_common
+        scored = (
+            (score * COMMON_BOOST if is_common[n] else score, -n)
+            for n, score in self.scores(keyword).items()
+        )
+        return [(-neg_n, score) for score, neg_n in heapq.nlargest(max(0, int(limit)), scored)]
+
+    def rank(self, keyword: str, limit: int = 10) -> List[str]:
+        """Entry ids of the best `limit` matches, best first."""
+        return [self.entry_ids[n] for n, _ in self.top(keyword, limit)]
+
+
+_bm25_index: Optional[BM25Index] = None
+_bm25_index_lock = threading.Lock()
+
+
+def get_bm25_index() -> Optional[BM25Index]:
+    """Return the loaded index, or None if it has not been built."""
+    return _bm25_index
+
+
+def load_bm25_index() -> BM25Index:
+    """(Re)build the BM25 index and make it current: from the SQLite dictionary
+    file with SEARCH_ENGINE=sqlite, else from MySQL."""
+    # services.search imports this module for the English search path.
+    from services.search import SEARCH_ENGINE
+
+    global _bm25_index
+    with _bm25_index_lock:
+        started = time.perf_counter()
+        if SEARCH_ENGINE == "sqlite":
+            index = BM25Index.from_sqlite(get_sqlite_dictionary())
+        else:
+            index = BM25Index.from_mysql()
+        _bm25_index = index
+    logger.info(
+        "BM25 index loaded: %d entries, %d terms in %.2fs",
+        len(index), len(index.terms), time.perf_counter() - started,
+    )
+    return index
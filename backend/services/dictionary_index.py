@@ -0,0 +1,477 @@
+# backend/services/dictionary_index.py
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import math
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from db_config import get_connection
+from services.normalize import fold_collation, kanji_chars, normalize_reading, query_readings
+from services.prefix_trie import PrefixTrie
+
+logger = logging.getLogger("gakuroku")
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+# InnoDB FULLTEXT defaults (innodb_ft_min_token_size / default stopword list),
+# used to mirror MATCH ... AGAINST candidates and scores.
+FT_MIN_TOKEN_SIZE = 3
+FT_MAX_TOKEN_SIZE = 84
+FT_STOPWORDS = frozenset(
+    """
+    a about an are as at be by com de en for from how i in is it la of on or
+    that the this to was what when where who will with und www
+    """.split()
+)
+
+
+def _prefix_range(sorted_items: Sequence[str], prefix: str) -> Tuple[int, int]:
+    """Return [lo, hi) of the items in sorted_items that start with prefix."""
+    lo = bisect_left(sorted_items, prefix)
+    hi = lo
+    n = len(sorted_items)
+    # Items sharing the prefix are contiguous; find the end with a second bisect
+    # against the smallest string greater than every prefix-extension.
+    if prefix:
+        hi = bisect_left(sorted_items, prefix[:-1] + chr(ord(prefix[-1]) + 1), lo, n)
+    else:
+        hi = n
+    return lo, hi
+
+
+def _exact_range(sorted_items: Sequence[str], value: str) -> Tuple[int, int]:
+    lo = bisect_left(sorted_items, value)
+    return lo, bisect_right(sorted_items, value, lo)
+
+
+class DictionaryIndex:
+    """Read-only, in-process copy of the dictionary tables used by search.
+
+    Entries are numbered 0..n-1 and every structure is a flat, sorted array so
+    lookups are bisects rather than SQL scans. Forms, glosses and headwords are
+    compared as fold_collation() keys, so matches and ties are the ones MySQL's
+    utf8mb4_unicode_ci gives (ハ = ば = は, Café = cafe):
+
+    - headword_keys: fold_collation() of each headword, for the primary_headword
+      tie-break of the ranking.
+    - kanji_forms / reading_forms: sorted folded forms, with the owning
+      entry number in the parallel kanji_entries / reading_entries arrays.
+    - kanji_trie / reading_trie: the same forms as PrefixTries, for finding every
+      form that is a prefix of the keyword.
+    - norm_forms / norm_entries: normalize_reading() of every reading (the
+      entry_reading.reading_norm column), for kana-folded and romaji matches.
+    - gloss_terms: sorted gloss tokens; postings for gloss_terms[t] live in
+      gloss_postings[gloss_offsets[t]:gloss_offsets[t + 1]] (entry numbers, with
+      term frequencies in gloss_tf).
+    - char_entries: kanji -> sorted entry numbers whose kanji forms contain it
+      (the entry_chars table).
+    """
+
+    def __init__(
+        self,
+        entry_ids: Sequence[str],
+        headwords: Sequence[str],
+        headword_keys: Sequence[str],
+        is_common: bytes,
+        glosses: Sequence[str],
+        words: Sequence[str],
+        kanji_forms: Sequence[str],
+        kanji_entries: Sequence[int],
+        reading_forms: Sequence[str],
+        reading_entries: Sequence[int],
+        kanji_trie: PrefixTrie,
+        reading_trie: PrefixTrie,
+        norm_forms: Sequence[str],
+        norm_entries: Sequence[int],
+        gloss_terms: Sequence[str],
+        gloss_offsets: Sequence[int],
+        gloss_postings: Sequence[int],
+        gloss_tf: Sequence[int],
+        non_ascii_gloss: Sequence[int],
+        char_entries: Dict[str, Sequence[int]],
+    ):
+        self.entry_ids = entry_ids
+        self.headwords = headwords
+        self.headword_keys = headword_keys
+        self.is_common = is_common
+        self.glosses = glosses
+        self.words = words
+        self.kanji_forms = kanji_forms
+        self.kanji_entries = kanji_entries
+        self.reading_forms = reading_forms
+        self.reading_entries = reading_entries
+        self.kanji_trie = kanji_trie
+        self.reading_trie = reading_trie
+        self.norm_forms = norm_forms
+        self.norm_entries = norm_entries
+        self.gloss_terms = gloss_terms
+        self.gloss_offsets = gloss_offsets
+        self.gloss_postings = gloss_postings
+        self.gloss_tf = gloss_tf
+        self.non_ascii_gloss = non_ascii_gloss
+        self.char_entries = char_entries
+        self._numbers: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.entry_ids)
+
+    # --- building ---
+
+    @classmethod
+    def build(
+        cls,
+        entries: Iterable[Tuple[str, str, str, dict]],
+        kanji_rows: Iterable[Tuple[str, str, int]],
+        reading_rows: Iterable[Tuple[str, str]],
+    ) -> "DictionaryIndex":
+        """Build from (id, primary_headword, gloss_text, word_data) entries and
+        the entry_kanji / entry_reading rows."""
+        entry_ids: List[str] = []
+        headwords: List[str] = []
+        glosses: List[str] = []
+        words: List[str] = []
+        number: Dict[str, int] = {}
+
+        for entry_id, headword, gloss_text, word_data in entries:
+            number[str(entry_id)] = len(entry_ids)
+            entry_ids.append(str(entry_id))
+            headwords.append(headword or "")
+            glosses.append(fold_collation(gloss_text or ""))
+            words.append(json.dumps(word_data, ensure_ascii=False, separators=(",", ":")))
+
+        is_common = bytearray(len(entry_ids))
+        kanji_pairs: List[Tuple[str, int]] = []
+        for entry_id, kanji_text, common in kanji_rows:
+            n = number.get(str(entry_id))
+            if n is None or not kanji_text:
+                continue
+            kanji_pairs.append((fold_collation(kanji_text), n))
+            if common:
+                is_common[n] = 1
+        kanji_pairs.sort()
+
+        chars: Dict[str, Set[int]] = {}
+        for form, n in kanji_pairs:
+            for ch in kanji_chars(form):
+                chars.setdefault(ch, set()).add(n)
+
+        reading_pairs: List[Tuple[str, int]] = []
+        norm_pairs: List[Tuple[str, int]] = []
+        for entry_id, reading_text in reading_rows:
+            n = number.get(str(entry_id))
+            if n is None or not reading_text:
+                continue
+            reading_pairs.append((fold_collation(reading_text), n))
+            norm_pairs.append((normalize_reading(reading_text), n))
+        reading_pairs.sort()
+        norm_pairs.sort()
+
+        postings: Dict[str, Dict[int, int]] = {}
+        non_ascii_gloss: List[int] = []
+        for n, gloss in enumerate(glosses):
+            for token in _TOKEN_RE.findall(gloss):
+                doc = postings.setdefault(token, {})
+                doc[n] = doc.get(n, 0) + 1
+            if not gloss.isascii():
+                non_ascii_gloss.append(n)
+
+        gloss_terms = sorted(postings)
+        gloss_offsets = array("I", [0])
+        gloss_postings = array("I")
+        gloss_tf = array("I")
+        for term in gloss_terms:
+            for n, tf in sorted(postings[term].items()):
+                gloss_postings.append(n)
+                gloss_tf.append(tf)
+            gloss_offsets.append(len(gloss_postings))
+
+        return cls(
+            entry_ids=entry_ids,
+            headwords=headwords,
+            headword_keys=[fold_collation(headword) for headword in headwords],
+            is_common=bytes(is_common),
+            glosses=glosses,
+            words=words,
+            kanji_forms=[f for f, _ in kanji_pairs],
+            kanji_entries=array("I", [n for _, n in kanji_pairs]),
+            reading_forms=[f for f, _ in reading_pairs],
+            reading_entries=array("I", [n for _, n in reading_pairs]),
+            kanji_trie=PrefixTrie.build(kanji_pairs),
+            reading_trie=PrefixTrie.build(reading_pairs),
+            norm_forms=[f for f, _ in norm_pairs],
+            norm_entries=array("I", [n for _, n in norm_pairs]),
+            gloss_terms=gloss_terms,
+            gloss_offsets=gloss_offsets,
+            gloss_postings=gloss_postings,
+            gloss_tf=gloss_tf,
+            non_ascii_gloss=array("I", non_ascii_gloss),
+            char_entries={ch: array("I", sorted(ns)) for ch, ns in chars.items()},
+        )
+
+    @classmethod
+    def from_mysql(cls) -> "DictionaryIndex":
+        """Load entries / entry_kanji / entry_reading / entry_definitions from MySQL."""
+        # services.search imports this module for engine dispatch.
+        from services.search import _word_from_columns
+
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                SELECT
+                    e.id, e.primary_headword, COALESCE(d.gloss_text, ''),
+                    e.word_data, IF(e.word_data IS NULL, e.raw_json, NULL)
+                FROM entries e
+                LEFT JOIN entry_definitions d ON d.entry_id = e.id
+                ORDER BY e.id
+                """
+            )
+            entries = []
+            for entry_id, headword, gloss_text, word_data, raw_json in cursor:
+                word = _word_from_columns(entry_id, word_data, raw_json)
+                if word is None:
+                    continue
+                entries.append((str(entry_id), headword, gloss_text, word))
+
+            cursor.execute("SELECT entry_id, kanji_text, is_common FROM entry_kanji")
+            kanji_rows = cursor.fetchall() or []
+            cursor.execute("SELECT entry_id, reading_text FROM entry_reading")
+            reading_rows = cursor.fetchall() or []
+        finally:
+            cursor.close()
+            conn.close()
+
+        return cls.build(entries, kanji_rows, reading_rows)
+
+    # --- lookups ---
+
+    def word(self, n: int) -> dict:
+        return json.loads(self.words[n])
+
+    def number_of(self, entry_id: str) -> int:
+        if self._numbers is None:
+            self._numbers = {entry_id: n for n, entry_id in enumerate(self.entry_ids)}
+        return self._numbers[entry_id]
+
+    def find_number(self, entry_id: str) -> Optional[int]:
+        """number_of, or None for an id not in the index (e.g. added after it was built)."""
+        try:
+            return self.number_of(entry_id)
+        except KeyError:
+            return None
+
+    def _entries_in(self, entries: Sequence[int], lo: int, hi: int) -> Set[int]:
+        return set(entries[lo:hi])
+
+    @staticmethod
+    def _forms_prefix_of(trie: PrefixTrie, text: str) -> Set[int]:
+        """Entries having a form that is a prefix of text (incl. text itself)."""
+        found: Set[int] = set()
+        for _, values in trie.common_prefix_search(text):
+            found.update(values)
+        return found
+
+    def prefix_entries(self, text: str) -> List[Tuple[int, int]]:
+        """(matched length, entry number) for entries having a kanji or reading form
+        that prefixes text, longest match first, each entry reported once."""
+        text = fold_collation(text)
+        matches = self.kanji_trie.common_prefix_search(text) + self.reading_trie.common_prefix_search(text)
+        matches.sort(key=lambda m: -m[0])
+        seen: Set[int] = set()
+        out: List[Tuple[int, int]] = []
+        for length, values in matches:
+            for n in values:
+                if n not in seen:
+                    seen.add(n)
+                    out.append((length, n))
+        return out
+
+    def contains_chars(self, text: str, limit: int = 20) -> List[int]:
+        """Entries whose kanji forms contain every kanji of text, ranked like
+        services.search.search_contains (common, shorter headword first)."""
+        chars = kanji_chars(text)
+        if not chars:
+            return []
+        # Intersect starting from the rarest character.
+        postings = sorted((self.char_entries.get(ch, ()) for ch in chars), key=len)
+        found = set(postings[0])
+        for entries in postings[1:]:
+            if not found:
+                break
+            found.intersection_update(entries)
+        headwords = self.headwords
+        headword_keys = self.headword_keys
+        is_common = self.is_common
+        return heapq.nsmallest(
+            limit, found, key=lambda n: (-is_common[n], len(headwords[n]), headword_keys[n], n),
+        )
+
+    def _postings(self, t: int) -> Tuple[Sequence[int], Sequence[int]]:
+        lo, hi = self.gloss_offsets[t], self.gloss_offsets[t + 1]
+        return self.gloss_postings[lo:hi], self.gloss_tf[lo:hi]
+
+    def _term_number(self, term: str) -> int:
+        t = bisect_left(self.gloss_terms, term)
+        if t < len(self.gloss_terms) and self.gloss_terms[t] == term:
+            return t
+        return -1
+
+    def _terms_containing(self, needle: str) -> Iterable[int]:
+        # A snapshot's mapped term table finds them without decoding every term.
+        indices_containing = getattr(self.gloss_terms, "indices_containing", None)
+        if indices_containing is not None:
+            return indices_containing(needle)
+        return (t for t, term in enumerate(self.gloss_terms) if needle in term)
+
+    def _like_gloss_candidates(self, needle: str) -> Set[int]:
+        """Entries whose gloss contains needle (gloss_text LIKE '%needle%')."""
+        if not needle:
+            return set(range(len(self)))
+        tokens = _TOKEN_RE.findall(needle)
+        if tokens:
+            # Any gloss containing needle contains a term that contains its longest token.
+            longest = max(tokens, key=len)
+            pool: Set[int] = set()
+            for t in self._terms_containing(longest):
+                pool.update(self._postings(t)[0])
+        else:
+            # No [0-9a-z] chars in needle: only glosses with other characters can match.
+            pool = set(self.non_ascii_gloss)
+        glosses = self.glosses
+        return {n for n in pool if needle in glosses[n]}
+
+    def _fulltext_scores(self, keyword_lower: str) -> Dict[int, float]:
+        """Approximate InnoDB natural-language relevance: sum of tf * idf^2.
+
+        InnoDB's formula has the same shape (IDF = log10(documents / matching
+        documents)) but tokenizes and counts on its own, so scores can differ. They
+        only order entries that tie on every exact / prefix / gloss flag before it.
+        """
+        total = len(self)
+        scores: Dict[int, float] = {}
+        for term in set(_TOKEN_RE.findall(keyword_lower)):
+            if len(term) < FT_MIN_TOKEN_SIZE or len(term) > FT_MAX_TOKEN_SIZE or term in FT_STOPWORDS:
+                continue
+            t = self._term_number(term)
+            if t < 0:
+                continue
+            docs, tfs = self._postings(t)
+            idf = math.log10(total / len(docs)) if docs else 0.0
+            weight = idf * idf
+            for n, tf in zip(docs, tfs):
+                scores[n] = scores.get(n, 0.0) + tf * weight
+        return scores
+
+    def search(self, keyword: str, limit: int = 10) -> List[dict]:
+        """Rank entries the same way as services.search._SEARCH_SQL."""
+        return [self.word(n) for n in self.rank(keyword, limit)]
+
+    def rank(self, keyword: str, limit: int = 10) -> List[int]:
+        """Entry numbers of the best `limit` matches, best first."""
+        kw = fold_collation(keyword)
+
+        lo, hi = _exact_range(self.kanji_forms, kw)
+        exact_kj = self._entries_in(self.kanji_entries, lo, hi)
+        lo, hi = _exact_range(self.reading_forms, kw)
+        exact_rd = self._entries_in(self.reading_entries, lo, hi)
+
+        kw_prefix_kj = self._forms_prefix_of(self.kanji_trie, kw)
+        kw_prefix_rd = self._forms_prefix_of(self.reading_trie, kw)
+
+        lo, hi = _prefix_range(self.kanji_forms, kw)
+        prefix_kj = self._entries_in(self.kanji_entries, lo, hi)
+        lo, hi = _prefix_range(self.reading_forms, kw)
+        prefix_rd = self._entries_in(self.reading_entries, lo, hi)
+
+        kana_norm, romaji_kana = query_readings(keyword)
+        if kana_norm:
+            lo, hi = _exact_range(self.norm_forms, kana_norm)
+            exact_rd |= self._entries_in(self.norm_entries, lo, hi)
+            lo, hi = _prefix_range(self.norm_forms, kana_norm)
+            prefix_rd |= self._entries_in(self.norm_entries, lo, hi)
+        romaji_rd: Set[int] = set()
+        romaji_prefix_rd: Set[int] = set()
+        if romaji_kana:
+            lo, hi = _exact_range(self.norm_forms, romaji_kana)
+            romaji_rd = self._entries_in(self.norm_entries, lo, hi)
+            lo, hi = _prefix_range(self.norm_forms, romaji_kana)
+            romaji_prefix_rd = self._entries_in(self.norm_entries, lo, hi)
+
+        like_gloss = self._like_gloss_candidates(kw)
+        ft_scores = self._fulltext_scores(kw)
+
+        candidates = (
+            exact_kj | exact_rd | kw_prefix_kj | kw_prefix_rd | prefix_kj | prefix_rd
+            | romaji_rd | romaji_prefix_rd | like_gloss
+        )
+        candidates.update(ft_scores)
+        if not candidates:
+            return []
+
+        exact_word = re.compile(r"(^|[^0-9a-z])" + re.escape(kw) + r"([^0-9a-z]|$)")
+        glosses = self.glosses
+        headwords = self.headwords
+        headword_keys = self.headword_keys
+        is_common = self.is_common
+
+        def sort_key(n: int):
+            gloss = glosses[n]
+            return (
+                n not in exact_kj,
+                n not in exact_rd,
+                n not in kw_prefix_kj,
+                n not in kw_prefix_rd,
+                n not in prefix_kj,
+                n not in prefix_rd,
+                -is_common[n],
+                exact_word.search(gloss) is None,
+                not gloss.startswith(kw),
+                n not in romaji_rd,
+                n not in romaji_prefix_rd,
+                -ft_scores.get(n, 0.0),
+                n not in like_gloss,
+                len(headwords[n]),
+                headword_keys[n],
+                n,
+            )
+
+        return heapq.nsmallest(limit, candidates, key=sort_key)
+
+
+_index: Optional[DictionaryIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_dictionary_index() -> Optional[DictionaryIndex]:
+    """Return the loaded index, or None if it has not been built."""
+    return _index
+
+
+def load_dictionary_index() -> DictionaryIndex:
+    """Make the index current: mapped from the snapshot file when it matches the
+    database, otherwise rebuilt from MySQL."""
+    # dictionary_snapshot builds on this module.
+    from services.dictionary_snapshot import DICTIONARY_SNAPSHOT, load_current_snapshot
+
+    global _index
+    with _index_lock:
+        started = time.perf_counter()
+        index = load_current_snapshot()
+        source = DICTIONARY_SNAPSHOT
+        if index is None:
+            index = DictionaryIndex.from_mysql()
+            source = "MySQL"
+        _index = index
+    logger.info(
+        "Dictionary index loaded from %s: %d entries in %.2fs",
+        source, len(index), time.perf_counter() - started,
+    )
+    return index
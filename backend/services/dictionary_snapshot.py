@@ -0,0 +1,305 @@
+# backend/services/dictionary_snapshot.py
+"""Binary snapshot of the DictionaryIndex, mapped read-only by every worker.
+
+Layout: MAGIC, a little-endian u32 header length, a JSON header, then the
+sections, each 8-byte aligned. A section is either raw array bytes (u32 /
+bytes) or a string table (one UTF-8 blob plus u32 offsets). Loading maps the
+file and wraps the sections in memoryviews, so nothing is decoded up front and
+N workers share one copy of the pages through the OS page cache.
+
+The header carries the dictionary version the snapshot was built from and a
+sha1 of the sections; import_task records that checksum in dictionary_meta.
+A worker only uses a snapshot whose version and checksum both match the DB.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from typing import Dict, List, Optional, Tuple
+
+from db_config import (
+    DICTIONARY_VERSION_KEY,
+    SNAPSHOT_CHECKSUM_KEY,
+    get_dictionary_meta,
+)
+from services.dictionary_index import DictionaryIndex
+from services.prefix_trie import PrefixTrie
+
+logger = logging.getLogger("gakuroku")
+
+DICTIONARY_SNAPSHOT = os.getenv("DICTIONARY_SNAPSHOT", "dictionary.snapshot")
+# DICTIONARY_SNAPSHOT_VERIFY=1 re-hashes the sections at load (reads the whole file).
+SNAPSHOT_VERIFY = os.getenv("DICTIONARY_SNAPSHOT_VERIFY", "0").lower() in ("1", "true", "yes")
+
+MAGIC = b"GKSNAP\x00\x01"
+# 2: collation-folded forms and glosses, headword_keys.
+FORMAT_VERSION = 2
+_ALIGN = 8
+
+
+class StringTable(Sequence):
+    """Read-only sequence of str over a UTF-8 blob and u32 offsets; decodes on access.
+
+    bisect works on it directly, so sorted tables keep their O(log n) lookups.
+    source / start: the mapped file and the blob's offset in it, for find().
+    """
+
+    def __init__(self, blob: memoryview, offsets: Sequence, source: mmap.mmap, start: int):
+        self.blob = blob
+        self.offsets = offsets
+        self.source = source
+        self.start = start
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def indices_containing(self, needle: str) -> List[int]:
+        """Indices of the strings containing needle, searching the mapped blob
+        instead of decoding every string."""
+        data = needle.encode("utf-8")
+        if not data:
+            return list(range(len(self)))
+        start, end = self.start, self.start + len(self.blob)
+        offsets = self.offsets
+        found: List[int] = []
+        pos = self.source.find(data, start, end)
+        while pos >= 0:
+            i = bisect_right(offsets, pos - start) - 1
+            if pos - start + len(data) <= offsets[i + 1]:
+                found.append(i)
+                # Each string once: carry on after it.
+                pos = self.source.find(data, start + offsets[i + 1], end)
+            else:
+                # The match spans two strings.
+                pos = self.source.find(data, pos + 1, end)
+        return found
+
+
+class CharPostings:
+    """Read-only stand-in for DictionaryIndex.char_entries (kanji -> entry numbers)."""
+
+    def __init__(self, keys: StringTable, offsets: Sequence, postings: Sequence):
+        self.keys = keys
+        self.offsets = offsets
+        self.postings = postings
+
+    def get(self, ch: str, default=()):
+        k = bisect_left(self.keys, ch)
+        if k < len(self.keys) and self.keys[k] == ch:
+            return self.postings[self.offsets[k]:self.offsets[k + 1]]
+        return default
+
+
+# --- writing ---
+
+def _string_table(items: Sequence[str]) -> Tuple[bytes, array]:
+    offsets = array("I", [0])
+    parts: List[bytes] = []
+    size = 0
+    for item in items:
+        data = item.encode("utf-8")
+        parts.append(data)
+        size += len(data)
+        offsets.append(size)
+    return b"".join(parts), offsets
+
+
+def _index_sections(index: DictionaryIndex) -> Dict[str, bytes]:
+    char_keys = sorted(index.char_entries)
+    char_offsets = array("I", [0])
+    char_postings = array("I")
+    for ch in char_keys:
+        char_postings.extend(index.char_entries[ch])
+        char_offsets.append(len(char_postings))
+
+    sections: Dict[str, bytes] = {"is_common": bytes(index.is_common)}
+    strings = {
+        "entry_ids": index.entry_ids,
+        "headwords": index.headwords,
+        "headword_keys": index.headword_keys,
+        "glosses": index.glosses,
+        "words": index.words,
+        "kanji_forms": index.kanji_forms,
+        "reading_forms": index.reading_forms,
+        "norm_forms": index.norm_forms,
+        "gloss_terms": index.gloss_terms,
+        "char_keys": char_keys,
+    }
+    for name, items in strings.items():
+        blob, offsets = _string_table(items)
+        sections[name + ".blob"] = blob
+        sections[name + ".offsets"] = offsets.tobytes()
+
+    u32 = {
+        "kanji_entries": index.kanji_entries,
+        "reading_entries": index.reading_entries,
+        "norm_entries": index.norm_entries,
+        "gloss_offsets": index.gloss_offsets,
+        "gloss_postings": index.gloss_postings,
+        "gloss_tf": index.gloss_tf,
+        "non_ascii_gloss": index.non_ascii_gloss,
+        "char_offsets": char_offsets,
+        "char_postings": char_postings,
+    }
+    for prefix, trie in (("kanji_trie", index.kanji_trie), ("reading_trie", index.reading_trie)):
+        for field in ("child_start", "labels", "value_start", "values"):
+            u32[f"{prefix}.{field}"] = getattr(trie, field)
+    for name, values in u32.items():
+        sections[name] = array("I", values).tobytes()
+    return sections
+
+
+def write_snapshot(index: DictionaryIndex, path: str, dictionary_version: str) -> str:
+    """Write index to path (via a temp file + rename); returns the checksum."""
+    sections = _index_sections(index)
+    digest = hashlib.sha1()
+    layout: Dict[str, List[int]] = {}
+    offset = 0
+    for name, data in sections.items():
+        layout[name] = [offset, len(data)]
+        offset += len(data) + (-len(data) % _ALIGN)
+        digest.update(data)
+    checksum = digest.hexdigest()
+
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "dictionary_version": dictionary_version,
+        "entry_count": len(index),
+        "checksum": checksum,
+        "sections": layout,
+    }).encode("utf-8")
+    header += b" " * (-(len(MAGIC) + 4 + len(header)) % _ALIGN)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for data in sections.values():
+            f.write(data)
+            f.write(b"\0" * (-len(data) % _ALIGN))
+    # Workers that mapped the old file keep their copy; new ones get this one.
+    os.replace(tmp_path, path)
+    return checksum
+
+
+# --- loading ---
+
+class Snapshot:
+    """A mapped snapshot file: header plus zero-copy section views."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a dictionary snapshot")
+        (header_len,) = struct.unpack_from("<I", view, len(MAGIC))
+        body = len(MAGIC) + 4 + header_len
+        self.header = json.loads(bytes(view[len(MAGIC) + 4:body]))
+        if self.header.get("format") != FORMAT_VERSION:
+            raise ValueError(f"{path}: snapshot format {self.header.get('format')}, expected {FORMAT_VERSION}")
+        if self.header.get("byteorder") != sys.byteorder:
+            raise ValueError(f"{path}: written on a {self.header.get('byteorder')}-endian machine")
+        self._body = view[body:]
+        self._body_start = body
+
+    @property
+    def dictionary_version(self) -> str:
+        return str(self.header.get("dictionary_version"))
+
+    @property
+    def checksum(self) -> str:
+        return str(self.header.get("checksum"))
+
+    def _raw(self, name: str) -> memoryview:
+        offset, length = self.header["sections"][name]
+        return self._body[offset:offset + length]
+
+    def _u32(self, name: str) -> memoryview:
+        return self._raw(name).cast("I")
+
+    def _strings(self, name: str) -> StringTable:
+        offset, _ = self.header["sections"][name + ".blob"]
+        return StringTable(
+            self._raw(name + ".blob"), self._u32(name + ".offsets"), self._map, self._body_start + offset,
+        )
+
+    def verify(self) -> bool:
+        digest = hashlib.sha1()
+        for name in self.header["sections"]:
+            digest.update(self._raw(name))
+        return digest.hexdigest() == self.checksum
+
+    def _trie(self, prefix: str) -> PrefixTrie:
+        return PrefixTrie(*(self._u32(f"{prefix}.{field}")
+                            for field in ("child_start", "labels", "value_start", "values")))
+
+    def index(self) -> DictionaryIndex:
+        return DictionaryIndex(
+            entry_ids=self._strings("entry_ids"),
+            headwords=self._strings("headwords"),
+            headword_keys=self._strings("headword_keys"),
+            is_common=self._raw("is_common"),
+            glosses=self._strings("glosses"),
+            words=self._strings("words"),
+            kanji_forms=self._strings("kanji_forms"),
+            kanji_entries=self._u32("kanji_entries"),
+            reading_forms=self._strings("reading_forms"),
+            reading_entries=self._u32("reading_entries"),
+            kanji_trie=self._trie("kanji_trie"),
+            reading_trie=self._trie("reading_trie"),
+            norm_forms=self._strings("norm_forms"),
+            norm_entries=self._u32("norm_entries"),
+            gloss_terms=self._strings("gloss_terms"),
+            gloss_offsets=self._u32("gloss_offsets"),
+            gloss_postings=self._u32("gloss_postings"),
+            gloss_tf=self._u32("gloss_tf"),
+            non_ascii_gloss=self._u32("non_ascii_gloss"),
+            char_entries=CharPostings(
+                self._strings("char_keys"), self._u32("char_offsets"), self._u32("char_postings"),
+            ),
+        )
+
+
+def load_current_snapshot(path: str = DICTIONARY_SNAPSHOT) -> Optional[DictionaryIndex]:
+    """The snapshot's index if it was built from the DB's current dictionary, else None."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        snapshot = Snapshot(path)
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring dictionary snapshot: %s", e)
+        return None
+
+    db_version = get_dictionary_meta(DICTIONARY_VERSION_KEY) or "0"
+    db_checksum = get_dictionary_meta(SNAPSHOT_CHECKSUM_KEY)
+    if snapshot.dictionary_version != db_version or snapshot.checksum != db_checksum:
+        logger.warning(
+            "Dictionary snapshot %s is stale (snapshot version %s, database version %s); rebuild it with "
+            "import_task.py --snapshot-only", path, snapshot.dictionary_version, db_version,
+        )
+        return None
+    if SNAPSHOT_VERIFY and not snapshot.verify():
+        logger.warning("Dictionary snapshot %s failed its checksum; ignoring it", path)
+        return None
+    return snapshot.index()
@@ -1,24 +1,522 @@
 # backend/services/flashcard_service.py
 from __future__ import annotations
 
+import base64
 import json
-from typing import List, Optional
+from datetime import date, datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
-from db_config import get_connection
-from services.search import _extract_word_schema_dict, _parse_word_json
+from db_async import async_connection
+from db_config import STUDY_LOG_UPSERT_SQL, get_connection
+from services.search import _word_from_columns
+from services.study_log_buffer import get_study_log_buffer
+
+
+# --- spaced repetition (SM-2) ---
+#
+# Each review grades recall 0-5. A pass (>= 3) grows the interval: 1 day, 6 days,
+# then the previous interval times the ease factor. A fail restarts the card
+# (due again in RELEARN_DELAY) and counts a lapse if it had been learned. The
+# ease moves with every grade and never drops below MIN_EASE.
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+PASSING_GRADE = 3
+RELEARN_DELAY = timedelta(minutes=10)
+MAX_INTERVAL_DAYS = 36500
+
+
+def schedule_review(state: dict, grade: int, now: datetime) -> dict:
+	"""Next SM-2 state after a review graded 0-5.
+
+	state: interval_days, ease_factor, repetitions, lapses of the card before the review.
+	"""
+	grade = max(0, min(5, int(grade)))
+	interval = int(state.get("interval_days") or 0)
+	ease = float(state.get("ease_factor") or DEFAULT_EASE)
+	repetitions = int(state.get("repetitions") or 0)
+	lapses = int(state.get("lapses") or 0)
+
+	miss = 5 - grade
+	ease = max(MIN_EASE, round(ease + 0.1 - miss * (0.08 + miss * 0.02), 2))
+
+	if grade >= PASSING_GRADE:
+		if repetitions == 0:
+			interval = 1
+		elif repetitions == 1:
+			interval = 6
+		else:
+			interval = min(MAX_INTERVAL_DAYS, max(interval + 1, round(interval * ease)))
+		repetitions += 1
+		due_at = now + timedelta(days=interval)
+	else:
+		if repetitions > 0:
+			lapses += 1
+		interval = 0
+		repetitions = 0
+		due_at = now + RELEARN_DELAY
+
+	return {
+		"is_memorized": grade >= PASSING_GRADE,
+		"interval_days": interval,
+		"ease_factor": ease,
+		"repetitions": repetitions,
+		"lapses": lapses,
+		"due_at": due_at,
+		"last_reviewed_at": now,
+	}
+
+
+_CARD_COLUMNS = """
+		f.id,
+		f.list_id,
+		f.entry_id,
+		f.note,
+		f.is_memorized,
+		f.interval_days,
+		f.ease_factor,
+		f.repetitions,
+		f.lapses,
+		f.due_at,
+		f.last_reviewed_at"""
+
+_WORD_COLUMNS = """
+		e.word_data,
+		IF(e.word_data IS NULL, e.raw_json, NULL)"""
+
+_FLASHCARD_COLUMNS = _CARD_COLUMNS + "," + _WORD_COLUMNS
+
+_GET_FLASHCARD_SQL = f"""
+	SELECT{_FLASHCARD_COLUMNS}
+	FROM flashcards f
+	JOIN entries e ON e.id = f.entry_id
+	WHERE f.id = %s
+"""
+
+_LIST_FLASHCARDS_SQL = f"""
+	SELECT{_FLASHCARD_COLUMNS}
+	FROM flashcards f
+	JOIN entries e ON e.id = f.entry_id
+	WHERE f.list_id = %s
+	ORDER BY f.created_at DESC, f.id DESC
+"""
+
+# Range scan on idx_flashcards_due (list_id, due_at): reads only the cards returned.
+# Times come from the database clock (NOW()), the same one as the due_at and
+# created_at defaults, unless the caller passes `now`.
+_DUE_FLASHCARDS_SQL = f"""
+	SELECT{_FLASHCARD_COLUMNS}
+	FROM flashcards f
+	JOIN entries e ON e.id = f.entry_id
+	WHERE f.list_id = %s AND f.due_at <= COALESCE(%s, NOW())
+	ORDER BY f.due_at ASC, f.id ASC
+	LIMIT %s
+"""
+
+# Keyset pages of a list in the listing order (newest first), seeking past the
+# previous page's last (created_at, id) on idx_flashcards_list_created.
+_LIST_PAGE_AFTER = "AND (f.created_at < %s OR (f.created_at = %s AND f.id < %s))"
+
+_INSERT_FLASHCARD_SQL = """
+	INSERT INTO flashcards (list_id, entry_id, note)
+	VALUES (%s, %s, %s)
+"""
+
+_UPDATE_FLASHCARD_SQL = """
+	UPDATE flashcards
+	SET is_memorized = %s,
+		note = %s
+	WHERE id = %s
+"""
+
+_REVIEW_STATE_SQL = """
+	SELECT interval_days, ease_factor, repetitions, lapses, NOW()
+	FROM flashcards
+	WHERE id = %s
+	FOR UPDATE
+"""
+
+_REVIEW_UPDATE_SQL = """
+	UPDATE flashcards
+	SET is_memorized = %s,
+		interval_days = %s,
+		ease_factor = %s,
+		repetitions = %s,
+		lapses = %s,
+		due_at = %s,
+		last_reviewed_at = %s
+	WHERE id = %s
+"""
+
+_DELETE_FLASHCARD_SQL = "DELETE FROM flashcards WHERE id = %s"
+
+_EMPTY_WORD = {
+	"kanji": None,
+	"kana": "",
+	"is_common": False,
+	"senses": [],
+}
+
+
+def _card_fields(row) -> dict:
+	return {
+		"id": int(row[0]),
+		"list_id": int(row[1]),
+		"entry_id": str(row[2]),
+		"note": row[3],
+		"is_memorized": bool(row[4]),
+		"interval_days": int(row[5]),
+		"ease_factor": float(row[6]),
+		"repetitions": int(row[7]),
+		"lapses": int(row[8]),
+		"due_at": row[9],
+		"last_reviewed_at": row[10],
+	}
+
+
+def _row_to_flashcard(row) -> Optional[dict]:
+	if not row:
+		return None
+
+	card = _card_fields(row)
+	card["word_data"] = _word_from_columns(card["entry_id"], row[11], row[12]) or dict(_EMPTY_WORD)
+	return card
+
+
+def _rows_to_flashcards(rows) -> List[dict]:
+	results: List[dict] = []
+	for row in rows or []:
+		card = _card_fields(row)
+		word_data = _word_from_columns(card["entry_id"], row[11], row[12])
+		if not word_data:
+			continue
+		card["word_data"] = word_data
+		results.append(card)
+	return results
+
+
+# --- list pages and streams ---
+#
+# word_data: "full" (WordSchema), "slim" (headword, reading and first-sense
+# glosses, for list rows) or "none" (card fields only; no entries JOIN).
+
+WORD_DATA_MODES = ("full", "slim", "none")
+MAX_PAGE_SIZE = 500
+STREAM_FETCH_SIZE = 500
+
+
+def _slim_word(word: dict) -> dict:
+	senses = word.get("senses") or []
+	return {
+		"kanji": word.get("kanji"),
+		"kana": word.get("kana") or "",
+		"is_common": bool(word.get("is_common")),
+		"gloss": "; ".join((senses[0].get("glosses") or []) if senses else []),
+	}
+
+
+def _list_query(list_id: int, word_data: str, after: Optional[Tuple[datetime, int]] = None,
+				limit: Optional[int] = None) -> Tuple[str, tuple]:
+	if word_data not in WORD_DATA_MODES:
+		raise ValueError(f"word_data must be one of {', '.join(WORD_DATA_MODES)}")
+	if word_data == "none":
+		columns, joins = _CARD_COLUMNS + ",\n\t\tf.created_at", ""
+	else:
+		columns, joins = _CARD_COLUMNS + ",\n\t\tf.created_at," + _WORD_COLUMNS, "\n\tJOIN entries e ON e.id = f.entry_id"
+	params: list = [list_id]
+	seek = ""
+	if after is not None:
+		seek = _LIST_PAGE_AFTER
+		params.extend((after[0], after[0], after[1]))
+	sql = f"""
+	SELECT{columns}
+	FROM flashcards f{joins}
+	WHERE f.list_id = %s {seek}
+	ORDER BY f.created_at DESC, f.id DESC
+	"""
+	if limit is not None:
+		sql += "LIMIT %s\n"
+		params.append(int(limit))
+	return sql, tuple(params)
+
+
+def _row_to_list_item(row, word_data: str) -> Optional[dict]:
+	card = _card_fields(row)
+	card["created_at"] = row[11]
+	if word_data == "none":
+		return card
+	word = _word_from_columns(card["entry_id"], row[12], row[13])
+	if not word:
+		return None
+	card["word_data"] = word if word_data == "full" else _slim_word(word)
+	return card
+
+
+def _encode_list_cursor(created_at: datetime, flashcard_id: int) -> str:
+	payload = json.dumps({"c": created_at.isoformat(), "id": int(flashcard_id)})
+	return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_list_cursor(cursor: str) -> Tuple[datetime, int]:
+	try:
+		padded = cursor + "=" * (-len(cursor) % 4)
+		data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+		return datetime.fromisoformat(str(data["c"])), int(data["id"])
+	except (ValueError, KeyError, TypeError) as e:
+		raise ValueError("Invalid cursor") from e
+
+
+def _list_page_query(list_id: int, limit: int, cursor: Optional[str], word_data: str) -> Tuple[str, tuple]:
+	after = _decode_list_cursor(cursor) if cursor else None
+	# One extra row tells whether there is a next page.
+	return _list_query(list_id, word_data, after, max(1, min(int(limit), MAX_PAGE_SIZE)) + 1)
+
+
+def _list_page(rows, limit: int, word_data: str) -> dict:
+	limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+	rows = list(rows or [])
+	has_more = len(rows) > limit
+	rows = rows[:limit]
+	items = [item for item in (_row_to_list_item(row, word_data) for row in rows) if item is not None]
+	next_cursor = _encode_list_cursor(rows[-1][11], rows[-1][0]) if has_more else None
+	return {"items": items, "next_cursor": next_cursor}
+
+
+def _json_default(value):
+	if isinstance(value, datetime):
+		return value.isoformat()
+	raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _review_update_params(state_row, grade: int, now: Optional[datetime], flashcard_id: int) -> tuple:
+	state = schedule_review(
+		{
+			"interval_days": state_row[0],
+			"ease_factor": state_row[1],
+			"repetitions": state_row[2],
+			"lapses": state_row[3],
+		},
+		grade,
+		now or state_row[4],
+	)
+	return (
+		1 if state["is_memorized"] else 0,
+		state["interval_days"],
+		state["ease_factor"],
+		state["repetitions"],
+		state["lapses"],
+		state["due_at"],
+		state["last_reviewed_at"],
+		flashcard_id,
+	)
+
+
+# --- batched reviews ---
+#
+# A study session submits its reviews together: one transaction locks the cards,
+# writes all new states with a single multi-row UPDATE and adds the reviews to
+# today's study_logs row once.
+
+_SCHEDULE_COLUMNS = (
+	"is_memorized",
+	"interval_days",
+	"ease_factor",
+	"repetitions",
+	"lapses",
+	"due_at",
+	"last_reviewed_at",
+)
+
+
+def _placeholders(n: int) -> str:
+	return ", ".join(["%s"] * n)
+
+
+def _batch_state_query(ids: Sequence[int]) -> Tuple[str, tuple]:
+	# Locks in id order so concurrent batches cannot deadlock on each other.
+	sql = f"""
+	SELECT id, interval_days, ease_factor, repetitions, lapses, NOW()
+	FROM flashcards
+	WHERE id IN ({_placeholders(len(ids))})
+	ORDER BY id
+	FOR UPDATE
+	"""
+	return sql, tuple(ids)
+
+
+def _apply_reviews(state_rows, reviews: Sequence[Tuple[int, int]], now: Optional[datetime]) -> Tuple[Dict[int, dict], int, List[int]]:
+	"""Run the reviews (in order, so a card graded twice is scheduled twice) over the
+	locked states; returns (new state per card, reviews applied, missing ids).
+	Without `now`, the database time read with the states is used."""
+	state_rows = state_rows or []
+	if now is None and state_rows:
+		now = state_rows[0][5]
+	states: Dict[int, dict] = {
+		int(row[0]): {
+			"interval_days": row[1],
+			"ease_factor": row[2],
+			"repetitions": row[3],
+			"lapses": row[4],
+		}
+		for row in state_rows
+	}
+	updated: Dict[int, dict] = {}
+	missing: List[int] = []
+	applied = 0
+	for flashcard_id, grade in reviews:
+		state = updated.get(flashcard_id) or states.get(flashcard_id)
+		if state is None:
+			if flashcard_id not in missing:
+				missing.append(flashcard_id)
+			continue
+		updated[flashcard_id] = schedule_review(state, grade, now)
+		applied += 1
+	return updated, applied, missing
+
+
+def _batch_update_query(states: Dict[int, dict]) -> Tuple[str, list]:
+	"""UPDATE flashcards SET col = CASE id WHEN ... END, ... WHERE id IN (...)."""
+	ids = sorted(states)
+	assignments: List[str] = []
+	params: list = []
+	for column in _SCHEDULE_COLUMNS:
+		assignments.append(f"{column} = CASE id {' '.join(['WHEN %s THEN %s'] * len(ids))} END")
+		for flashcard_id in ids:
+			value = states[flashcard_id][column]
+			params.extend((flashcard_id, int(value) if isinstance(value, bool) else value))
+	params.extend(ids)
+	sql = f"UPDATE flashcards SET {', '.join(assignments)} WHERE id IN ({_placeholders(len(ids))})"
+	return sql, params
+
+
+def _cards_by_id_query(ids: Sequence[int]) -> Tuple[str, tuple]:
+	sql = f"""
+	SELECT{_FLASHCARD_COLUMNS}
+	FROM flashcards f
+	JOIN entries e ON e.id = f.entry_id
+	WHERE f.id IN ({_placeholders(len(ids))})
+	"""
+	return sql, tuple(ids)
+
+
+def _review_results(states: Dict[int, dict], missing: List[int], card_rows=None) -> dict:
+	"""Compact per-card results; with card_rows, the full cards (word_data included)."""
+	if card_rows is not None:
+		cards = {card["id"]: card for card in (_row_to_flashcard(row) for row in card_rows)}
+		results = [cards[i] for i in sorted(states) if i in cards]
+	else:
+		results = [
+			{"id": flashcard_id, **{column: state[column] for column in _SCHEDULE_COLUMNS}}
+			for flashcard_id, state in sorted(states.items())
+		]
+	return {"results": results, "missing": missing}
+
+
+# --- bulk add ---
+#
+# Many entries into one list with a few round trips: one lookup classifies the
+# ids (unknown entry / already in the list), one multi-row INSERT IGNORE adds
+# the rest and one SELECT returns the new card ids. Chunked by BULK_CHUNK_SIZE.
+
+BULK_CHUNK_SIZE = 1000
+
+_LIST_EXISTS_SQL = "SELECT id FROM vocab_lists WHERE id = %s"
+
+
+def _unique_ids(entry_ids: Sequence[str]) -> List[str]:
+	seen: Dict[str, None] = {}
+	for entry_id in entry_ids:
+		entry_id = str(entry_id).strip()
+		if entry_id:
+			seen.setdefault(entry_id, None)
+	return list(seen)
+
+
+def _bulk_lookup_query(list_id: int, entry_ids: Sequence[str]) -> Tuple[str, tuple]:
+	"""(entry id, existing card id or NULL) of the ids that are dictionary entries."""
+	sql = f"""
+	SELECT e.id, f.id
+	FROM entries e
+	LEFT JOIN flashcards f ON f.entry_id = e.id AND f.list_id = %s
+	WHERE e.id IN ({_placeholders(len(entry_ids))})
+	"""
+	return sql, (list_id, *entry_ids)
+
+
+def _bulk_insert_query(list_id: int, entry_ids: Sequence[str], note: Optional[str]) -> Tuple[str, list]:
+	params: list = []
+	for entry_id in entry_ids:
+		params.extend((list_id, entry_id, note))
+	sql = f"""
+	INSERT IGNORE INTO flashcards (list_id, entry_id, note)
+	VALUES {", ".join(["(%s, %s, %s)"] * len(entry_ids))}
+	"""
+	return sql, params
+
+
+def _bulk_added_query(list_id: int, entry_ids: Sequence[str]) -> Tuple[str, tuple]:
+	sql = f"""
+	SELECT id, entry_id
+	FROM flashcards
+	WHERE list_id = %s AND entry_id IN ({_placeholders(len(entry_ids))})
+	FOR SHARE
+	"""
+	return sql, (list_id, *entry_ids)
+
+
+def _classify_bulk(chunk: Sequence[str], lookup_rows) -> Tuple[List[str], List[dict], List[str]]:
+	"""(ids to insert, duplicates as {entry_id, id}, invalid ids) in request order."""
+	found = {str(row[0]): row[1] for row in lookup_rows or []}
+	to_insert: List[str] = []
+	duplicates: List[dict] = []
+	invalid: List[str] = []
+	for entry_id in chunk:
+		if entry_id not in found:
+			invalid.append(entry_id)
+		elif found[entry_id] is not None:
+			duplicates.append({"entry_id": entry_id, "id": int(found[entry_id])})
+		else:
+			to_insert.append(entry_id)
+	return to_insert, duplicates, invalid
+
+
+def _split_inserted(to_insert: Sequence[str], rows, inserted: int, first_id) -> Tuple[list, List[dict]]:
+	"""Cards of to_insert after the INSERT IGNORE: (rows it added, duplicates).
+
+	When it inserted fewer rows than asked, a concurrent request added the others
+	between the lookup and the insert. The statement's ids are allocated as one
+	block from first_id, so a card outside that block is a duplicate. rows come
+	from a locking read (latest committed data); an id the insert skipped whose
+	card is missing from them (deleted meanwhile) is still a duplicate, without an id.
+	"""
+	found = {str(row[1]): row for row in rows or []}
+	start = int(first_id or 0) if inserted else None
+	added: list = []
+	duplicates: List[dict] = []
+	for entry_id in to_insert:
+		row = found.get(entry_id)
+		if row is not None and start is not None and start <= int(row[0]) < start + len(to_insert):
+			added.append(row)
+		else:
+			duplicates.append({"entry_id": entry_id, "id": int(row[0]) if row is not None else None})
+	return added, duplicates
+
+
+def _bulk_report(list_id: int, entry_ids: List[str], added_rows, duplicates: List[dict], invalid: List[str]) -> dict:
+	added_by_id = {str(row[1]): int(row[0]) for row in added_rows}
+	return {
+		"list_id": list_id,
+		"added": [{"entry_id": entry_id, "id": added_by_id[entry_id]} for entry_id in entry_ids if entry_id in added_by_id],
+		"duplicates": duplicates,
+		"invalid": invalid,
+	}
 
 
 def create_flashcard(list_id: int, entry_id: str, note: Optional[str] = None) -> dict:
 	conn = get_connection()
 	cursor = conn.cursor()
 	try:
-		cursor.execute(
-			"""
-			INSERT INTO flashcards (list_id, entry_id, note)
-			VALUES (%s, %s, %s)
-			""",
-			(list_id, entry_id, note),
-		)
+		cursor.execute(_INSERT_FLASHCARD_SQL, (list_id, entry_id, note))
 		conn.commit()
 		flashcard_id = int(cursor.lastrowid)
 	finally:
@@ -32,47 +530,50 @@ def create_flashcard(list_id: int, entry_id: str, note: Optional[str] = None) ->
 	return card
 
 
-def get_flashcard(flashcard_id: int) -> Optional[dict]:
+def add_flashcards_bulk(list_id: int, entry_ids: Sequence[str], note: Optional[str] = None) -> Optional[dict]:
+	"""Add many entries to a list in one transaction; None if the list does not exist.
+
+	Returns {"list_id", "added": [{entry_id, id}], "duplicates": [{entry_id, id}],
+	"invalid": [entry_id]}. Ids repeated in the request are added once.
+	"""
+	entry_ids = _unique_ids(entry_ids)
 	conn = get_connection()
 	cursor = conn.cursor()
 	try:
-		cursor.execute(
-			"""
-			SELECT
-				f.id,
-				f.list_id,
-				f.entry_id,
-				f.note,
-				f.is_memorized,
-				e.raw_json
-			FROM flashcards f
-			JOIN entries e ON e.id = f.entry_id
-			WHERE f.id = %s
-			""",
-			(flashcard_id,),
-		)
-		row = cursor.fetchone()
-		if not row:
+		cursor.execute(_LIST_EXISTS_SQL, (list_id,))
+		if cursor.fetchone() is None:
 			return None
+		inserted: List[str] = []
+		added_rows: list = []
+		duplicates: List[dict] = []
+		invalid: List[str] = []
+		for i in range(0, len(entry_ids), BULK_CHUNK_SIZE):
+			chunk = entry_ids[i:i + BULK_CHUNK_SIZE]
+			cursor.execute(*_bulk_lookup_query(list_id, chunk))
+			to_insert, chunk_duplicates, chunk_invalid = _classify_bulk(chunk, cursor.fetchall())
+			duplicates.extend(chunk_duplicates)
+			invalid.extend(chunk_invalid)
+			if to_insert:
+				cursor.execute(*_bulk_insert_query(list_id, to_insert, note))
+				count, first_id = cursor.rowcount, cursor.lastrowid
+				cursor.execute(*_bulk_added_query(list_id, to_insert))
+				chunk_added, chunk_duplicates = _split_inserted(to_insert, cursor.fetchall(), count, first_id)
+				added_rows.extend(chunk_added)
+				duplicates.extend(chunk_duplicates)
+				inserted.extend(to_insert)
+		conn.commit()
+	finally:
+		cursor.close()
+		conn.close()
+	return _bulk_report(list_id, inserted, added_rows, duplicates, invalid)
 
-		raw_json = row[5]
-		word_obj = _parse_word_json(raw_json) or {}
-		entry_id = str(row[2])
-		word_data = _extract_word_schema_dict(word_obj, entry_id=entry_id) if word_obj else {
-			"kanji": None,
-			"kana": "",
-			"is_common": False,
-			"senses": [],
-		}
 
-		return {
-			"id": int(row[0]),
-			"list_id": int(row[1]),
-			"entry_id": str(row[2]),
-			"note": row[3],
-			"is_memorized": bool(row[4]),
-			"word_data": word_data,
-		}
+def get_flashcard(flashcard_id: int) -> Optional[dict]:
+	conn = get_connection()
+	cursor = conn.cursor()
+	try:
+		cursor.execute(_GET_FLASHCARD_SQL, (flashcard_id,))
+		return _row_to_flashcard(cursor.fetchone())
 	finally:
 		cursor.close()
 		conn.close()
@@ -82,58 +583,106 @@ def get_flashcards_by_list(list_id: int) -> List[dict]:
 	conn = get_connection()
 	cursor = conn.cursor()
 	try:
-		cursor.execute(
-			"""
-			SELECT
-				f.id,
-				f.list_id,
-				f.entry_id,
-				f.note,
-				f.is_memorized,
-				e.raw_json
-			FROM flashcards f
-			JOIN entries e ON e.id = f.entry_id
-			WHERE f.list_id = %s
-			ORDER BY f.created_at DESC, f.id DESC
-			""",
-			(list_id,),
-		)
-
-		results: List[dict] = []
-		for row in cursor.fetchall() or []:
-			word_obj = _parse_word_json(row[5])
-			if not word_obj:
-				continue
-			entry_id = str(row[2])
-			results.append(
-				{
-					"id": int(row[0]),
-					"list_id": int(row[1]),
-					"entry_id": str(row[2]),
-					"note": row[3],
-					"is_memorized": bool(row[4]),
-					"word_data": _extract_word_schema_dict(word_obj, entry_id=entry_id),
-				}
-			)
-		return results
+		cursor.execute(_LIST_FLASHCARDS_SQL, (list_id,))
+		return _rows_to_flashcards(cursor.fetchall())
 	finally:
 		cursor.close()
 		conn.close()
 
 
+def get_flashcards_page(list_id: int, limit: int = 100, cursor: Optional[str] = None,
+						word_data: str = "full") -> dict:
+	"""One page of a list, newest first: {"items", "next_cursor"}.
+
+	Pass the previous page's next_cursor to continue. Raises ValueError for a
+	malformed cursor or an unknown word_data mode.
+	"""
+	sql, params = _list_page_query(list_id, limit, cursor, word_data)
+	conn = get_connection()
+	db_cursor = conn.cursor()
+	try:
+		db_cursor.execute(sql, params)
+		return _list_page(db_cursor.fetchall(), limit, word_data)
+	finally:
+		db_cursor.close()
+		conn.close()
+
+
+def get_due_flashcards(list_id: int, limit: int = 20, now: Optional[datetime] = None) -> List[dict]:
+	"""The next `limit` cards of a list that are due, most overdue first."""
+	conn = get_connection()
+	cursor = conn.cursor()
+	try:
+		cursor.execute(_DUE_FLASHCARDS_SQL, (list_id, now, int(limit)))
+		return _rows_to_flashcards(cursor.fetchall())
+	finally:
+		cursor.close()
+		conn.close()
+
+
+def review_flashcard(flashcard_id: int, grade: int, now: Optional[datetime] = None) -> Optional[dict]:
+	"""Record a review graded 0-5 and reschedule the card; None if it does not exist."""
+	conn = get_connection()
+	cursor = conn.cursor()
+	try:
+		cursor.execute(_REVIEW_STATE_SQL, (flashcard_id,))
+		state_row = cursor.fetchone()
+		if state_row is None:
+			conn.rollback()
+			return None
+		cursor.execute(_REVIEW_UPDATE_SQL, _review_update_params(state_row, grade, now, flashcard_id))
+		conn.commit()
+	finally:
+		cursor.close()
+		conn.close()
+
+	return get_flashcard(flashcard_id)
+
+
+def review_flashcards(
+	reviews: Sequence[Tuple[int, int]],
+	include_word_data: bool = False,
+	now: Optional[datetime] = None,
+) -> dict:
+	"""Apply (flashcard_id, grade) reviews in one transaction.
+
+	Returns {"results": [...], "missing": [ids not found]}; results are compact
+	schedule states unless include_word_data is set.
+	"""
+	ids = sorted({int(flashcard_id) for flashcard_id, _ in reviews})
+	if not ids:
+		return {"results": [], "missing": []}
+	# As review_flashcards_async; outside the app (no flusher running) the count
+	# is written in the transaction so it is not left in an unflushed buffer.
+	study_logs = get_study_log_buffer()
+	buffered = study_logs.enabled and study_logs.running
+	conn = get_connection()
+	cursor = conn.cursor()
+	try:
+		cursor.execute(*_batch_state_query(ids))
+		states, applied, missing = _apply_reviews(cursor.fetchall(), reviews, now)
+		card_rows = None
+		if states:
+			cursor.execute(*_batch_update_query(states))
+			if not buffered:
+				cursor.execute(STUDY_LOG_UPSERT_SQL, (date.today(), applied))
+			if include_word_data:
+				cursor.execute(*_cards_by_id_query(sorted(states)))
+				card_rows = cursor.fetchall()
+		conn.commit()
+	finally:
+		cursor.close()
+		conn.close()
+	if applied and buffered:
+		study_logs.add(date.today(), applied)
+	return _review_results(states, missing, card_rows)
+
+
 def update_flashcard(flashcard_id: int, is_memorized: bool, note: Optional[str]) -> Optional[dict]:
 	conn = get_connection()
 	cursor = conn.cursor()
 	try:
-		cursor.execute(
-			"""
-			UPDATE flashcards
-			SET is_memorized = %s,
-				note = %s
-			WHERE id = %s
-			""",
-			(1 if is_memorized else 0, note, flashcard_id),
-		)
+		cursor.execute(_UPDATE_FLASHCARD_SQL, (1 if is_memorized else 0, note, flashcard_id))
 		conn.commit()
 	finally:
 		cursor.close()
@@ -146,9 +695,211 @@ def delete_flashcard(flashcard_id: int) -> bool:
 	conn = get_connection()
 	cursor = conn.cursor()
 	try:
-		cursor.execute("DELETE FROM flashcards WHERE id = %s", (flashcard_id,))
+		cursor.execute(_DELETE_FLASHCARD_SQL, (flashcard_id,))
 		conn.commit()
 		return cursor.rowcount > 0
 	finally:
 		cursor.close()
 		conn.close()
+
+
+# --- async variants (API routes) ---
+
+
+async def create_flashcard_async(list_id: int, entry_id: str, note: Optional[str] = None) -> dict:
+	async with async_connection() as conn:
+		cursor = await conn.cursor()
+		try:
+			await cursor.execute(_INSERT_FLASHCARD_SQL, (list_id, entry_id, note))
+			await conn.commit()
+			flashcard_id = int(cursor.lastrowid)
+		finally:
+			await cursor.close()
+
+	card = await get_flashcard_async(flashcard_id)
+	if card is None:
+		raise RuntimeError("Failed to load created flashcard")
+	return card
+
+
+async def add_flashcards_bulk_async(list_id: int, entry_ids: Sequence[str],
+									note: Optional[str] = None) -> Optional[dict]:
+	entry_ids = _unique_ids(entry_ids)
+	async with async_connection() as conn:
+		cursor = await conn.cursor()
+		try:
+			await cursor.execute(_LIST_EXISTS_SQL, (list_id,))
+			if await cursor.fetchone() is None:
+				return None
+			inserted: List[str] = []
+			added_rows: list = []
+			duplicates: List[dict] = []
+			invalid: List[str] = []
+			for i in range(0, len(entry_ids), BULK_CHUNK_SIZE):
+				chunk = entry_ids[i:i + BULK_CHUNK_SIZE]
+				await cursor.execute(*_bulk_lookup_query(list_id, chunk))
+				to_insert, chunk_duplicates, chunk_invalid = _classify_bulk(chunk, await cursor.fetchall())
+				duplicates.extend(chunk_duplicates)
+				invalid.extend(chunk_invalid)
+				if to_insert:
+					await cursor.execute(*_bulk_insert_query(list_id, to_insert, note))
+					count, first_id = cursor.rowcount, cursor.lastrowid
+					await cursor.execute(*_bulk_added_query(list_id, to_insert))
+					chunk_added, chunk_duplicates = _split_inserted(to_insert, await cursor.fetchall(), count, first_id)
+					added_rows.extend(chunk_added)
+					duplicates.extend(chunk_duplicates)
+					inserted.extend(to_insert)
+			await conn.commit()
+		finally:
+			await cursor.close()
+	return _bulk_report(list_id, inserted, added_rows, duplicates, invalid)
+
+
+async def get_flashcard_async(flashcard_id: int) -> Optional[dict]:
+	async with async_connection() as conn:
+		cursor = await conn.cursor()
+		try:
+			await cursor.execute(_GET_FLASHCARD_SQL, (flashcard_id,))
+			return _row_to_flashcard(await cursor.fetchone())
+		finally:
+			await cursor.close()
+
+
+async def get_flashcards_by_list_async(list_id: int) -> List[dict]:
+	async with async_connection() as conn:
+		cursor = await conn.cursor()
+		try:
+			await cursor.execute(_LIST_FLASHCARDS_SQL, (list_id,))
+			return _rows_to_flashcards(await cursor.fetchall())
+		finally:
+			await cursor.close()
+
+
+async def get_flashcards_page_async(list_id: int, limit: int = 100, cursor: Optional[str] = None,
+									word_data: str = "full") -> dict:
+	sql, params = _list_page_query(list_id, limit, cursor, word_data)
+	async with async_connection() as conn:
+		db_cursor = await conn.cursor()
+		try:
+			await db_cursor.execute(sql, params)
+			return _list_page(await db_cursor.fetchall(), limit, word_data)
+		finally:
+			await db_cursor.close()
+
+
+async def stream_flashcards_ndjson(list_id: int, word_data: str = "full") -> AsyncIterator[str]:
+	"""A list's cards as NDJSON lines, newest first, yielded as rows arrive."""
+	sql, params = _list_query(list_id, word_data)
+	async with async_connection() as conn:
+		cursor = await conn.cursor()
+		try:
+			await cursor.execute(sql, params)
+			while True:
+				rows = await cursor.fetchmany(STREAM_FETCH_SIZE)
+				if not rows:
+					break
+				lines = []
+				for row in rows:
+					item = _row_to_list_item(row, word_data)
+					if item is not None:
+						lines.append(json.dumps(item, ensure_ascii=False, default=_json_default) + "\n")
+				if lines:
+					yield "".join(lines)
+		finally:
+			await cursor.close()
+
+
+async def probe_flashcards_stream(list_id: int) -> None:
+	"""Run a cheap query on a pooled connection and give it back, so a database
+	error raises before the stream's response has started. The stream opens its
+	own connection once iterated; a response that is never sent holds none."""
+	async with async_connection() as conn:
+		cursor = await conn.cursor()
+		try:
+			await cursor.execute(_LIST_EXISTS_SQL, (list_id,))
+			await cursor.fetchall()
+		finally:
+			await cursor.close()
+
+
+async def get_due_flashcards_async(list_id: int, limit: int = 20, now: Optional[datetime] = None) -> List[dict]:
+	async with async_connection() as conn:
+		cursor = await conn.cursor()
+		try:
+			await cursor.execute(_DUE_FLASHCARDS_SQL, (list_id, now, int(limit)))
+			return _rows_to_flashcards(await cursor.fetchall())
+		finally:
+			await cursor.close()
+
+
+async def review_flashcard_async(flashcard_id: int, grade: int, now: Optional[datetime] = None) -> Optional[dict]:
+	async with async_connection() as conn:
+		cursor = await conn.cursor()
+		try:
+			await cursor.execute(_REVIEW_STATE_SQL, (flashcard_id,))
+			state_row = await cursor.fetchone()
+			if state_row is None:
+				await conn.rollback()
+				return None
+			await cursor.execute(_REVIEW_UPDATE_SQL, _review_update_params(state_row, grade, now, flashcard_id))
+			await conn.commit()
+		finally:
+			await cursor.close()
+
+	return await get_flashcard_async(flashcard_id)
+
+
+async def review_flashcards_async(
+	reviews: Sequence[Tuple[int, int]],
+	include_word_data: bool = False,
+	now: Optional[datetime] = None,
+) -> dict:
+	ids = sorted({int(flashcard_id) for flashcard_id, _ in reviews})
+	if not ids:
+		return {"results": [], "missing": []}
+	# With the write-behind buffer on, the day's count is added after commit
+	# instead of holding today's study_logs row lock for the whole transaction.
+	study_logs = get_study_log_buffer()
+	buffered = study_logs.enabled and study_logs.running
+	async with async_connection() as conn:
+		cursor = await conn.cursor()
+		try:
+			await cursor.execute(*_batch_state_query(ids))
+			states, applied, missing = _apply_reviews(await cursor.fetchall(), reviews, now)
+			card_rows = None
+			if states:
+				await cursor.execute(*_batch_update_query(states))
+				if not buffered:
+					await cursor.execute(STUDY_LOG_UPSERT_SQL, (date.today(), applied))
+				if include_word_data:
+					await cursor.execute(*_cards_by_id_query(sorted(states)))
+					card_rows = await cursor.fetchall()
+			await conn.commit()
+		finally:
+			await cursor.close()
+	if applied and buffered:
+		study_logs.add(date.today(), applied)
+	return _review_results(states, missing, card_rows)
+
+
+async def update_flashcard_async(flashcard_id: int, is_memorized: bool, note: Optional[str]) -> Optional[dict]:
+	async with async_connection() as conn:
+		cursor = await conn.cursor()
+		try:
+			await cursor.execute(_UPDATE_FLASHCARD_SQL, (1 if is_memorized else 0, note, flashcard_id))
+			await conn.commit()
+		finally:
+			await cursor.close()
+
+	return await get_flashcard_async(flashcard_id)
+
+
+async def delete_flashcard_async(flashcard_id: int) -> bool:
+	async with async_connection() as conn:
+		cursor = await conn.cursor()
+		try:
+			await cursor.execute(_DELETE_FLASHCARD_SQL, (flashcard_id,))
+			await conn.commit()
+			return cursor.rowcount > 0
+		finally:
+			await cursor.close()
@@ -3,9 +3,31 @@ from __future__ import annotations
 
 from typing import List, Optional
 
+from db_async import async_connection
 from db_config import get_connection
 
 
+_GET_LISTS_SQL = """
+	SELECT
+		l.id,
+		l.name,
+		l.description,
+		COALESCE(COUNT(f.id), 0) AS count
+	FROM vocab_lists l
+	LEFT JOIN flashcards f ON f.list_id = l.id
+	GROUP BY l.id, l.name, l.description
+	ORDER BY l.created_at DESC, l.id DESC
+"""
+
+
+def _normalize_list_rows(rows) -> List[dict]:
+	rows = rows or []
+	for row in rows:
+		row["id"] = int(row["id"])
+		row["count"] = int(row["count"]) if row.get("count") is not None else 0
+	return rows
+
+
 def create_list(name: str) -> dict:
 	conn = get_connection()
 	cursor = conn.cursor()
@@ -26,24 +48,8 @@ def get_lists() -> List[dict]:
 	conn = get_connection()
 	cursor = conn.cursor(dictionary=True)
 	try:
-		cursor.execute(
-			"""
-			SELECT
-				l.id,
-				l.name,
-				l.description,
-				COALESCE(COUNT(f.id), 0) AS count
-			FROM vocab_lists l
-			LEFT JOIN flashcards f ON f.list_id = l.id
-			GROUP BY l.id, l.name, l.description
-			ORDER BY l.created_at DESC, l.id DESC
-			"""
-		)
-		rows = cursor.fetchall() or []
-		for row in rows:
-			row["id"] = int(row["id"])
-			row["count"] = int(row["count"]) if row.get("count") is not None else 0
-		return rows
+		cursor.execute(_GET_LISTS_SQL)
+		return _normalize_list_rows(cursor.fetchall())
 	finally:
 		cursor.close()
 		conn.close()
@@ -79,3 +85,58 @@ def delete_list(list_id: int) -> bool:
 	finally:
 		cursor.close()
 		conn.close()
+
+
+# --- async variants (API routes) ---
+
+
+async def create_list_async(name: str) -> dict:
+	async with async_connection() as conn:
+		cursor = await conn.cursor()
+		try:
+			await cursor.execute("INSERT INTO vocab_lists (name) VALUES (%s)", (name,))
+			await conn.commit()
+			return {"id": int(cursor.lastrowid), "name": name, "count": 0}
+		finally:
+			await cursor.close()
+
+
+async def get_lists_async() -> List[dict]:
+	async with async_connection() as conn:
+		cursor = await conn.cursor(dictionary=True)
+		try:
+			await cursor.execute(_GET_LISTS_SQL)
+			return _normalize_list_rows(await cursor.fetchall())
+		finally:
+			await cursor.close()
+
+
+async def update_list_async(list_id: int, name: str, description: str = None) -> Optional[dict]:
+	async with async_connection() as conn:
+		cursor = await conn.cursor(dictionary=True)
+		try:
+			await cursor.execute(
+				"UPDATE vocab_lists SET name = %s, description = %s WHERE id = %s",
+				(name, description, list_id)
+			)
+			await conn.commit()
+			if cursor.rowcount == 0:
+				return None
+			await cursor.execute("SELECT * FROM vocab_lists WHERE id = %s", (list_id,))
+			row = await cursor.fetchone()
+			if row:
+				row["id"] = int(row["id"])
+				return row
+		finally:
+			await cursor.close()
+
+
+async def delete_list_async(list_id: int) -> bool:
+	async with async_connection() as conn:
+		cursor = await conn.cursor()
+		try:
+			await cursor.execute("DELETE FROM vocab_lists WHERE id = %s", (list_id,))
+			await conn.commit()
+			return cursor.rowcount > 0
+		finally:
+			await cursor.close()
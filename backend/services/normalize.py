@@ -0,0 +1,262 @@
+# backend/services/normalize.py
+"""Reading and gloss normalization shared by the importer and search.
+
+entry_reading.reading_norm holds normalize_reading(reading_text): NFKC width
+folding, katakana -> hiragana and long vowels spelled one way, so that
+タベル, ﾀﾍﾞﾙ and たべる, or コーヒー and romaji "kōhī", meet on one key.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import List, Optional, Tuple
+
+_KATAKANA_START = 0x30A1  # ァ
+_KATAKANA_END = 0x30F6    # ヶ
+_KANA_SHIFT = 0x60
+_LONG_MARK = "ー"
+
+# Vowel of every hiragana that can precede ー / a long romaji vowel.
+_VOWEL_ROWS = {
+    "あ": "あかさたなはまやらわがざだばぱぁゃゎ",
+    "い": "いきしちにひみりぎじぢびぴぃ",
+    "う": "うくすつぬふむゆるぐずづぶぷぅゅゔっ",
+    "え": "えけせてねへめれげぜでべぺぇ",
+    "お": "おこそとのほもよろをごぞどぼぽぉょ",
+}
+_VOWEL_OF = {kana: vowel for vowel, row in _VOWEL_ROWS.items() for kana in row}
+
+_KANA_RE = re.compile(r"^[ぁ-ゖゝゞー]+$")
+_ROMAJI_RE = re.compile(r"^[a-z' \-]+$")
+
+# Hepburn long vowels (and their circumflex spelling). ō is far more often おう than おお.
+_LONG_VOWELS = str.maketrans({
+    "ā": "aa", "ī": "ii", "ū": "uu", "ē": "ee", "ō": "ou",
+    "â": "aa", "î": "ii", "û": "uu", "ê": "ee", "ô": "ou",
+})
+
+_ROMAJI = {
+    "a": "あ", "i": "い", "u": "う", "e": "え", "o": "お",
+    "ka": "か", "ki": "き", "ku": "く", "ke": "け", "ko": "こ",
+    "ga": "が", "gi": "ぎ", "gu": "ぐ", "ge": "げ", "go": "ご",
+    "sa": "さ", "si": "し", "shi": "し", "su": "す", "se": "せ", "so": "そ",
+    "za": "ざ", "zi": "じ", "ji": "じ", "zu": "ず", "ze": "ぜ", "zo": "ぞ",
+    "ta": "た", "ti": "ち", "chi": "ち", "tu": "つ", "tsu": "つ", "te": "て", "to": "と",
+    "da": "だ", "di": "ぢ", "du": "づ", "de": "で", "do": "ど",
+    "na": "な", "ni": "に", "nu": "ぬ", "ne": "ね", "no": "の",
+    "ha": "は", "hi": "ひ", "hu": "ふ", "fu": "ふ", "he": "へ", "ho": "ほ",
+    "ba": "ば", "bi": "び", "bu": "ぶ", "be": "べ", "bo": "ぼ",
+    "pa": "ぱ", "pi": "ぴ", "pu": "ぷ", "pe": "ぺ", "po": "ぽ",
+    "ma": "ま", "mi": "み", "mu": "む", "me": "め", "mo": "も",
+    "ya": "や", "yu": "ゆ", "yo": "よ",
+    "ra": "ら", "ri": "り", "ru": "る", "re": "れ", "ro": "ろ",
+    "wa": "わ", "wi": "うぃ", "we": "うぇ", "wo": "を",
+    "vu": "ゔ",
+    "kya": "きゃ", "kyu": "きゅ", "kyo": "きょ",
+    "gya": "ぎゃ", "gyu": "ぎゅ", "gyo": "ぎょ",
+    "sha": "しゃ", "shu": "しゅ", "she": "しぇ", "sho": "しょ",
+    "sya": "しゃ", "syu": "しゅ", "syo": "しょ",
+    "ja": "じゃ", "ju": "じゅ", "je": "じぇ", "jo": "じょ",
+    "zya": "じゃ", "zyu": "じゅ", "zyo": "じょ",
+    "jya": "じゃ", "jyu": "じゅ", "jyo": "じょ",
+    "cha": "ちゃ", "chu": "ちゅ", "che": "ちぇ", "cho": "ちょ",
+    "tya": "ちゃ", "tyu": "ちゅ", "tyo": "ちょ",
+    "cya": "ちゃ", "cyu": "ちゅ", "cyo": "ちょ",
+    "dya": "ぢゃ", "dyu": "ぢゅ", "dyo": "ぢょ",
+    "nya": "にゃ", "nyu": "にゅ", "nyo": "にょ",
+    "hya": "ひゃ", "hyu": "ひゅ", "hyo": "ひょ",
+    "bya": "びゃ", "byu": "びゅ", "byo": "びょ",
+    "pya": "ぴゃ", "pyu": "ぴゅ", "pyo": "ぴょ",
+    "mya": "みゃ", "myu": "みゅ", "myo": "みょ",
+    "rya": "りゃ", "ryu": "りゅ", "ryo": "りょ",
+    "fa": "ふぁ", "fi": "ふぃ", "fe": "ふぇ", "fo": "ふぉ",
+    "thi": "てぃ", "dhi": "でぃ", "twu": "とぅ", "dwu": "どぅ",
+    "va": "ゔぁ", "vi": "ゔぃ", "ve": "ゔぇ", "vo": "ゔぉ",
+    "-": _LONG_MARK,
+}
+_VOWELS = "aiueo"
+
+# ぢ / づ are romanized ji / zu in Hepburn, so the key does not tell them apart.
+_KEY_FOLD = str.maketrans("ぢづ", "じず")
+
+
+def fold_width(text: str) -> str:
+    """NFKC: full-width ASCII -> ASCII, half-width katakana -> katakana, etc."""
+    return unicodedata.normalize("NFKC", text)
+
+
+def katakana_to_hiragana(text: str) -> str:
+    return "".join(
+        chr(ord(ch) - _KANA_SHIFT) if _KATAKANA_START <= ord(ch) <= _KATAKANA_END else ch
+        for ch in text
+    )
+
+
+def _fold_long_vowels(text: str) -> str:
+    """Spell ー as the vowel it lengthens, and write every long o as おう.
+
+    Romaji ō cannot tell おお from おう (おおきい / おうさま), so the key drops
+    the difference: こーひー, こうひい and こおひい all become こうひい.
+    """
+    out = []
+    for ch in text:
+        if out and (ch == _LONG_MARK or ch == "お"):
+            vowel = _VOWEL_OF.get(out[-1])
+            if vowel == "お":
+                ch = "う"
+            elif vowel is not None and ch == _LONG_MARK:
+                ch = vowel
+        out.append(ch)
+    return "".join(out)
+
+
+# utf8mb4_unicode_ci compares kana by their base letter: size is ignored like voicing.
+_SMALL_KANA = str.maketrans("ぁぃぅぇぉっゃゅょゎゕゖ", "あいうえおつやゆよわかけ")
+
+
+def fold_collation(text: str) -> str:
+    """Key under which utf8mb4_unicode_ci sees strings as equal, for the in-process engines.
+
+    Width, case and accents fold (ＷＡＴＥＲ -> water, Café -> cafe), and kana lose
+    voicing marks, size and script (ば, パ, ハ, ﾊﾟ -> は; ゃ -> や), as MySQL compares
+    the entry columns with = and LIKE. Kanji are unchanged.
+    """
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return katakana_to_hiragana(stripped.lower()).translate(_SMALL_KANA)
+
+
+def normalize_reading(text: str) -> str:
+    """Key stored in entry_reading.reading_norm and compared at search time."""
+    return _fold_long_vowels(katakana_to_hiragana(fold_width(str(text)).lower())).translate(_KEY_FOLD)
+
+
+def _resolve_hyphens(text: str) -> str:
+    """Keep a "-" as the long mark, or drop it as a word separator.
+
+    Loanwords hyphenate single syllables (ko-hi-, ta-kushi-, konpyu-ta-), so a
+    hyphen after a vowel next to a one-vowel (or empty) segment is a long mark;
+    between two longer segments (sewa-suru, koshō-suru) it only joins words.
+    """
+    if "-" not in text:
+        return text
+    segments = text.split("-")
+    vowels = [sum(ch in _VOWELS for ch in segment) for segment in segments]
+    out = [segments[0]]
+    for k in range(1, len(segments)):
+        before = segments[k - 1]
+        long_mark = bool(before) and before[-1] in _VOWELS and min(vowels[k - 1], vowels[k]) <= 1
+        out.append("-" if long_mark else "")
+        out.append(segments[k])
+    return "".join(out)
+
+
+def romaji_to_hiragana(text: str) -> Optional[str]:
+    """Hepburn / Kunrei / IME-style romaji -> hiragana, or None if text is not romaji.
+
+    Handles doubled consonants (kitte -> きって, matcha -> まっちゃ), n / nn / n'
+    for ん, macron long vowels (tōkyō -> とうきょう) and hyphens as long marks
+    (ko-hi- -> こうひい) or word separators (sewa-suru -> せわする).
+    """
+    text = fold_width(str(text)).lower().translate(_LONG_VOWELS)
+    if not text or not _ROMAJI_RE.match(text):
+        return None
+    text = _resolve_hyphens(text.replace(" ", ""))
+
+    out = []
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        nxt = text[i + 1] if i + 1 < n else ""
+        if ch == "n" and (not nxt or nxt not in _VOWELS + "y"):
+            out.append("ん")
+            if nxt == "'":
+                i += 2
+            elif nxt == "n" and (i + 2 >= n or text[i + 2] not in _VOWELS + "y"):
+                # "nn" typed for ん (IME style) unless it starts a な-row syllable.
+                i += 2
+            else:
+                i += 1
+            continue
+        if ch == "'":
+            i += 1
+            continue
+        if ch == "m" and nxt in ("b", "p"):
+            # Traditional Hepburn: shimbun, sempai.
+            out.append("ん")
+            i += 1
+            continue
+        # Small っ: doubled consonant, or "tch".
+        if ch not in _VOWELS and ch not in "n-" and (nxt == ch or (ch == "t" and nxt == "c")):
+            out.append("っ")
+            i += 1
+            continue
+        for length in (3, 2, 1):
+            kana = _ROMAJI.get(text[i:i + length])
+            if kana is not None:
+                out.append(kana)
+                i += length
+                break
+        else:
+            return None
+    return _fold_long_vowels("".join(out)).translate(_KEY_FOLD)
+
+
+def is_kana(text: str) -> bool:
+    return bool(_KANA_RE.match(text))
+
+
+def query_readings(keyword: str) -> Tuple[Optional[str], Optional[str]]:
+    """(kana_norm, romaji_kana) for a search keyword.
+
+    kana_norm is set when the keyword is written in kana (any width / script);
+    matching it counts as an exact / prefix reading match. romaji_kana is set
+    when the keyword reads as romaji; those matches rank after the English ones.
+    """
+    norm = normalize_reading(keyword)
+    if is_kana(norm):
+        return norm, None
+    return None, romaji_to_hiragana(keyword)
+
+
+# --- English gloss words (entry_gloss_tokens) ---
+
+GLOSS_TOKEN_RE = re.compile(r"[0-9a-z]+")
+GLOSS_TOKEN_MAX_LENGTH = 84
+
+
+def fold_gloss(text: str) -> str:
+    """Lower-case and strip accents (café -> cafe), like utf8mb4_unicode_ci compares."""
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def gloss_token(keyword: str) -> Optional[str]:
+    """The keyword as a single gloss token, or None if it is not exactly one word."""
+    folded = fold_gloss(keyword)
+    if len(folded) <= GLOSS_TOKEN_MAX_LENGTH and GLOSS_TOKEN_RE.fullmatch(folded):
+        return folded
+    return None
+
+
+def gloss_anchor(keyword: str) -> Optional[str]:
+    """Last word of a multi-word keyword: any gloss containing the keyword has a
+    word starting with it (something precedes it in the keyword, so it starts a word)."""
+    last = None
+    for last in GLOSS_TOKEN_RE.finditer(fold_gloss(keyword)):
+        pass
+    if last is None or last.start() == 0:
+        return None
+    return last.group()
+
+
+# --- Kanji characters (entry_chars) ---
+
+# CJK unified ideographs (incl. extensions A-F) and compatibility ideographs.
+_KANJI_RE = re.compile(r"[㐀-䶿一-鿿豈-﫿\U00020000-\U0003134f]")
+
+
+def kanji_chars(text: str) -> List[str]:
+    """Distinct kanji of text, in order of first appearance (食べ物 -> ['食', '物'])."""
+    return list(dict.fromkeys(_KANJI_RE.findall(fold_width(str(text)))))
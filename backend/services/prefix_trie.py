@@ -0,0 +1,183 @@
+# backend/services/prefix_trie.py
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from db_config import get_connection
+from services.normalize import fold_collation
+
+logger = logging.getLogger("gakuroku")
+
+
+class PrefixTrie:
+    """Compact, read-only trie over strings with integer payloads.
+
+    Nodes are numbered breadth-first, so the children of a node are a contiguous
+    run of node numbers with their labels (code points) sorted:
+
+    - children of node i: nodes child_start[i] .. child_start[i + 1] - 1
+    - labels[j]: code point on the edge into node j (labels[0] is unused)
+    - payloads of node i: values[value_start[i]:value_start[i + 1]]
+
+    Walking a key costs one bisect over a node's children per character, so
+    common_prefix_search(text) is O(len(text)) regardless of dictionary size.
+    """
+
+    def __init__(self, child_start: Sequence[int], labels: Sequence[int],
+                 value_start: Sequence[int], values: Sequence[int]):
+        self.child_start = child_start
+        self.labels = labels
+        self.value_start = value_start
+        self.values = values
+
+    @classmethod
+    def build(cls, items: Iterable[Tuple[str, int]]) -> "PrefixTrie":
+        # Sorting the keys makes every node's children appear in label order.
+        keyed = sorted((key, value) for key, value in items if key)
+
+        # Temporary pointer trie: per node, [children dict, payload list].
+        nodes: List[Tuple[dict, list]] = [({}, [])]
+        for key, value in keyed:
+            node = 0
+            for ch in key:
+                children = nodes[node][0]
+                nxt = children.get(ch)
+                if nxt is None:
+                    nxt = len(nodes)
+                    nodes.append(({}, []))
+                    children[ch] = nxt
+                node = nxt
+            nodes[node][1].append(value)
+
+        # Renumber breadth-first into flat arrays.
+        child_start = array("I")
+        labels = array("I", [0])
+        value_start = array("I")
+        values = array("I")
+        order = [0]
+        head = 0
+        while head < len(order):
+            old = order[head]
+            head += 1
+            child_start.append(len(order))
+            value_start.append(len(values))
+            values.extend(nodes[old][1])
+            for ch, child in sorted(nodes[old][0].items()):
+                labels.append(ord(ch))
+                order.append(child)
+        child_start.append(len(order))
+        value_start.append(len(values))
+
+        return cls(child_start, labels, value_start, values)
+
+    def __len__(self) -> int:
+        return len(self.value_start) - 1
+
+    def _child(self, node: int, ch: str) -> int:
+        lo, hi = self.child_start[node], self.child_start[node + 1]
+        if lo == hi:
+            return -1
+        code = ord(ch)
+        j = bisect_left(self.labels, code, lo, hi)
+        if j < hi and self.labels[j] == code:
+            return j
+        return -1
+
+    def _values_at(self, node: int) -> Sequence[int]:
+        return self.values[self.value_start[node]:self.value_start[node + 1]]
+
+    def lookup(self, key: str) -> Sequence[int]:
+        """Payloads stored under exactly key."""
+        node = 0
+        for ch in key:
+            node = self._child(node, ch)
+            if node < 0:
+                return ()
+        return self._values_at(node)
+
+    def common_prefix_search(self, text: str) -> List[Tuple[int, Sequence[int]]]:
+        """Return (length, payloads) for every stored key that is a prefix of text,
+        shortest first."""
+        found: List[Tuple[int, Sequence[int]]] = []
+        node = 0
+        for length, ch in enumerate(text, start=1):
+            node = self._child(node, ch)
+            if node < 0:
+                break
+            vals = self._values_at(node)
+            if vals:
+                found.append((length, vals))
+        return found
+
+
+class HeadwordTrie:
+    """PrefixTrie over every entry_kanji / entry_reading form, mapping to entry ids."""
+
+    def __init__(self, trie: PrefixTrie, entry_ids: Sequence[str]):
+        self.trie = trie
+        self.entry_ids = entry_ids
+
+    @classmethod
+    def from_mysql(cls) -> "HeadwordTrie":
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                SELECT entry_id, kanji_text FROM entry_kanji
+                UNION ALL
+                SELECT entry_id, reading_text FROM entry_reading
+                """
+            )
+            rows = cursor.fetchall() or []
+        finally:
+            cursor.close()
+            conn.close()
+
+        number: dict = {}
+        entry_ids: List[str] = []
+        items: List[Tuple[str, int]] = []
+        for entry_id, form in rows:
+            entry_id = str(entry_id)
+            n = number.get(entry_id)
+            if n is None:
+                n = number[entry_id] = len(entry_ids)
+                entry_ids.append(entry_id)
+            items.append((fold_collation(form), n))
+        return cls(PrefixTrie.build(items), entry_ids)
+
+    def prefix_entries(self, text: str) -> List[Tuple[int, str]]:
+        """(matched length, entry id) for entries having a form that prefixes text,
+        longest match first, each entry reported once."""
+        seen: set = set()
+        out: List[Tuple[int, str]] = []
+        for length, values in reversed(self.trie.common_prefix_search(fold_collation(text))):
+            for n in values:
+                if n not in seen:
+                    seen.add(n)
+                    out.append((length, self.entry_ids[n]))
+        return out
+
+
+_headword_trie: Optional[HeadwordTrie] = None
+_headword_trie_lock = threading.Lock()
+
+
+def get_headword_trie() -> HeadwordTrie:
+    """Return the process-wide HeadwordTrie, building it from MySQL on first use."""
+    global _headword_trie
+    if _headword_trie is None:
+        with _headword_trie_lock:
+            if _headword_trie is None:
+                started = time.perf_counter()
+                _headword_trie = HeadwordTrie.from_mysql()
+                logger.info(
+                    "Headword trie loaded: %d nodes in %.2fs",
+                    len(_headword_trie.trie), time.perf_counter() - started,
+                )
+    return _headword_trie
@@ -1,11 +1,39 @@
 # backend/services/search.py
 from __future__ import annotations
 
+import asyncio
+import base64
 import json
+import logging
+import os
 import re
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from db_config import get_connection
+from db_async import async_connection
+from db_config import connection, get_connection
+from services.bm25 import get_bm25_index
+from services.dictionary_index import DictionaryIndex, get_dictionary_index
+from services.normalize import gloss_anchor, gloss_token, kanji_chars, query_readings
+from services.prefix_trie import get_headword_trie
+from services.sqlite_dictionary import get_sqlite_dictionary
+from services.search_cache import get_ranking_cache, get_search_cache, normalize_keyword
+
+logger = logging.getLogger("gakuroku")
+
+# "mysql" runs the ranking query below; "memory" serves search from the in-process
+# DictionaryIndex built at startup, falling back to MySQL until it is loaded;
+# "sqlite" reads the DICTIONARY_SQLITE file (services.sqlite_dictionary) and needs
+# no MySQL at all for search.
+SEARCH_ENGINE = os.getenv("SEARCH_ENGINE", "mysql").strip().lower()
+# "bm25" ranks English keywords with the in-process BM25Index (services.bm25)
+# instead of the ranking query; anything else keeps them on SEARCH_ENGINE.
+SEARCH_ENGLISH = os.getenv("SEARCH_ENGLISH", "mysql").strip().lower()
+
+# Engines that search in this process: index scans (memory) and SQLite queries
+# (sqlite) block, so the async variants run them with asyncio.to_thread so one
+# search does not stall every other request.
+_THREADED_ENGINES = ("memory", "sqlite")
 
 
 def _parse_word_json(raw_json: Any) -> Optional[dict]:
@@ -81,8 +109,390 @@ def _extract_word_schema_dict(word_obj: dict, entry_id: str) -> Dict[str, Any]:
     }
 
 
-def search_entries(keyword: str) -> List[dict]:
-    """Search entries and return a list of WordSchema-shaped dicts."""
+def _word_data_json(word_obj: dict, entry_id: str) -> str:
+    """Serialize the WordSchema projection stored in entries.word_data."""
+    return json.dumps(_extract_word_schema_dict(word_obj, entry_id=entry_id), ensure_ascii=False, separators=(",", ":"))
+
+
+def _word_from_columns(entry_id: Any, word_data: Any, raw_json: Any) -> Optional[Dict[str, Any]]:
+    """WordSchema dict from entries.word_data, falling back to parsing raw_json
+    for rows imported before word_data existed."""
+    word = _parse_word_json(word_data)
+    if word:
+        word["id"] = str(entry_id)
+        return word
+    word_obj = _parse_word_json(raw_json)
+    if not word_obj:
+        return None
+    return _extract_word_schema_dict(word_obj, entry_id=entry_id)
+
+
+# Search priority:
+# 1) Exact Kanji (any spelling)
+# 2) Exact Reading (any reading; kana keywords also match reading_norm, so
+#    タベル / ﾀﾍﾞﾙ count as exact for たべる)
+# 2.5) Entry is prefix of keyword (e.g. 反抗 matches 反抗的)
+#      Matched as `form IN (all prefixes of keyword)` so idx_kanji / idx_reading
+#      are used instead of a reverse LIKE over every form.
+# 3) Prefix Kanji / Reading
+# 4) Common flag (from any Kanji form)
+# 5) Exact English word in gloss_text (word boundary)
+# 6) Prefix gloss
+#    Both are entry_gloss_tokens lookups for a one-word keyword (see _gloss_terms).
+# 6.5) Romaji keyword read as kana, exact then prefix (entry_reading.reading_norm)
+# 7) Full-text score (English gloss_text)
+# 8) LIKE fallback
+_SEARCH_SQL_TEMPLATE = """
+    SELECT
+        e.id,
+        {word_columns},
+        e.primary_headword,
+
+        EXISTS(
+            SELECT 1 FROM entry_kanji k
+            WHERE k.entry_id = e.id AND k.kanji_text = %s
+        ) AS exact_kj,
+        EXISTS(
+            SELECT 1 FROM entry_reading r
+            WHERE r.entry_id = e.id AND (r.reading_text = %s OR r.reading_norm = %s)
+        ) AS exact_rd,
+        EXISTS(
+            SELECT 1 FROM entry_kanji k
+            WHERE k.entry_id = e.id AND k.kanji_text IN ({kw_prefixes})
+        ) AS entry_prefix_of_keyword_kj,
+        EXISTS(
+            SELECT 1 FROM entry_reading r
+            WHERE r.entry_id = e.id AND r.reading_text IN ({kw_prefixes})
+        ) AS entry_prefix_of_keyword_rd,
+        EXISTS(
+            SELECT 1 FROM entry_kanji k
+            WHERE k.entry_id = e.id AND k.kanji_text LIKE %s
+        ) AS prefix_kj,
+        EXISTS(
+            SELECT 1 FROM entry_reading r
+            WHERE r.entry_id = e.id AND (r.reading_text LIKE %s OR r.reading_norm LIKE %s)
+        ) AS prefix_rd,
+
+        COALESCE((SELECT MAX(k.is_common) FROM entry_kanji k WHERE k.entry_id = e.id), 0) AS is_common,
+
+        {exact_gloss_word} AS exact_gloss_word,
+        {prefix_gloss} AS prefix_gloss,
+        EXISTS(
+            SELECT 1 FROM entry_reading r
+            WHERE r.entry_id = e.id AND r.reading_norm = %s
+        ) AS romaji_rd,
+        EXISTS(
+            SELECT 1 FROM entry_reading r
+            WHERE r.entry_id = e.id AND r.reading_norm LIKE %s
+        ) AS romaji_prefix_rd,
+        {like_gloss} AS like_gloss,
+        MATCH(d.gloss_text) AGAINST (%s IN NATURAL LANGUAGE MODE) AS ft_score,
+
+        CHAR_LENGTH(e.primary_headword) AS hw_len
+
+    FROM entries e
+    LEFT JOIN entry_definitions d ON d.entry_id = e.id
+    JOIN (
+        SELECT entry_id FROM entry_kanji
+          WHERE kanji_text = %s OR kanji_text LIKE %s OR kanji_text IN ({kw_prefixes})
+        UNION
+        SELECT entry_id FROM entry_reading
+          WHERE reading_text = %s OR reading_text LIKE %s OR reading_text IN ({kw_prefixes})
+        UNION
+        SELECT entry_id FROM entry_reading
+          WHERE reading_norm IN (%s, %s) OR reading_norm LIKE %s OR reading_norm LIKE %s
+        UNION
+        {gloss_candidates}
+        UNION
+        SELECT entry_id FROM entry_definitions
+         WHERE MATCH(gloss_text) AGAINST (%s IN NATURAL LANGUAGE MODE)
+    ) m ON m.entry_id = e.id
+
+    ORDER BY {order_by}
+
+    LIMIT %s;
+"""
+
+_WORD_COLUMNS = "e.word_data, IF(e.word_data IS NULL, e.raw_json, NULL) AS raw_json"
+# Same row shape without the JSON payload, for ranking ids only (pagination).
+_NO_WORD_COLUMNS = "NULL AS word_data, NULL AS raw_json"
+
+# Only selected columns, so a batch query can re-apply it to the UNION of several searches.
+_SEARCH_ORDER_BY = """
+        exact_kj DESC,
+        exact_rd DESC,
+        entry_prefix_of_keyword_kj DESC,
+        entry_prefix_of_keyword_rd DESC,
+        prefix_kj DESC,
+        prefix_rd DESC,
+        is_common DESC,
+        exact_gloss_word DESC,
+        prefix_gloss DESC,
+        romaji_rd DESC,
+        romaji_prefix_rd DESC,
+        ft_score DESC,
+        like_gloss DESC,
+        hw_len ASC,
+        primary_headword ASC,
+        id ASC"""
+
+
+# Forms are VARCHAR(100), so longer prefixes can never match.
+_MAX_FORM_LENGTH = 100
+
+
+def _keyword_prefixes(keyword: str) -> List[str]:
+    return [keyword[:end] for end in range(1, min(len(keyword), _MAX_FORM_LENGTH) + 1)]
+
+
+# --- English gloss matching ---
+#
+# entry_gloss_tokens holds every word of every gloss_text (accent-folded, lower
+# case) with the offset of its first occurrence. For a one-word keyword the three
+# gloss flags and the LIKE '%kw%' candidate set become index lookups with the same
+# meaning as the gloss_text expressions they replace:
+#   exact_gloss_word  word == kw                  (REGEXP word boundary)
+#   prefix_gloss      word LIKE 'kw%' at offset 0  (gloss_text LIKE 'kw%')
+#   like_gloss        word LIKE '%kw%'            (gloss_text LIKE '%kw%': kw has no separator)
+# The infix candidate set scans the distinct words (a loose index scan of the
+# primary key), not every gloss_text. Databases imported before the table existed
+# keep the gloss_text expressions until `import_task.py --backfill-gloss-tokens`.
+
+_GLOSS_REGEXP_SQL = "(LOWER(d.gloss_text) REGEXP CONCAT('(^|[^0-9a-z])', %s, '([^0-9a-z]|$)'))"
+_GLOSS_PREFIX_SQL = "(LOWER(d.gloss_text) LIKE CONCAT(%s, '%'))"
+_GLOSS_LIKE_SQL = "(d.gloss_text LIKE %s)"
+_GLOSS_LIKE_CANDIDATES_SQL = "SELECT entry_id FROM entry_definitions WHERE gloss_text LIKE %s"
+
+_TOKEN_EXACT_SQL = "EXISTS(SELECT 1 FROM entry_gloss_tokens t WHERE t.token = %s AND t.entry_id = e.id)"
+_TOKEN_PREFIX_SQL = (
+    "EXISTS(SELECT 1 FROM entry_gloss_tokens t"
+    " WHERE t.entry_id = e.id AND t.position = 0 AND t.token LIKE %s)"
+)
+_TOKEN_LIKE_SQL = "EXISTS(SELECT 1 FROM entry_gloss_tokens t WHERE t.entry_id = e.id AND t.token LIKE %s)"
+_TOKEN_LIKE_CANDIDATES_SQL = """SELECT t.entry_id FROM entry_gloss_tokens t
+          JOIN (SELECT DISTINCT token FROM entry_gloss_tokens WHERE token LIKE %s) v ON v.token = t.token"""
+# Multi-word keyword: gloss_text LIKE '%kw%' only among entries having a word that
+# starts with the keyword's last word.
+_TOKEN_ANCHORED_CANDIDATES_SQL = """SELECT t.entry_id FROM entry_gloss_tokens t
+          JOIN entry_definitions dd ON dd.entry_id = t.entry_id
+         WHERE t.token LIKE %s AND dd.gloss_text LIKE %s"""
+
+# Seconds between re-checks while entry_gloss_tokens is empty; once filled it stays in use.
+_GLOSS_INDEX_RECHECK_S = 60.0
+_GLOSS_INDEX_SQL = "SELECT EXISTS(SELECT 1 FROM entry_gloss_tokens)"
+_gloss_index = False
+_gloss_index_checked_at: Optional[float] = None
+
+
+def _gloss_index_stale() -> bool:
+    return not _gloss_index and (
+        _gloss_index_checked_at is None
+        or time.monotonic() - _gloss_index_checked_at >= _GLOSS_INDEX_RECHECK_S
+    )
+
+
+def _set_gloss_index(row) -> bool:
+    global _gloss_index, _gloss_index_checked_at
+    _gloss_index = bool(row and row[0])
+    _gloss_index_checked_at = time.monotonic()
+    if _gloss_index:
+        logger.info("Gloss word index (entry_gloss_tokens) in use for English search")
+    return _gloss_index
+
+
+def _gloss_index_ready(cursor) -> bool:
+    """Whether entry_gloss_tokens is populated, re-checked on `cursor` while it is not."""
+    if not _gloss_index_stale():
+        return _gloss_index
+    cursor.execute(_GLOSS_INDEX_SQL)
+    return _set_gloss_index(cursor.fetchone())
+
+
+async def _gloss_index_ready_async(cursor) -> bool:
+    if not _gloss_index_stale():
+        return _gloss_index
+    await cursor.execute(_GLOSS_INDEX_SQL)
+    return _set_gloss_index(await cursor.fetchone())
+
+
+def detect_gloss_index() -> bool:
+    """Check entry_gloss_tokens once at startup (main.lifespan)."""
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            return _gloss_index_ready(cursor)
+        finally:
+            cursor.close()
+
+
+def _gloss_terms(keyword: str, gloss_index: bool) -> tuple:
+    """(template fields, exact params, prefix params, like params, candidate params)."""
+    keyword_lower = str(keyword).lower()
+    like = f"%{keyword}%"
+    token = gloss_token(keyword) if gloss_index else None
+    if token is not None:
+        fields = {
+            "exact_gloss_word": _TOKEN_EXACT_SQL,
+            "prefix_gloss": _TOKEN_PREFIX_SQL,
+            "like_gloss": _TOKEN_LIKE_SQL,
+            "gloss_candidates": _TOKEN_LIKE_CANDIDATES_SQL,
+        }
+        return fields, (token,), (f"{token}%",), (f"%{token}%",), (f"%{token}%",)
+
+    fields = {
+        "exact_gloss_word": _GLOSS_REGEXP_SQL,
+        "prefix_gloss": _GLOSS_PREFIX_SQL,
+        "like_gloss": _GLOSS_LIKE_SQL,
+        "gloss_candidates": _GLOSS_LIKE_CANDIDATES_SQL,
+    }
+    # For regex ranking in English gloss: treat keyword as a literal string.
+    terms = (re.escape(keyword_lower),), (keyword_lower,), (like,)
+    anchor = gloss_anchor(keyword) if gloss_index else None
+    if anchor is not None:
+        fields["gloss_candidates"] = _TOKEN_ANCHORED_CANDIDATES_SQL
+        return (fields, *terms, (f"{anchor}%", like))
+    return (fields, *terms, (like,))
+
+
+def _search_query(keyword: str, limit: int = 10, word_columns: str = _WORD_COLUMNS,
+                  gloss_index: bool = False) -> tuple:
+    """Return (sql, params) for the ranking query.
+
+    gloss_index: match English gloss words through entry_gloss_tokens.
+    """
+    kw_prefixes = _keyword_prefixes(str(keyword))
+    placeholders = ", ".join(["%s"] * len(kw_prefixes)) or "NULL"
+    gloss_fields, exact_gloss, prefix_gloss, like_gloss, gloss_candidates = _gloss_terms(keyword, gloss_index)
+    sql = _SEARCH_SQL_TEMPLATE.format(
+        kw_prefixes=placeholders, order_by=_SEARCH_ORDER_BY, word_columns=word_columns, **gloss_fields,
+    )
+
+    prefix = f"{keyword}%"
+
+    # Matched against entry_reading.reading_norm; NULL (never matches) when the
+    # keyword is not kana / not romaji.
+    kana_norm, romaji_kana = query_readings(keyword)
+    kana_norm_prefix = f"{kana_norm}%" if kana_norm else None
+    romaji_prefix = f"{romaji_kana}%" if romaji_kana else None
+
+    params = (
+        # ranking flags
+        keyword,
+        keyword,
+        kana_norm,
+        *kw_prefixes,
+        *kw_prefixes,
+        prefix,
+        prefix,
+        kana_norm_prefix,
+        *exact_gloss,
+        *prefix_gloss,
+        romaji_kana,
+        romaji_prefix,
+        *like_gloss,
+        keyword,
+        # candidate set
+        keyword,
+        prefix,
+        *kw_prefixes,
+        keyword,
+        prefix,
+        *kw_prefixes,
+        kana_norm,
+        romaji_kana,
+        kana_norm_prefix,
+        romaji_prefix,
+        *gloss_candidates,
+        keyword,
+        int(limit),
+    )
+    return sql, params
+
+
+def _rows_to_words(rows) -> List[dict]:
+    """Map (id, word_data, raw_json, ...) rows to WordSchema dicts."""
+    output: List[dict] = []
+    for row in rows or []:
+        word = _word_from_columns(row[0], row[1], row[2])
+        if word is not None:
+            output.append(word)
+    return output
+
+
+async def _in_process(func, *args):
+    """func(*args) of the in-process engine, in a thread for _THREADED_ENGINES."""
+    if SEARCH_ENGINE in _THREADED_ENGINES:
+        return await asyncio.to_thread(func, *args)
+    return func(*args)
+
+
+def _search_in_memory(keyword: str, limit: int) -> Optional[List[dict]]:
+    if SEARCH_ENGINE == "sqlite":
+        return get_sqlite_dictionary().search(keyword, limit)
+    if SEARCH_ENGINE != "memory":
+        return None
+    index = get_dictionary_index()
+    if index is None:
+        return None
+    return index.search(keyword, limit=limit)
+
+
+# --- English path ---
+#
+# ASCII keywords can be ranked by BM25 over the per-sense glosses when
+# SEARCH_ENGLISH=bm25. Many English words also read as romaji (tea -> てあ,
+# age -> あげ); for those the BM25 ranking comes first and the regular ranking
+# (which includes the romaji reading matches) fills the rest, so neither
+# interpretation hides the other.
+
+def _is_english(keyword: str) -> bool:
+    return str(keyword).isascii() and any(ch.isalpha() for ch in keyword)
+
+
+def _reads_as_romaji(keyword: str) -> bool:
+    return query_readings(keyword)[1] is not None
+
+
+def _english_ranked_ids(keyword: str, limit: int) -> Optional[List[str]]:
+    """BM25 ranking of an English keyword, or None to use the regular search."""
+    if SEARCH_ENGLISH != "bm25" or not _is_english(keyword):
+        return None
+    index = get_bm25_index()
+    if index is None:
+        return None
+    # No indexed word at all (typo, partial word): the LIKE matching may still find some.
+    return index.rank(keyword, limit) or None
+
+
+async def _english_ranked_ids_async(keyword: str, limit: int) -> Optional[List[str]]:
+    if SEARCH_ENGLISH != "bm25" or not _is_english(keyword):
+        return None
+    return await asyncio.to_thread(_english_ranked_ids, keyword, limit)
+
+
+def _union_ranked(first: Sequence[Any], second: Sequence[Any], limit: int, key=lambda item: item) -> List[Any]:
+    """first, then the items of second not already in it, up to limit."""
+    seen = set()
+    merged: List[Any] = []
+    for item in list(first) + list(second):
+        if key(item) in seen:
+            continue
+        seen.add(key(item))
+        merged.append(item)
+        if len(merged) >= limit:
+            break
+    return merged
+
+
+def _union_words(english: List[dict], regular: List[dict], limit: int) -> List[dict]:
+    return _union_ranked(english, regular, limit, key=lambda word: word["id"])
+
+
+def _search_regular(keyword: str, limit: int) -> List[dict]:
+    in_memory = _search_in_memory(keyword, limit)
+    if in_memory is not None:
+        return in_memory
+
     conn = None
     cursor = None
     output: List[dict] = []
@@ -90,133 +500,578 @@ def search_entries(keyword: str) -> List[dict]:
     try:
         conn = get_connection()
         cursor = conn.cursor()
-
-        # Search priority:
-        # 1) Exact Kanji (any spelling)
-        # 2) Exact Reading (any reading)
-        # 2.5) Entry is prefix of keyword (e.g. 反抗 matches 反抗的)
-        # 3) Prefix Kanji / Reading
-        # 4) Common flag (from any Kanji form)
-        # 5) Exact English word in gloss_text (word boundary)
-        # 6) Prefix gloss
-        # 7) Full-text score (English gloss_text)
-        # 8) LIKE fallback
-        
-        sql_search = """
-            SELECT
-                e.id,
-                e.raw_json,
-                e.primary_headword,
-
-                EXISTS(
-                    SELECT 1 FROM entry_kanji k
-                    WHERE k.entry_id = e.id AND k.kanji_text = %s
-                ) AS exact_kj,
-                EXISTS(
-                    SELECT 1 FROM entry_reading r
-                    WHERE r.entry_id = e.id AND r.reading_text = %s
-                ) AS exact_rd,
-                EXISTS(
-                    SELECT 1 FROM entry_kanji k
-                    WHERE k.entry_id = e.id AND %s LIKE CONCAT(k.kanji_text, '%')
-                ) AS entry_prefix_of_keyword_kj,
-                EXISTS(
-                    SELECT 1 FROM entry_reading r
-                    WHERE r.entry_id = e.id AND %s LIKE CONCAT(r.reading_text, '%')
-                ) AS entry_prefix_of_keyword_rd,
-                EXISTS(
-                    SELECT 1 FROM entry_kanji k
-                    WHERE k.entry_id = e.id AND k.kanji_text LIKE %s
-                ) AS prefix_kj,
-                EXISTS(
-                    SELECT 1 FROM entry_reading r
-                    WHERE r.entry_id = e.id AND r.reading_text LIKE %s
-                ) AS prefix_rd,
-
-                COALESCE((SELECT MAX(k.is_common) FROM entry_kanji k WHERE k.entry_id = e.id), 0) AS is_common,
-
-                (LOWER(d.gloss_text) REGEXP CONCAT('(^|[^0-9a-z])', %s, '([^0-9a-z]|$)')) AS exact_gloss_word,
-                (LOWER(d.gloss_text) LIKE CONCAT(%s, '%')) AS prefix_gloss,
-                (d.gloss_text LIKE %s) AS like_gloss,
-                MATCH(d.gloss_text) AGAINST (%s IN NATURAL LANGUAGE MODE) AS ft_score,
-
-                CHAR_LENGTH(e.primary_headword) AS hw_len
-
-            FROM entries e
-            LEFT JOIN entry_definitions d ON d.entry_id = e.id
-            JOIN (
-                SELECT entry_id FROM entry_kanji
-                  WHERE kanji_text = %s OR kanji_text LIKE %s OR %s LIKE CONCAT(kanji_text, '%')
-                UNION
-                SELECT entry_id FROM entry_reading
-                  WHERE reading_text = %s OR reading_text LIKE %s OR %s LIKE CONCAT(reading_text, '%')
-                UNION
-                SELECT entry_id FROM entry_definitions
-                 WHERE gloss_text LIKE %s OR MATCH(gloss_text) AGAINST (%s IN NATURAL LANGUAGE MODE)
-            ) m ON m.entry_id = e.id
-
-            ORDER BY
-                exact_kj DESC,
-                exact_rd DESC,
-                entry_prefix_of_keyword_kj DESC,
-                entry_prefix_of_keyword_rd DESC,
-                prefix_kj DESC,
-                prefix_rd DESC,
-                is_common DESC,
-                exact_gloss_word DESC,
-                prefix_gloss DESC,
-                ft_score DESC,
-                like_gloss DESC,
-                hw_len ASC,
-                e.primary_headword ASC
-
-            LIMIT 10;
-        """
-
-        prefix = f"{keyword}%"
-        like = f"%{keyword}%"
-
-        # For regex ranking in English gloss: treat keyword as a literal string.
-        keyword_lower = str(keyword).lower()
-        regex_literal = re.escape(keyword_lower)
-        
-        params = (
-            # ranking flags
-            keyword,
-            keyword,
-            keyword,
-            keyword,
-            prefix,
-            prefix,
-            regex_literal,
-            keyword_lower,
-            like,
-            keyword,
-            # candidate set
-            keyword,
-            prefix,
-            keyword,
-            keyword,
-            prefix,
-            keyword,
-            like,
-            keyword,
-        )
-
-        cursor.execute(sql_search, params)
-        results = cursor.fetchall()
-        
-        for row in results or []:
-            db_id = row[0]
-            raw_json = row[1]
-            word_obj = _parse_word_json(raw_json)
-            if not word_obj:
-                continue
-            output.append(_extract_word_schema_dict(word_obj, entry_id=db_id))
+        cursor.execute(*_search_query(keyword, limit, gloss_index=_gloss_index_ready(cursor)))
+        output = _rows_to_words(cursor.fetchall())
     finally:
         if cursor is not None:
             cursor.close()
         if conn is not None:
             conn.close()
 
-    return output 
\ No newline at end of file
+    return output
+
+
+async def _search_regular_async(keyword: str, limit: int) -> List[dict]:
+    in_memory = await _in_process(_search_in_memory, keyword, limit)
+    if in_memory is not None:
+        return in_memory
+
+    async with async_connection() as conn:
+        cursor = await conn.cursor()
+        try:
+            gloss_index = await _gloss_index_ready_async(cursor)
+            await cursor.execute(*_search_query(keyword, limit, gloss_index=gloss_index))
+            return _rows_to_words(await cursor.fetchall())
+        finally:
+            await cursor.close()
+
+
+def _search_uncached(keyword: str, limit: int) -> List[dict]:
+    english = _english_ranked_ids(keyword, limit)
+    if english is None:
+        return _search_regular(keyword, limit)
+    words = _words_for_ids(english)
+    if not _reads_as_romaji(keyword):
+        return words
+    return _union_words(words, _search_regular(keyword, limit), limit)
+
+
+async def _search_uncached_async(keyword: str, limit: int) -> List[dict]:
+    english = await _english_ranked_ids_async(keyword, limit)
+    if english is None:
+        return await _search_regular_async(keyword, limit)
+    words = await _words_for_ids_async(english)
+    if not _reads_as_romaji(keyword):
+        return words
+    return _union_words(words, await _search_regular_async(keyword, limit), limit)
+
+
+def search_entries(keyword: str, limit: int = 10) -> List[dict]:
+    """Search entries and return a list of WordSchema-shaped dicts.
+
+    Results go through the search cache; the returned list is shared with it
+    and must not be modified.
+    """
+    keyword = normalize_keyword(keyword)
+    cache = get_search_cache()
+    if not cache.enabled:
+        return _search_uncached(keyword, limit)
+
+    key = cache.key(cache.current_version(), keyword, limit)
+    output = cache.get(key)
+    if output is None:
+        output = _search_uncached(keyword, limit)
+        cache.set(key, output)
+    return output
+
+
+async def search_entries_async(keyword: str, limit: int = 10) -> List[dict]:
+    """Async variant of search_entries for the API routes."""
+    keyword = normalize_keyword(keyword)
+    cache = get_search_cache()
+    if not cache.enabled:
+        return await _search_uncached_async(keyword, limit)
+
+    key = cache.key(await cache.current_version_async(), keyword, limit)
+    output = await cache.get_async(key)
+    if output is None:
+        output = await _search_uncached_async(keyword, limit)
+        await cache.set_async(key, output)
+    return output
+
+
+# --- Batch search ---
+#
+# One request for many keywords (e.g. every token of a sentence). Keywords that
+# only differ in case or surrounding whitespace are searched once, at the largest
+# limit asked for, and cache misses are resolved in a single round trip.
+
+def _batch_search_query(searches: List[Tuple[str, int]], gloss_index: bool = False) -> tuple:
+    """(sql, params) running every (keyword, limit) ranking query in one statement.
+
+    Each search stays a derived table with its own ORDER BY ... LIMIT; the UNION
+    is then ordered by slot and the same ranking columns.
+    """
+    parts: List[str] = []
+    params: List[Any] = []
+    for slot, (keyword, limit) in enumerate(searches):
+        sql, search_params = _search_query(keyword, limit, gloss_index=gloss_index)
+        parts.append(f"(SELECT %s AS batch_slot, ranked.* FROM ({sql.strip().rstrip(';')}) AS ranked)")
+        params.append(slot)
+        params.extend(search_params)
+    sql = "\nUNION ALL\n".join(parts) + f"\nORDER BY batch_slot, {_SEARCH_ORDER_BY}"
+    return sql, tuple(params)
+
+
+def _split_batch_rows(rows, count: int) -> List[List[dict]]:
+    grouped: List[list] = [[] for _ in range(count)]
+    for row in rows or []:
+        grouped[int(row[0])].append(row[1:])
+    return [_rows_to_words(group) for group in grouped]
+
+
+class _BatchPlan:
+    """Maps the requested (keyword, limit) pairs to the distinct searches to run."""
+
+    def __init__(self, queries: Sequence[Tuple[str, int]]):
+        self.items = [(normalize_keyword(keyword), int(limit)) for keyword, limit in queries]
+        self.results: List[Optional[List[dict]]] = [None] * len(self.items)
+        self.keys: List[Optional[str]] = [None] * len(self.items)
+        self._searched: Dict[str, int] = {}
+
+    def misses(self) -> List[Tuple[str, int]]:
+        """Distinct (keyword, max limit) searches for the items still missing."""
+        wanted: Dict[str, list] = {}
+        for i, (keyword, limit) in enumerate(self.items):
+            if self.results[i] is None:
+                entry = wanted.setdefault(keyword.lower(), [keyword, limit])
+                entry[1] = max(entry[1], limit)
+        self._searched = {k.lower(): n for n, (k, _) in enumerate(wanted.values())}
+        return [(keyword, limit) for keyword, limit in wanted.values()]
+
+    def fill(self, searched: List[List[dict]]) -> List[int]:
+        """Slice the search results into the missing items; returns their positions."""
+        filled: List[int] = []
+        for i, (keyword, limit) in enumerate(self.items):
+            if self.results[i] is None:
+                self.results[i] = searched[self._searched[keyword.lower()]][:limit]
+                filled.append(i)
+        return filled
+
+
+def _search_batch_in_memory(searches: List[Tuple[str, int]]) -> Optional[List[List[dict]]]:
+    if SEARCH_ENGINE == "sqlite":
+        store = get_sqlite_dictionary()
+        return [store.search(keyword, limit) for keyword, limit in searches]
+    if SEARCH_ENGINE != "memory" or get_dictionary_index() is None:
+        return None
+    return [_search_in_memory(keyword, limit) or [] for keyword, limit in searches]
+
+
+def _split_english_searches(searches: List[Tuple[str, int]]) -> Tuple[Dict[int, List[str]], List[int]]:
+    """({search number: BM25 ranked ids}, numbers of the searches that also need the
+    regular query: all non-English ones and the English ones that read as romaji)."""
+    english: Dict[int, List[str]] = {}
+    rest: List[int] = []
+    for n, (keyword, limit) in enumerate(searches):
+        ranked = _english_ranked_ids(keyword, limit)
+        if ranked is not None:
+            english[n] = ranked
+        if ranked is None or _reads_as_romaji(keyword):
+            rest.append(n)
+    return english, rest
+
+
+def _merge_batch_results(searches: List[Tuple[str, int]], english: Dict[int, List[str]],
+                         english_words: List[dict], rest: List[int],
+                         queried: List[List[dict]]) -> List[List[dict]]:
+    by_id = {word["id"]: word for word in english_words}
+    merged: List[List[dict]] = [[] for _ in searches]
+    for n, words in zip(rest, queried):
+        merged[n] = words
+    for n, ranked in english.items():
+        words = [by_id[entry_id] for entry_id in ranked if entry_id in by_id]
+        merged[n] = _union_words(words, merged[n], searches[n][1])
+    return merged
+
+
+def search_entries_batch(queries: Sequence[Tuple[str, int]]) -> List[List[dict]]:
+    """Run search_entries for each (keyword, limit); results in the same order."""
+    plan = _BatchPlan(queries)
+    cache = get_search_cache()
+    if cache.enabled:
+        version = cache.current_version()
+        for i, (keyword, limit) in enumerate(plan.items):
+            plan.keys[i] = cache.key(version, keyword, limit)
+            plan.results[i] = cache.get(plan.keys[i])
+
+    searches = plan.misses()
+    if searches:
+        english, rest = _split_english_searches(searches)
+        queried = _search_batch_in_memory([searches[n] for n in rest]) if rest else []
+        if queried is None:
+            with connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(*_batch_search_query(
+                        [searches[n] for n in rest], _gloss_index_ready(cursor),
+                    ))
+                    queried = _split_batch_rows(cursor.fetchall(), len(rest))
+                finally:
+                    cursor.close()
+        english_words = _words_for_ids(sorted({i for ranked in english.values() for i in ranked}))
+        searched = _merge_batch_results(searches, english, english_words, rest, queried)
+        for i in plan.fill(searched):
+            if cache.enabled:
+                cache.set(plan.keys[i], plan.results[i])
+    return plan.results
+
+
+async def search_entries_batch_async(queries: Sequence[Tuple[str, int]]) -> List[List[dict]]:
+    """Async variant of search_entries_batch for the API routes."""
+    plan = _BatchPlan(queries)
+    cache = get_search_cache()
+    if cache.enabled:
+        version = await cache.current_version_async()
+        for i, (keyword, limit) in enumerate(plan.items):
+            plan.keys[i] = cache.key(version, keyword, limit)
+            plan.results[i] = await cache.get_async(plan.keys[i])
+
+    searches = plan.misses()
+    if searches:
+        english, rest = await asyncio.to_thread(_split_english_searches, searches)
+        queried = await _in_process(_search_batch_in_memory, [searches[n] for n in rest]) if rest else []
+        if queried is None:
+            async with async_connection() as conn:
+                cursor = await conn.cursor()
+                try:
+                    gloss_index = await _gloss_index_ready_async(cursor)
+                    await cursor.execute(*_batch_search_query([searches[n] for n in rest], gloss_index))
+                    queried = _split_batch_rows(await cursor.fetchall(), len(rest))
+                finally:
+                    await cursor.close()
+        english_words = await _words_for_ids_async(sorted({i for ranked in english.values() for i in ranked}))
+        searched = _merge_batch_results(searches, english, english_words, rest, queried)
+        for i in plan.fill(searched):
+            if cache.enabled:
+                await cache.set_async(plan.keys[i], plan.results[i])
+    return plan.results
+
+
+def _prefix_matches(text: str) -> List[tuple]:
+    """(matched length, entry id) for entries whose form is a prefix of text."""
+    if SEARCH_ENGINE == "sqlite":
+        return get_sqlite_dictionary().prefix_entries(text)
+    index = get_dictionary_index()
+    if index is not None:
+        return [(length, index.entry_ids[n]) for length, n in index.prefix_entries(text)]
+    return get_headword_trie().prefix_entries(text)
+
+
+def _words_by_id_query(entry_ids: List[str]) -> tuple:
+    placeholders = ", ".join(["%s"] * len(entry_ids))
+    return (
+        f"SELECT id, word_data, IF(word_data IS NULL, raw_json, NULL) FROM entries WHERE id IN ({placeholders})",
+        tuple(entry_ids),
+    )
+
+
+def _indexed_words(index: DictionaryIndex, entry_ids: List[str]) -> Tuple[Dict[str, dict], List[str]]:
+    """({id: word} for the ids in the index, the ids it does not know)."""
+    found: Dict[str, dict] = {}
+    missing: List[str] = []
+    for entry_id in entry_ids:
+        n = index.find_number(entry_id)
+        if n is None:
+            missing.append(entry_id)
+        else:
+            found[entry_id] = index.word(n)
+    return found, missing
+
+
+def _words_for_ids(entry_ids: List[str]) -> List[dict]:
+    """WordSchema dicts for entry_ids, in that order."""
+    if not entry_ids:
+        return []
+    if SEARCH_ENGINE == "sqlite":
+        return get_sqlite_dictionary().words_for_ids(entry_ids)
+
+    found: Dict[str, dict] = {}
+    missing = entry_ids
+    index = get_dictionary_index()
+    if index is not None:
+        found, missing = _indexed_words(index, entry_ids)
+
+    if missing:
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(*_words_by_id_query(missing))
+            found.update((word["id"], word) for word in _rows_to_words(cursor.fetchall()))
+        finally:
+            cursor.close()
+            conn.close()
+    return [found[entry_id] for entry_id in entry_ids if entry_id in found]
+
+
+async def _words_for_ids_async(entry_ids: List[str]) -> List[dict]:
+    if not entry_ids:
+        return []
+    if SEARCH_ENGINE == "sqlite":
+        return await asyncio.to_thread(get_sqlite_dictionary().words_for_ids, entry_ids)
+
+    found: Dict[str, dict] = {}
+    missing = entry_ids
+    index = get_dictionary_index()
+    if index is not None:
+        found, missing = await asyncio.to_thread(_indexed_words, index, entry_ids)
+
+    if missing:
+        async with async_connection() as conn:
+            cursor = await conn.cursor()
+            try:
+                await cursor.execute(*_words_by_id_query(missing))
+                found.update((word["id"], word) for word in _rows_to_words(await cursor.fetchall()))
+            finally:
+                await cursor.close()
+    return [found[entry_id] for entry_id in entry_ids if entry_id in found]
+
+
+def find_prefix_words(text: str, limit: int = 20) -> List[dict]:
+    """Entries having a kanji/reading form that is a prefix of text, longest first.
+
+    E.g. 反抗的な態度 -> 反抗的, 反抗, 反, ... Served from a trie, never a table scan.
+    """
+    return _words_for_ids([entry_id for _, entry_id in _prefix_matches(text)[:limit]])
+
+
+async def find_prefix_words_async(text: str, limit: int = 20) -> List[dict]:
+    """Async variant of find_prefix_words for the API routes."""
+    matches = await asyncio.to_thread(_prefix_matches, text)
+    return await _words_for_ids_async([entry_id for _, entry_id in matches[:limit]])
+
+
+# --- Contains-character search ---
+#
+# Entries whose kanji forms contain every kanji of the query anywhere (食 -> 食事,
+# 飲食, 給食), from the entry_chars character index: the postings of each kanji
+# are intersected with GROUP BY ... HAVING COUNT(*) over primary-key ranges, so
+# entry_kanji is never scanned.
+
+MAX_CONTAINS_CHARS = 10
+
+_CONTAINS_SQL_TEMPLATE = """
+    SELECT
+        e.id,
+        e.word_data,
+        IF(e.word_data IS NULL, e.raw_json, NULL) AS raw_json,
+        COALESCE((SELECT MAX(k.is_common) FROM entry_kanji k WHERE k.entry_id = e.id), 0) AS is_common,
+        CHAR_LENGTH(e.primary_headword) AS hw_len
+    FROM (
+        SELECT entry_id FROM entry_chars
+        WHERE ch IN ({chars})
+        GROUP BY entry_id
+        HAVING COUNT(*) = %s
+    ) m
+    JOIN entries e ON e.id = m.entry_id
+    ORDER BY is_common DESC, hw_len ASC, e.primary_headword ASC, e.id ASC
+    LIMIT %s;
+"""
+
+
+def _contains_query(chars: List[str], limit: int) -> tuple:
+    sql = _CONTAINS_SQL_TEMPLATE.format(chars=", ".join(["%s"] * len(chars)))
+    return sql, (*chars, len(chars), int(limit))
+
+
+def _contains_in_memory(chars: List[str], limit: int) -> Optional[List[dict]]:
+    if SEARCH_ENGINE == "sqlite":
+        return get_sqlite_dictionary().contains_chars("".join(chars), limit)
+    if SEARCH_ENGINE != "memory":
+        return None
+    index = get_dictionary_index()
+    if index is None:
+        return None
+    return [index.word(n) for n in index.contains_chars("".join(chars), limit)]
+
+
+def search_contains(text: str, limit: int = 20) -> List[dict]:
+    """Entries whose kanji spellings contain every kanji of text (other characters
+    are ignored), common and shorter words first."""
+    chars = kanji_chars(text)[:MAX_CONTAINS_CHARS]
+    if not chars:
+        return []
+    in_memory = _contains_in_memory(chars, limit)
+    if in_memory is not None:
+        return in_memory
+
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(*_contains_query(chars, limit))
+            return _rows_to_words(cursor.fetchall())
+        finally:
+            cursor.close()
+
+
+async def search_contains_async(text: str, limit: int = 20) -> List[dict]:
+    """Async variant of search_contains for the API routes."""
+    chars = kanji_chars(text)[:MAX_CONTAINS_CHARS]
+    if not chars:
+        return []
+    in_memory = await _in_process(_contains_in_memory, chars, limit)
+    if in_memory is not None:
+        return in_memory
+
+    async with async_connection() as conn:
+        cursor = await conn.cursor()
+        try:
+            await cursor.execute(*_contains_query(chars, limit))
+            return _rows_to_words(await cursor.fetchall())
+        finally:
+            await cursor.close()
+
+
+# --- Pagination ---
+#
+# The full ranking of a keyword (ids only, capped at MAX_RANKED_RESULTS) is computed
+# once and kept in the ranking cache; every page is then a slice of that list plus
+# one primary-key lookup for the page's words, so deep pages cost O(page).
+
+MAX_RANKED_RESULTS = 1000
+
+
+def _ranked_ids_in_memory(keyword: str) -> Optional[List[str]]:
+    if SEARCH_ENGINE == "sqlite":
+        return get_sqlite_dictionary().rank(keyword, MAX_RANKED_RESULTS)
+    if SEARCH_ENGINE != "memory":
+        return None
+    index = get_dictionary_index()
+    if index is None:
+        return None
+    return [index.entry_ids[n] for n in index.rank(keyword, MAX_RANKED_RESULTS)]
+
+
+def _ranked_ids(keyword: str) -> List[str]:
+    cache = get_ranking_cache()
+    key = cache.key(cache.current_version(), keyword, MAX_RANKED_RESULTS) if cache.enabled else None
+    ranked = cache.get(key) if key else None
+    if ranked is not None:
+        return ranked
+
+    english = _english_ranked_ids(keyword, MAX_RANKED_RESULTS)
+    if english is not None and not _reads_as_romaji(keyword):
+        ranked = english
+    else:
+        ranked = _ranked_ids_in_memory(keyword)
+        if ranked is None:
+            with connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(*_search_query(
+                        keyword, MAX_RANKED_RESULTS, _NO_WORD_COLUMNS, _gloss_index_ready(cursor),
+                    ))
+                    ranked = [str(row[0]) for row in cursor.fetchall()]
+                finally:
+                    cursor.close()
+        if english:
+            ranked = _union_ranked(english, ranked, MAX_RANKED_RESULTS)
+    if key:
+        cache.set(key, ranked)
+    return ranked
+
+
+async def _ranked_ids_async(keyword: str) -> List[str]:
+    cache = get_ranking_cache()
+    key = cache.key(await cache.current_version_async(), keyword, MAX_RANKED_RESULTS) if cache.enabled else None
+    ranked = await cache.get_async(key) if key else None
+    if ranked is not None:
+        return ranked
+
+    english = await _english_ranked_ids_async(keyword, MAX_RANKED_RESULTS)
+    if english is not None and not _reads_as_romaji(keyword):
+        ranked = english
+    else:
+        ranked = await _in_process(_ranked_ids_in_memory, keyword)
+        if ranked is None:
+            async with async_connection() as conn:
+                cursor = await conn.cursor()
+                try:
+                    gloss_index = await _gloss_index_ready_async(cursor)
+                    await cursor.execute(*_search_query(keyword, MAX_RANKED_RESULTS, _NO_WORD_COLUMNS, gloss_index))
+                    ranked = [str(row[0]) for row in await cursor.fetchall()]
+                finally:
+                    await cursor.close()
+        if english:
+            ranked = _union_ranked(english, ranked, MAX_RANKED_RESULTS)
+    if key:
+        await cache.set_async(key, ranked)
+    return ranked
+
+
+def _encode_cursor(keyword: str, position: int, entry_id: str) -> str:
+    payload = json.dumps({"q": keyword.lower(), "n": position, "id": entry_id}, ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return {"q": str(data["q"]), "n": int(data["n"]), "id": str(data["id"])}
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _page_start(ranked_ids: List[str], keyword: str, offset: int, cursor: Optional[str]) -> int:
+    """Index of the first result of the page."""
+    if not cursor:
+        return max(0, offset)
+    data = _decode_cursor(cursor)
+    if data["q"] != keyword.lower():
+        raise ValueError("Cursor does not belong to this keyword")
+    position, last_id = data["n"], data["id"]
+    # Usual case: same ranking as when the cursor was issued.
+    if 0 < position <= len(ranked_ids) and ranked_ids[position - 1] == last_id:
+        return position
+    # The ranking was recomputed (reimport, cache expiry): resume after the last
+    # entry seen if it is still ranked, otherwise at the same position.
+    try:
+        return ranked_ids.index(last_id) + 1
+    except ValueError:
+        return min(max(0, position), len(ranked_ids))
+
+
+def _page_result(ranked_ids: List[str], keyword: str, start: int, limit: int) -> tuple:
+    page_ids = ranked_ids[start:start + limit]
+    end = start + len(page_ids)
+    next_cursor = _encode_cursor(keyword, end, page_ids[-1]) if page_ids and end < len(ranked_ids) else None
+    return page_ids, next_cursor
+
+
+def search_page(keyword: str, limit: int = 10, offset: int = 0, cursor: Optional[str] = None) -> dict:
+    """One page of search results: {"items", "next_cursor", "total"}.
+
+    Pass either an offset or the next_cursor of the previous page. total is the
+    number of ranked results, at most MAX_RANKED_RESULTS. Raises ValueError for a
+    malformed cursor.
+    """
+    keyword = normalize_keyword(keyword)
+    ranked_ids = _ranked_ids(keyword)
+    start = _page_start(ranked_ids, keyword, offset, cursor)
+    page_ids, next_cursor = _page_result(ranked_ids, keyword, start, limit)
+    return {"items": _words_for_ids(page_ids), "next_cursor": next_cursor, "total": len(ranked_ids)}
+
+
+async def search_page_async(keyword: str, limit: int = 10, offset: int = 0,
+                            cursor: Optional[str] = None) -> dict:
+    """Async variant of search_page for the API routes."""
+    keyword = normalize_keyword(keyword)
+    ranked_ids = await _ranked_ids_async(keyword)
+    start = _page_start(ranked_ids, keyword, offset, cursor)
+    page_ids, next_cursor = _page_result(ranked_ids, keyword, start, limit)
+    return {"items": await _words_for_ids_async(page_ids), "next_cursor": next_cursor, "total": len(ranked_ids)}
+
+
+def _print_words(words: List[dict]) -> None:
+    if not words:
+        print("No results found.")
+        return
+    for i, word in enumerate(words, start=1):
+        headword = f"{word['kanji']} 【{word['kana']}】" if word.get("kanji") else word["kana"]
+        common = " (common)" if word.get("is_common") else ""
+        print(f"\n{i}. {headword}{common}")
+        for j, sense in enumerate(word.get("senses") or [], start=1):
+            pos = ", ".join(sense.get("parts_of_speech") or [])
+            glosses = "; ".join(sense.get("glosses") or [])
+            print(f"   {j}. {f'[{pos}] ' if pos else ''}{glosses}")
+
+
+def perform_search(keyword: str) -> None:
+    """Console search used by cli.py."""
+    _print_words(search_entries(keyword))
+
+
+def perform_prefix_search(text: str) -> None:
+    """Console lookup of the words a sentence starts with, used by cli.py."""
+    _print_words(find_prefix_words(text))
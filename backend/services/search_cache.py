@@ -0,0 +1,242 @@
+# backend/services/search_cache.py
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from db_async import get_dictionary_version_async
+from db_config import get_dictionary_version
+
+logger = logging.getLogger("gakuroku")
+
+# SEARCH_CACHE_SIZE=0 disables the cache. With SEARCH_CACHE_REDIS_URL set, results are
+# also shared between uvicorn workers through Redis (needs the `redis` package).
+SEARCH_CACHE_CONFIG = {
+    "size": int(os.getenv("SEARCH_CACHE_SIZE", "2048")),
+    "ttl": float(os.getenv("SEARCH_CACHE_TTL", "300")),
+    "version_ttl": float(os.getenv("SEARCH_CACHE_VERSION_TTL", "5")),
+    "redis_url": os.getenv("SEARCH_CACHE_REDIS_URL", "").strip() or None,
+}
+
+# Ranked id lists behind /api/search pagination: short-lived, a few hundred queries.
+RANKING_CACHE_CONFIG = dict(
+    SEARCH_CACHE_CONFIG,
+    size=int(os.getenv("SEARCH_RANKING_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("SEARCH_RANKING_CACHE_TTL", "120")),
+    namespace="ranking",
+)
+
+_SEARCH_ENGINE = os.getenv("SEARCH_ENGINE", "mysql").strip().lower()
+# Part of every key: workers sharing a Redis cache may run different engines.
+_ENGINE_KEY = f"{_SEARCH_ENGINE}+{os.getenv('SEARCH_ENGLISH', 'mysql').strip().lower()}"
+
+# The SQLite dictionary file is local and immutable: caching saves little, and the
+# version check would need MySQL.
+if _SEARCH_ENGINE == "sqlite":
+    SEARCH_CACHE_CONFIG["size"] = RANKING_CACHE_CONFIG["size"] = 0
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Form searches run on: NFKC width-folded (ｔａｂｅｒｕ -> taberu, ﾀﾍﾞﾙ -> タベル)
+    without surrounding whitespace."""
+    return unicodedata.normalize("NFKC", str(keyword)).strip()
+
+
+class SearchCache:
+    """LRU + TTL cache of search results, keyed on (dictionary version, limit, keyword).
+
+    Values are anything JSON-serializable (WordSchema dict lists, ranked id lists).
+
+    The dictionary version is re-read from dictionary_meta at most every
+    `version_ttl` seconds; import_task bumps it, so entries cached before a
+    reimport simply stop matching and age out of the LRU.
+    """
+
+    def __init__(self, size: int = 2048, ttl: float = 300.0, version_ttl: float = 5.0,
+                 redis_url: Optional[str] = None, namespace: str = "search"):
+        self.namespace = namespace
+        self.size = max(0, int(size))
+        self.ttl = float(ttl)
+        self.version_ttl = float(version_ttl)
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._version: Optional[str] = None
+        self._version_checked_at = 0.0
+
+        # metrics
+        self._hits = 0
+        self._shared_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        self._redis = None
+        self._redis_async = None
+        if redis_url and self.size:
+            try:
+                import redis
+                import redis.asyncio
+            except ImportError:
+                logger.warning("SEARCH_CACHE_REDIS_URL is set but the redis package is not installed")
+            else:
+                self._redis = redis.Redis.from_url(redis_url)
+                self._redis_async = redis.asyncio.Redis.from_url(redis_url)
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def _version_is_fresh(self) -> bool:
+        return self._version is not None and time.monotonic() - self._version_checked_at < self.version_ttl
+
+    def _set_version(self, version: str) -> str:
+        with self._lock:
+            if version != self._version:
+                # Everything cached so far belongs to the previous dictionary.
+                self._entries.clear()
+            self._version = version
+            self._version_checked_at = time.monotonic()
+        return version
+
+    def current_version(self) -> str:
+        if self._version_is_fresh():
+            return self._version
+        return self._set_version(get_dictionary_version())
+
+    async def current_version_async(self) -> str:
+        if self._version_is_fresh():
+            return self._version
+        return self._set_version(await get_dictionary_version_async())
+
+    def key(self, version: str, keyword: str, limit: int) -> str:
+        # The ranking is case-insensitive (utf8mb4_unicode_ci / lowercased gloss),
+        # so "Eat" and "eat" share an entry.
+        return f"{self.namespace}:{_ENGINE_KEY}:{version}:{int(limit)}:{keyword.lower()}"
+
+    def _get_local(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+        return None
+
+    def _set_local(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def _shared_hit(self, key: str, raw: Any) -> Optional[Any]:
+        if raw is None:
+            with self._lock:
+                self._misses += 1
+            return None
+        value = json.loads(raw)
+        with self._lock:
+            self._shared_hits += 1
+        self._set_local(key, value)
+        return value
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._get_local(key)
+        if value is not None:
+            return value
+        raw = None
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(key)
+            except Exception as e:
+                logger.warning("Search cache: Redis get failed: %s", e)
+        return self._shared_hit(key, raw)
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        value = self._get_local(key)
+        if value is not None:
+            return value
+        raw = None
+        if self._redis_async is not None:
+            try:
+                raw = await self._redis_async.get(key)
+            except Exception as e:
+                logger.warning("Search cache: Redis get failed: %s", e)
+        return self._shared_hit(key, raw)
+
+    def set(self, key: str, value: Any) -> None:
+        self._set_local(key, value)
+        if self._redis is not None:
+            try:
+                self._redis.set(key, json.dumps(value, ensure_ascii=False), ex=max(1, int(self.ttl)))
+            except Exception as e:
+                logger.warning("Search cache: Redis set failed: %s", e)
+
+    async def set_async(self, key: str, value: Any) -> None:
+        self._set_local(key, value)
+        if self._redis_async is not None:
+            try:
+                await self._redis_async.set(key, json.dumps(value, ensure_ascii=False), ex=max(1, int(self.ttl)))
+            except Exception as e:
+                logger.warning("Search cache: Redis set failed: %s", e)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._shared_hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "size": self.size,
+            "entries": len(self._entries),
+            "ttl_s": self.ttl,
+            "shared": self._redis is not None,
+            "dictionary_version": self._version,
+            "hits": self._hits,
+            "shared_hits": self._shared_hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "hit_ratio": round((self._hits + self._shared_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+_cache: Optional[SearchCache] = None
+_ranking_cache: Optional[SearchCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SearchCache(**SEARCH_CACHE_CONFIG)
+    return _cache
+
+
+def get_ranking_cache() -> SearchCache:
+    global _ranking_cache
+    if _ranking_cache is None:
+        with _cache_lock:
+            if _ranking_cache is None:
+                _ranking_cache = SearchCache(**RANKING_CACHE_CONFIG)
+    return _ranking_cache
+
+
+def search_cache_stats() -> dict:
+    return _cache.stats() if _cache is not None else {}
+
+
+def ranking_cache_stats() -> dict:
+    return _ranking_cache.stats() if _ranking_cache is not None else {}
@@ -0,0 +1,394 @@
+# backend/services/sqlite_dictionary.py
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from services.dictionary_index import FT_MAX_TOKEN_SIZE, FT_MIN_TOKEN_SIZE, FT_STOPWORDS, _TOKEN_RE
+from services.normalize import fold_collation, kanji_chars, query_readings
+
+logger = logging.getLogger("gakuroku")
+
+# Path of the read-only dictionary file built by `import_task.py --sqlite PATH`.
+DICTIONARY_SQLITE = os.getenv("DICTIONARY_SQLITE", "jmdict.sqlite3")
+# Bump when the file layout changes; older files are refused.
+# 2: fold_collation() keys next to the original forms, glosses and headwords.
+SQLITE_FORMAT_VERSION = "2"
+# Bytes of the file SQLite may map instead of read(); pages then come straight
+# from the OS page cache and are shared by every process using the file.
+SQLITE_MMAP_SIZE = int(os.getenv("DICTIONARY_SQLITE_MMAP", str(1 << 30)))
+
+# Same data as the MySQL entry tables, keyed by entry id. Forms, glosses and
+# headwords are stored with their fold_collation() key (what DictionaryIndex
+# compares: form, gloss_key, headword_key) next to the original text, and the
+# pieces of the ranking MySQL computes on the fly (is_common, gloss term
+# frequencies, FULLTEXT document frequencies) are precomputed.
+SQLITE_SCHEMA = [
+    """
+    CREATE TABLE dictionary_meta (
+        meta_key TEXT PRIMARY KEY,
+        meta_value TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE entries (
+        id TEXT PRIMARY KEY,
+        primary_headword TEXT NOT NULL,
+        headword_key TEXT NOT NULL,
+        is_common INTEGER NOT NULL,
+        word_data TEXT NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE entry_kanji (
+        form TEXT NOT NULL,
+        entry_id TEXT NOT NULL,
+        text TEXT NOT NULL,
+        PRIMARY KEY (form, entry_id, text)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE entry_reading (
+        form TEXT NOT NULL,
+        entry_id TEXT NOT NULL,
+        text TEXT NOT NULL,
+        PRIMARY KEY (form, entry_id, text)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE entry_reading_norm (
+        reading_norm TEXT NOT NULL,
+        entry_id TEXT NOT NULL,
+        PRIMARY KEY (reading_norm, entry_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE entry_definitions (
+        rowid INTEGER PRIMARY KEY,
+        entry_id TEXT NOT NULL UNIQUE,
+        gloss TEXT NOT NULL,
+        gloss_key TEXT NOT NULL
+    )
+    """,
+    # Trigram index over the glosses: substring (LIKE '%kw%') candidates without a scan.
+    """
+    CREATE VIRTUAL TABLE gloss_fts USING fts5(
+        gloss_key, content='entry_definitions', content_rowid='rowid', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TABLE gloss_terms (
+        term TEXT NOT NULL,
+        entry_id TEXT NOT NULL,
+        tf INTEGER NOT NULL,
+        PRIMARY KEY (term, entry_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE gloss_vocab (
+        term TEXT PRIMARY KEY,
+        df INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE entry_chars (
+        ch TEXT NOT NULL,
+        entry_id TEXT NOT NULL,
+        PRIMARY KEY (ch, entry_id)
+    ) WITHOUT ROWID
+    """,
+]
+
+
+def _range_end(prefix: str) -> str:
+    """Smallest string greater than every string starting with prefix (as _prefix_range)."""
+    if not prefix:
+        return "\U0010ffff"
+    code = ord(prefix[-1]) + 1
+    if 0xD800 <= code <= 0xDFFF:
+        # Surrogates cannot be stored; the next real code point sorts the same.
+        code = 0xE000
+    return prefix[:-1] + chr(code)
+
+
+@lru_cache(maxsize=256)
+def _word_pattern(keyword_lower: str):
+    return re.compile(r"(^|[^0-9a-z])" + re.escape(keyword_lower) + r"([^0-9a-z]|$)")
+
+
+def _gloss_word(gloss: str, keyword_lower: str) -> int:
+    return 1 if _word_pattern(keyword_lower).search(gloss) else 0
+
+
+# Mirrors DictionaryIndex.rank flag by flag (it mirrors services.search._SEARCH_SQL),
+# so the file gives the same ranking as SEARCH_ENGINE=memory. Like DictionaryIndex,
+# every flag is a set of entry ids computed once; rows then only probe them.
+_RANK_SQL_TEMPLATE = """
+    WITH
+    exact_kj(entry_id) AS (SELECT entry_id FROM entry_kanji WHERE form = :kw),
+    exact_rd(entry_id) AS (
+        SELECT entry_id FROM entry_reading WHERE form = :kw
+        UNION SELECT entry_id FROM entry_reading_norm WHERE reading_norm = :kana
+    ),
+    kw_prefix_kj(entry_id) AS (SELECT entry_id FROM entry_kanji WHERE form IN ({kw_prefixes})),
+    kw_prefix_rd(entry_id) AS (SELECT entry_id FROM entry_reading WHERE form IN ({kw_prefixes})),
+    prefix_kj(entry_id) AS (SELECT entry_id FROM entry_kanji WHERE form >= :kw AND form < :kw_end),
+    prefix_rd(entry_id) AS (
+        SELECT entry_id FROM entry_reading WHERE form >= :kw AND form < :kw_end
+        UNION SELECT entry_id FROM entry_reading_norm WHERE reading_norm >= :kana AND reading_norm < :kana_end
+    ),
+    romaji_rd(entry_id) AS (SELECT entry_id FROM entry_reading_norm WHERE reading_norm = :romaji),
+    romaji_prefix_rd(entry_id) AS (
+        SELECT entry_id FROM entry_reading_norm WHERE reading_norm >= :romaji AND reading_norm < :romaji_end
+    ),
+    like_gloss(entry_id) AS ({like_gloss}),
+    ft(entry_id, score) AS (
+        SELECT t.entry_id, SUM(t.tf * w.weight)
+        FROM gloss_terms t
+        JOIN ({ft_weights}) w ON w.term = t.term
+        GROUP BY t.entry_id
+    ),
+    m(entry_id) AS (
+        SELECT entry_id FROM exact_kj UNION SELECT entry_id FROM exact_rd
+        UNION SELECT entry_id FROM kw_prefix_kj UNION SELECT entry_id FROM kw_prefix_rd
+        UNION SELECT entry_id FROM prefix_kj UNION SELECT entry_id FROM prefix_rd
+        UNION SELECT entry_id FROM romaji_rd UNION SELECT entry_id FROM romaji_prefix_rd
+        UNION SELECT entry_id FROM like_gloss UNION SELECT entry_id FROM ft
+    )
+    SELECT
+        e.id,
+        e.word_data,
+        e.id IN exact_kj AS exact_kj,
+        e.id IN exact_rd AS exact_rd,
+        e.id IN kw_prefix_kj AS entry_prefix_of_keyword_kj,
+        e.id IN kw_prefix_rd AS entry_prefix_of_keyword_rd,
+        e.id IN prefix_kj AS prefix_kj,
+        e.id IN prefix_rd AS prefix_rd,
+        e.is_common,
+        {exact_gloss_word} AS exact_gloss_word,
+        (d.gloss_key >= :kw AND d.gloss_key < :kw_end) AS prefix_gloss,
+        e.id IN romaji_rd AS romaji_rd,
+        e.id IN romaji_prefix_rd AS romaji_prefix_rd,
+        COALESCE(ft.score, 0.0) AS ft_score,
+        e.id IN like_gloss AS like_gloss,
+        length(e.primary_headword) AS hw_len
+    FROM m
+    JOIN entries e ON e.id = m.entry_id
+    JOIN entry_definitions d ON d.entry_id = e.id
+    LEFT JOIN ft ON ft.entry_id = e.id
+    ORDER BY
+        exact_kj DESC,
+        exact_rd DESC,
+        entry_prefix_of_keyword_kj DESC,
+        entry_prefix_of_keyword_rd DESC,
+        prefix_kj DESC,
+        prefix_rd DESC,
+        is_common DESC,
+        exact_gloss_word DESC,
+        prefix_gloss DESC,
+        romaji_rd DESC,
+        romaji_prefix_rd DESC,
+        ft_score DESC,
+        like_gloss DESC,
+        hw_len ASC,
+        e.headword_key ASC,
+        e.id ASC
+    LIMIT :limit
+"""
+
+# Trigram MATCH needs at least three characters; instr() keeps the match exact.
+_LIKE_FTS_SQL = """SELECT d.entry_id FROM gloss_fts f JOIN entry_definitions d ON d.rowid = f.rowid
+         WHERE gloss_fts MATCH :kw_phrase AND instr(d.gloss_key, :kw) > 0"""
+_LIKE_SCAN_SQL = "SELECT entry_id FROM entry_definitions WHERE instr(gloss_key, :kw) > 0"
+# A one-word keyword is a whole word of the gloss exactly when it is one of its terms.
+_TERM_WORD_SQL = "e.id IN (SELECT entry_id FROM gloss_terms WHERE term = :kw)"
+# Otherwise the regex, only on glosses that contain the keyword at all.
+_REGEX_WORD_SQL = "(e.id IN like_gloss AND gloss_word(d.gloss_key, :kw))"
+
+
+class SqliteDictionary:
+    """Read-only dictionary file opened with mmap; one connection per thread.
+
+    The file is immutable once built, so it is opened with immutable=1 (no
+    locking, no change detection) and any number of processes can share it.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self._local = threading.local()
+        conn = self._connection()
+        meta = dict(conn.execute("SELECT meta_key, meta_value FROM dictionary_meta").fetchall())
+        if meta.get("format_version") != SQLITE_FORMAT_VERSION:
+            raise ValueError(
+                f"{self.path}: format {meta.get('format_version')!r}, expected {SQLITE_FORMAT_VERSION!r}; "
+                "rebuild it with import_task.py --sqlite"
+            )
+        self.version = meta.get("dictionary_version", "")
+        self.entry_count = int(meta.get("entry_count", "0"))
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro&immutable=1", uri=True)
+            conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+            conn.create_function("gloss_word", 2, _gloss_word, deterministic=True)
+            self._local.conn = conn
+        return conn
+
+    def __len__(self) -> int:
+        return self.entry_count
+
+    def query(self, sql: str, params: Sequence = ()) -> sqlite3.Cursor:
+        """Run a read-only statement on the file; for indexes built from it (suggest, BM25)."""
+        return self._connection().execute(sql, tuple(params))
+
+    # --- ranking ---
+
+    def _ft_weights(self, conn: sqlite3.Connection, keyword_lower: str) -> List[Tuple[str, float]]:
+        """(term, idf^2) of the keyword's FULLTEXT terms, as DictionaryIndex._fulltext_scores."""
+        terms = [
+            term for term in set(_TOKEN_RE.findall(keyword_lower))
+            if FT_MIN_TOKEN_SIZE <= len(term) <= FT_MAX_TOKEN_SIZE and term not in FT_STOPWORDS
+        ]
+        if not terms:
+            return []
+        placeholders = ", ".join("?" * len(terms))
+        weights = []
+        for term, df in conn.execute(f"SELECT term, df FROM gloss_vocab WHERE term IN ({placeholders})", terms):
+            idf = math.log10(self.entry_count / df) if df else 0.0
+            weights.append((term, idf * idf))
+        return weights
+
+    def _rank_rows(self, keyword: str, limit: int) -> list:
+        conn = self._connection()
+        kw = fold_collation(keyword)
+        kana_norm, romaji_kana = query_readings(keyword)
+
+        weights = self._ft_weights(conn, kw)
+        ft_weights = " UNION ALL ".join(
+            f"SELECT :ft_term{i} AS term, :ft_weight{i} AS weight" for i in range(len(weights))
+        ) or "SELECT NULL AS term, 0.0 AS weight"
+        prefixes = [kw[:end] for end in range(1, len(kw) + 1)]
+
+        params: Dict[str, object] = {
+            "kw": kw,
+            "kw_end": _range_end(kw),
+            "kw_phrase": '"' + kw.replace('"', '""') + '"',
+            # NULL bounds never match, as DictionaryIndex skips the reading_norm lookups.
+            "kana": kana_norm,
+            "kana_end": _range_end(kana_norm) if kana_norm else None,
+            "romaji": romaji_kana,
+            "romaji_end": _range_end(romaji_kana) if romaji_kana else None,
+            "limit": int(limit),
+        }
+        for i, (term, weight) in enumerate(weights):
+            params[f"ft_term{i}"] = term
+            params[f"ft_weight{i}"] = weight
+        for i, prefix in enumerate(prefixes):
+            params[f"p{i}"] = prefix
+
+        sql = _RANK_SQL_TEMPLATE.format(
+            ft_weights=ft_weights,
+            kw_prefixes=", ".join(f":p{i}" for i in range(len(prefixes))) or "NULL",
+            like_gloss=_LIKE_FTS_SQL if len(kw) >= 3 else _LIKE_SCAN_SQL,
+            exact_gloss_word=_TERM_WORD_SQL if _TOKEN_RE.fullmatch(kw) else _REGEX_WORD_SQL,
+        )
+        return conn.execute(sql, params).fetchall()
+
+    def search(self, keyword: str, limit: int = 10) -> List[dict]:
+        """Rank entries the same way as DictionaryIndex.search."""
+        return [json.loads(row[1]) for row in self._rank_rows(keyword, limit)]
+
+    def rank(self, keyword: str, limit: int = 10) -> List[str]:
+        """Entry ids of the best `limit` matches, best first."""
+        return [row[0] for row in self._rank_rows(keyword, limit)]
+
+    # --- lookups ---
+
+    def words_for_ids(self, entry_ids: Sequence[str]) -> List[dict]:
+        """WordSchema dicts for entry_ids, in that order."""
+        if not entry_ids:
+            return []
+        placeholders = ", ".join("?" * len(entry_ids))
+        rows = self._connection().execute(
+            f"SELECT id, word_data FROM entries WHERE id IN ({placeholders})", tuple(entry_ids),
+        ).fetchall()
+        by_id = {entry_id: word_data for entry_id, word_data in rows}
+        return [json.loads(by_id[entry_id]) for entry_id in entry_ids if entry_id in by_id]
+
+    def prefix_entries(self, text: str) -> List[Tuple[int, str]]:
+        """(matched length, entry id) for entries having a kanji or reading form that
+        prefixes text, longest match first, each entry reported once."""
+        text = fold_collation(text)
+        prefixes = [text[:end] for end in range(1, len(text) + 1)]
+        if not prefixes:
+            return []
+        placeholders = ", ".join("?" * len(prefixes))
+        rows = self._connection().execute(
+            f"""
+            SELECT length(form), entry_id, 0 AS source FROM entry_kanji WHERE form IN ({placeholders})
+            UNION ALL
+            SELECT length(form), entry_id, 1 AS source FROM entry_reading WHERE form IN ({placeholders})
+            ORDER BY 1 DESC, source, entry_id
+            """,
+            (*prefixes, *prefixes),
+        ).fetchall()
+        seen: set = set()
+        out: List[Tuple[int, str]] = []
+        for length, entry_id, _ in rows:
+            if entry_id not in seen:
+                seen.add(entry_id)
+                out.append((length, entry_id))
+        return out
+
+    def contains_chars(self, text: str, limit: int = 20) -> List[dict]:
+        """Entries whose kanji forms contain every kanji of text (DictionaryIndex.contains_chars)."""
+        chars = kanji_chars(text)
+        if not chars:
+            return []
+        placeholders = ", ".join("?" * len(chars))
+        rows = self._connection().execute(
+            f"""
+            SELECT e.word_data
+            FROM (
+                SELECT entry_id FROM entry_chars
+                WHERE ch IN ({placeholders})
+                GROUP BY entry_id
+                HAVING COUNT(*) = ?
+            ) m
+            JOIN entries e ON e.id = m.entry_id
+            ORDER BY e.is_common DESC, length(e.primary_headword) ASC, e.headword_key ASC, e.id ASC
+            LIMIT ?
+            """,
+            (*chars, len(chars), int(limit)),
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+
+_sqlite_dictionary: Optional[SqliteDictionary] = None
+_sqlite_dictionary_lock = threading.Lock()
+
+
+def get_sqlite_dictionary() -> SqliteDictionary:
+    """Return the process-wide SqliteDictionary, opening DICTIONARY_SQLITE on first use."""
+    global _sqlite_dictionary
+    if _sqlite_dictionary is None:
+        with _sqlite_dictionary_lock:
+            if _sqlite_dictionary is None:
+                if not os.path.exists(DICTIONARY_SQLITE):
+                    raise FileNotFoundError(
+                        f"{DICTIONARY_SQLITE} not found; build it with import_task.py --sqlite {DICTIONARY_SQLITE}"
+                    )
+                _sqlite_dictionary = SqliteDictionary(DICTIONARY_SQLITE)
+                logger.info(
+                    "SQLite dictionary opened: %s (%d entries, version %s)",
+                    DICTIONARY_SQLITE, len(_sqlite_dictionary), _sqlite_dictionary.version,
+                )
+    return _sqlite_dictionary
@@ -3,9 +3,22 @@ from __future__ import annotations
 
 from datetime import date, timedelta
 
+from db_async import async_connection
 from db_config import get_connection
 
 
+_HEATMAP_SQL = """
+	SELECT `date`, `count`
+	FROM study_logs
+	WHERE `date` >= %s AND `date` <= %s
+	ORDER BY `date` ASC
+"""
+
+_TOTAL_REVIEWS_SQL = "SELECT COALESCE(SUM(`count`), 0) FROM study_logs"
+_MASTERED_WORDS_SQL = "SELECT COUNT(*) FROM flashcards WHERE is_memorized = 1"
+_STUDY_DATES_SQL = "SELECT `date` FROM study_logs WHERE `count` > 0 ORDER BY `date` ASC"
+
+
 def compute_streaks(study_dates: list[date]) -> tuple[int, int]:
 	"""Compute (current_streak, longest_streak) from a list of study dates.
 
@@ -42,30 +55,39 @@ def compute_streaks(study_dates: list[date]) -> tuple[int, int]:
 	return current_streak, longest_streak
 
 
+def _heatmap_range() -> tuple[date, date]:
+	return date.today() - timedelta(days=364), date.today()
+
+
+def _heatmap_rows(rows) -> list[dict]:
+	out: list[dict] = []
+	for row in rows or []:
+		d = row[0]
+		c = row[1]
+		out.append({"date": d.isoformat() if hasattr(d, "isoformat") else str(d), "count": int(c)})
+	return out
+
+
+def _overview(total_reviews: int, mastered_words: int, study_dates: list[date]) -> dict:
+	current_streak, longest_streak = compute_streaks(study_dates)
+	return {
+		"total_reviews": total_reviews,
+		"mastered_words": mastered_words,
+		"current_streak": current_streak,
+		"longest_streak": longest_streak,
+	}
+
+
 def get_heatmap_stats_last_365_days() -> list[dict]:
 	"""Return study activity for last 365 days (including today)."""
-	start_date = date.today() - timedelta(days=364)
-	end_date = date.today()
+	start_date, end_date = _heatmap_range()
 
 	conn = get_connection()
 	cursor = conn.cursor()
 	try:
-		cursor.execute(
-			"""
-			SELECT `date`, `count`
-			FROM study_logs
-			WHERE `date` >= %s AND `date` <= %s
-			ORDER BY `date` ASC
-			""",
-			(start_date, end_date),
-		)
-
-		out: list[dict] = []
-		for row in cursor.fetchall() or []:
-			d = row[0]
-			c = row[1]
-			out.append({"date": d.isoformat() if hasattr(d, "isoformat") else str(d), "count": int(c)})
-		return out
+		cursor.execute(_HEATMAP_SQL, (start_date, end_date))
+
+		return _heatmap_rows(cursor.fetchall())
 	finally:
 		cursor.close()
 		conn.close()
@@ -81,22 +103,47 @@ def get_overview_stats() -> dict:
 	conn = get_connection()
 	cursor = conn.cursor()
 	try:
-		cursor.execute("SELECT COALESCE(SUM(`count`), 0) FROM study_logs")
+		cursor.execute(_TOTAL_REVIEWS_SQL)
 		total_reviews = int((cursor.fetchone() or [0])[0] or 0)
 
-		cursor.execute("SELECT COUNT(*) FROM flashcards WHERE is_memorized = 1")
+		cursor.execute(_MASTERED_WORDS_SQL)
 		mastered_words = int((cursor.fetchone() or [0])[0] or 0)
 
-		cursor.execute("SELECT `date` FROM study_logs WHERE `count` > 0 ORDER BY `date` ASC")
+		cursor.execute(_STUDY_DATES_SQL)
 		study_dates = [row[0] for row in (cursor.fetchall() or [])]
-		current_streak, longest_streak = compute_streaks(study_dates)
-
-		return {
-			"total_reviews": total_reviews,
-			"mastered_words": mastered_words,
-			"current_streak": current_streak,
-			"longest_streak": longest_streak,
-		}
+		return _overview(total_reviews, mastered_words, study_dates)
 	finally:
 		cursor.close()
 		conn.close()
+
+
+# --- async variants (API routes) ---
+
+
+async def get_heatmap_stats_last_365_days_async() -> list[dict]:
+	start_date, end_date = _heatmap_range()
+	async with async_connection() as conn:
+		cursor = await conn.cursor()
+		try:
+			await cursor.execute(_HEATMAP_SQL, (start_date, end_date))
+			return _heatmap_rows(await cursor.fetchall())
+		finally:
+			await cursor.close()
+
+
+async def get_overview_stats_async() -> dict:
+	async with async_connection() as conn:
+		cursor = await conn.cursor()
+		try:
+			await cursor.execute(_TOTAL_REVIEWS_SQL)
+			total_reviews = int((await cursor.fetchone() or [0])[0] or 0)
+
+			await cursor.execute(_MASTERED_WORDS_SQL)
+			mastered_words = int((await cursor.fetchone() or [0])[0] or 0)
+
+			await cursor.execute(_STUDY_DATES_SQL)
+			study_dates = [row[0] for row in (await cursor.fetchall() or [])]
+
+			return _overview(total_reviews, mastered_words, study_dates)
+		finally:
+			await cursor.close()
@@ -0,0 +1,196 @@
+# backend/services/study_log_buffer.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import date as Date
+from typing import Dict, List, Optional, Tuple, Union
+
+from db_async import async_connection, increment_study_log_async
+from db_config import STUDY_LOG_UPSERT_SQL
+
+logger = logging.getLogger("gakuroku")
+
+# Reviews are counted in memory and written every STUDY_LOG_FLUSH_INTERVAL seconds
+# (or once STUDY_LOG_FLUSH_THRESHOLD reviews are pending), one upsert per flush.
+# A crash loses at most one interval of counts. STUDY_LOG_FLUSH_INTERVAL=0 writes
+# every review through immediately.
+STUDY_LOG_BUFFER_CONFIG = {
+    "interval": float(os.getenv("STUDY_LOG_FLUSH_INTERVAL", "5")),
+    "threshold": int(os.getenv("STUDY_LOG_FLUSH_THRESHOLD", "500")),
+}
+
+
+def _upsert_query(counts: List[Tuple[Date, int]]) -> Tuple[str, list]:
+    """STUDY_LOG_UPSERT_SQL with one VALUES row per day, adding every day's count."""
+    values = ", ".join(["(%s, %s)"] * len(counts))
+    params: list = []
+    for log_date, count in counts:
+        params.extend((log_date, count))
+    return STUDY_LOG_UPSERT_SQL.replace("VALUES (%s, %s)", f"VALUES {values}", 1), params
+
+
+class StudyLogBuffer:
+    """Write-behind aggregator for study_logs increments.
+
+    Every review used to upsert today's study_logs row, so all reviewers queued
+    on that one row lock. add() only bumps a per-date counter; a background task
+    writes the coalesced counts with a single upsert per flush. Counts of a
+    failed flush are put back and retried on the next one.
+    """
+
+    def __init__(self, interval: float = 5.0, threshold: int = 500):
+        self.interval = float(interval)
+        self.threshold = max(1, int(threshold))
+        self._pending: Dict[str, int] = {}
+        self._pending_total = 0
+        self._lock = threading.Lock()
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self._flushes = 0
+        self._failures = 0
+        self._flushed_reviews = 0
+        self._flush_total = 0.0
+        self._flush_max = 0.0
+        self._last_flush_ms = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the background flusher has been started (by the app's lifespan)."""
+        return self._task is not None
+
+    def add(self, log_date: Union[Date, str], delta: int = 1) -> None:
+        key = log_date.isoformat() if hasattr(log_date, "isoformat") else str(log_date)
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + int(delta)
+            self._pending_total += int(delta)
+            full = self._pending_total >= self.threshold
+        if full and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _take(self) -> List[Tuple[str, int]]:
+        with self._lock:
+            counts = sorted(self._pending.items())
+            self._pending = {}
+            self._pending_total = 0
+        return [(log_date, count) for log_date, count in counts if count]
+
+    def _put_back(self, counts: List[Tuple[str, int]]) -> None:
+        with self._lock:
+            for log_date, count in counts:
+                self._pending[log_date] = self._pending.get(log_date, 0) + count
+                self._pending_total += count
+
+    async def flush(self) -> int:
+        """Write the pending counts now; returns the number of reviews written."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            counts = self._take()
+            if not counts:
+                return 0
+            started = time.perf_counter()
+            try:
+                async with async_connection() as conn:
+                    cursor = await conn.cursor()
+                    try:
+                        await cursor.execute(*_upsert_query(counts))
+                        await conn.commit()
+                    finally:
+                        await cursor.close()
+            except Exception:
+                self._put_back(counts)
+                self._failures += 1
+                raise
+            elapsed = time.perf_counter() - started
+            written = sum(count for _, count in counts)
+            self._flushes += 1
+            self._flushed_reviews += written
+            self._flush_total += elapsed
+            self._flush_max = max(self._flush_max, elapsed)
+            self._last_flush_ms = elapsed * 1000
+            return written
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning("Failed to flush study logs, retrying next interval: %s", e)
+
+    def start(self) -> None:
+        """Start the background flusher (call from the running event loop)."""
+        if not self.enabled or self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error("Failed to flush study logs on shutdown, %d reviews lost: %s", self.pending(), e)
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending_total
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "interval_s": self.interval,
+            "threshold": self.threshold,
+            "pending": self.pending(),
+            "flushes": self._flushes,
+            "failures": self._failures,
+            "flushed_reviews": self._flushed_reviews,
+            "flush_time_avg_ms": round(self._flush_total * 1000 / self._flushes, 3) if self._flushes else 0.0,
+            "flush_time_max_ms": round(self._flush_max * 1000, 3),
+            "last_flush_ms": round(self._last_flush_ms, 3),
+        }
+
+
+_buffer: Optional[StudyLogBuffer] = None
+
+
+def get_study_log_buffer() -> StudyLogBuffer:
+    global _buffer
+    if _buffer is None:
+        _buffer = StudyLogBuffer(**STUDY_LOG_BUFFER_CONFIG)
+    return _buffer
+
+
+async def record_reviews(log_date: Union[Date, str], count: int = 1) -> None:
+    """Count reviews for a day: buffered while the flusher runs, else written through."""
+    buffer = get_study_log_buffer()
+    if buffer.enabled and buffer.running:
+        buffer.add(log_date, count)
+    else:
+        await increment_study_log_async(log_date, count)
+
+
+def study_log_buffer_stats() -> dict:
+    return _buffer.stats() if _buffer is not None else {}
@@ -0,0 +1,202 @@
+# backend/services/suggest.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from db_config import get_connection
+from services.dictionary_index import _TOKEN_RE, _prefix_range
+from services.sqlite_dictionary import get_sqlite_dictionary
+
+logger = logging.getLogger("gakuroku")
+
+KIND_KANJI = 0
+KIND_READING = 1
+KIND_GLOSS = 2
+KIND_NAMES = ("kanji", "reading", "gloss")
+
+MAX_SUGGESTIONS = 20
+# Prefixes up to this length match too many terms to rank per request, so their
+# top MAX_SUGGESTIONS are computed at build time.
+PRECOMPUTED_PREFIX_LENGTH = 2
+# Gloss words shorter than this are not worth suggesting.
+MIN_GLOSS_WORD_LENGTH = 2
+
+
+class SuggestIndex:
+    """Sorted array of every headword, reading and gloss word for autocomplete.
+
+    - terms: distinct lower-cased terms, sorted, so a prefix is a bisect range.
+    - kinds / common: per-term kind (kanji > reading > gloss when a term is
+      several) and whether any entry having it is common.
+    - rank: position of each term in suggestion order (common first, then
+      shorter, then alphabetical); order is the inverse permutation. Ranking a
+      prefix range is sorting a slice of ints and mapping them back.
+    - top: precomputed answers for prefixes of up to PRECOMPUTED_PREFIX_LENGTH.
+    """
+
+    def __init__(self, terms: Sequence[str], kinds: bytes, common: bytes,
+                 rank: Sequence[int], order: Sequence[int], top: Dict[str, Tuple[int, ...]]):
+        self.terms = terms
+        self.kinds = kinds
+        self.common = common
+        self.rank = rank
+        self.order = order
+        self.top = top
+
+    @classmethod
+    def build(cls, items: Iterable[Tuple[str, int, int]]) -> "SuggestIndex":
+        """items: (text, kind, is_common) from all sources, duplicates allowed."""
+        best: Dict[str, List[int]] = {}
+        for text, kind, is_common in items:
+            term = str(text).strip().lower()
+            if not term:
+                continue
+            current = best.get(term)
+            if current is None:
+                best[term] = [kind, 1 if is_common else 0]
+            else:
+                current[0] = min(current[0], kind)
+                current[1] = current[1] or (1 if is_common else 0)
+
+        terms = sorted(best)
+        kinds = bytes(best[t][0] for t in terms)
+        common = bytes(best[t][1] for t in terms)
+
+        order = array("I", sorted(range(len(terms)), key=lambda i: (-common[i], len(terms[i]), terms[i])))
+        rank = array("I", bytes(4 * len(terms)))
+        for position, i in enumerate(order):
+            rank[i] = position
+
+        # Walk terms in suggestion order and keep the first MAX_SUGGESTIONS per short prefix.
+        top: Dict[str, List[int]] = {}
+        for i in order:
+            term = terms[i]
+            for length in range(1, min(len(term), PRECOMPUTED_PREFIX_LENGTH) + 1):
+                bucket = top.setdefault(term[:length], [])
+                if len(bucket) < MAX_SUGGESTIONS:
+                    bucket.append(i)
+
+        return cls(terms, kinds, common, rank, order, {p: tuple(ids) for p, ids in top.items()})
+
+    @classmethod
+    def from_mysql(cls) -> "SuggestIndex":
+        conn = get_connection()
+        cursor = conn.cursor()
+        items: List[Tuple[str, int, int]] = []
+        try:
+            # Entry-level common flag, as in the search ORDER BY (MAX over kanji forms).
+            common_sql = "(SELECT entry_id, MAX(is_common) AS common FROM entry_kanji GROUP BY entry_id)"
+            cursor.execute(
+                f"""
+                SELECT k.kanji_text, c.common
+                FROM entry_kanji k JOIN {common_sql} c ON c.entry_id = k.entry_id
+                """
+            )
+            items.extend((text, KIND_KANJI, common) for text, common in cursor.fetchall())
+            cursor.execute(
+                f"""
+                SELECT r.reading_text, COALESCE(c.common, 0)
+                FROM entry_reading r LEFT JOIN {common_sql} c ON c.entry_id = r.entry_id
+                """
+            )
+            items.extend((text, KIND_READING, common) for text, common in cursor.fetchall())
+            cursor.execute(
+                f"""
+                SELECT d.gloss_text, COALESCE(c.common, 0)
+                FROM entry_definitions d LEFT JOIN {common_sql} c ON c.entry_id = d.entry_id
+                """
+            )
+            for gloss_text, common in cursor.fetchall():
+                for word in set(_TOKEN_RE.findall(str(gloss_text or "").lower())):
+                    if len(word) >= MIN_GLOSS_WORD_LENGTH:
+                        items.append((word, KIND_GLOSS, common))
+        finally:
+            cursor.close()
+            conn.close()
+        return cls.build(items)
+
+    @classmethod
+    def from_sqlite(cls, dictionary) -> "SuggestIndex":
+        """Same terms from the SQLite dictionary file (its text columns hold the original forms)."""
+        items: List[Tuple[str, int, int]] = []
+        items.extend(
+            (text, KIND_KANJI, common) for text, common in dictionary.query(
+                "SELECT k.text, e.is_common FROM entry_kanji k JOIN entries e ON e.id = k.entry_id"
+            )
+        )
+        items.extend(
+            (text, KIND_READING, common) for text, common in dictionary.query(
+                "SELECT r.text, e.is_common FROM entry_reading r JOIN entries e ON e.id = r.entry_id"
+            )
+        )
+        for gloss, common in dictionary.query(
+            "SELECT d.gloss, e.is_common FROM entry_definitions d JOIN entries e ON e.id = d.entry_id"
+        ):
+            for word in set(_TOKEN_RE.findall(gloss.lower())):
+                if len(word) >= MIN_GLOSS_WORD_LENGTH:
+                    items.append((word, KIND_GLOSS, common))
+        return cls.build(items)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[dict]:
+        """Top `limit` terms starting with prefix: {"text", "kind", "is_common"}."""
+        prefix = prefix.strip().lower()
+        limit = max(0, min(int(limit), MAX_SUGGESTIONS))
+        if not prefix or not limit:
+            return []
+
+        found = self.top.get(prefix)
+        if found is None:
+            lo, hi = _prefix_range(self.terms, prefix)
+            order = self.order
+            found = [order[position] for position in sorted(self.rank[lo:hi])[:limit]]
+
+        return [
+            {"text": self.terms[i], "kind": KIND_NAMES[self.kinds[i]], "is_common": bool(self.common[i])}
+            for i in found[:limit]
+        ]
+
+
+_suggest_index: Optional[SuggestIndex] = None
+_suggest_index_lock = threading.Lock()
+
+
+def get_suggest_index() -> SuggestIndex:
+    """Return the process-wide SuggestIndex, building it on first use from the
+    search engine's source (the SQLite file with SEARCH_ENGINE=sqlite, else MySQL)."""
+    # services.search builds on the modules this one imports.
+    from services.search import SEARCH_ENGINE
+
+    global _suggest_index
+    if _suggest_index is None:
+        with _suggest_index_lock:
+            if _suggest_index is None:
+                started = time.perf_counter()
+                if SEARCH_ENGINE == "sqlite":
+                    _suggest_index = SuggestIndex.from_sqlite(get_sqlite_dictionary())
+                else:
+                    _suggest_index = SuggestIndex.from_mysql()
+                logger.info(
+                    "Suggest index loaded: %d terms in %.2fs",
+                    len(_suggest_index), time.perf_counter() - started,
+                )
+    return _suggest_index
+
+
+def suggest(prefix: str, limit: int = 10) -> List[dict]:
+    return get_suggest_index().suggest(prefix, limit)
+
+
+async def suggest_async(prefix: str, limit: int = 10) -> List[dict]:
+    """suggest() for the API routes; only the first call (index build) leaves the event loop."""
+    index = _suggest_index
+    if index is None:
+        index = await asyncio.to_thread(get_suggest_index)
+    return index.suggest(prefix, limit)
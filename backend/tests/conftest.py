@@ -0,0 +1,92 @@
+# backend/tests/conftest.py
+# Shared fixtures. The dictionary tests run on a JMdict-shaped file generated from
+# vocab_json/all.json (about 8k words), so no MySQL server or JMdict download is needed.
+import json
+import os
+import random
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import import_task  # noqa: E402
+from services.dictionary_index import DictionaryIndex  # noqa: E402
+
+VOCAB_FILE = os.path.join(os.path.dirname(BACKEND_DIR), "vocab_json", "all.json")
+
+
+def load_vocab() -> list[dict]:
+    with open(VOCAB_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def vocab_words(vocab: list[dict]) -> list[dict]:
+    """One JMdict word per vocab item; ids from 1000000, about half the kanji forms common."""
+    rng = random.Random(1)
+    words = []
+    for i, item in enumerate(vocab):
+        kanji = []
+        if item["furigana"]:
+            kanji = [{"common": rng.random() < 0.5, "text": item["word"], "tags": []}]
+        kana = [{"common": True, "text": item["furigana"] or item["word"], "tags": [], "appliesToKanji": ["*"]}]
+        senses = [
+            {
+                "gloss": [{"lang": "eng", "text": g.strip()} for g in part.split(",") if g.strip()],
+                "partOfSpeech": ["n"],
+            }
+            for part in item["meaning"].split(";")
+        ]
+        words.append({"id": str(1000000 + i), "kanji": kanji, "kana": kana, "sense": senses})
+    return words
+
+
+def index_from_rows(batch) -> DictionaryIndex:
+    """DictionaryIndex from importer rows, as DictionaryIndex.from_mysql reads them back."""
+    glosses = dict(batch.defs)
+    entries = sorted(
+        (entry_id, headword, glosses.get(entry_id, ""), json.loads(word_data))
+        for entry_id, headword, _, word_data, _ in batch.entries
+    )
+    return DictionaryIndex.build(entries, batch.kanji, [(entry_id, text) for entry_id, text, _ in batch.reading])
+
+
+@pytest.fixture(scope="session")
+def vocab() -> list[dict]:
+    return load_vocab()
+
+
+@pytest.fixture(scope="session")
+def jmdict_path(tmp_path_factory, vocab) -> str:
+    path = tmp_path_factory.mktemp("jmdict") / "jmdict.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": "test", "words": vocab_words(vocab)}, f, ensure_ascii=False)
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def dictionary_rows(jmdict_path):
+    return import_task._build_rows(list(import_task.iter_word_texts(jmdict_path)))
+
+
+@pytest.fixture(scope="session")
+def dictionary_index(dictionary_rows) -> DictionaryIndex:
+    return index_from_rows(dictionary_rows)
+
+
+@pytest.fixture(scope="session")
+def query_keywords(vocab) -> list[str]:
+    """Fixed edge cases plus headwords, readings, romaji and gloss words of sampled vocab."""
+    keywords = [
+        "eat", "to eat", "water", "the", "a", "", "ta", "mizu", "taberu", "タベル", "ﾀﾍﾞﾙ",
+        "食", "食べ", "日本語", "xyzzy", "tea", "green tea", "ing", "Japan", "o", "sewa-suru",
+    ]
+    rng = random.Random(2)
+    for item in rng.sample(vocab, 60):
+        keywords += [
+            item["word"], item["furigana"], item["romaji"],
+            item["meaning"].split(";")[0].split(",")[0].strip(), item["word"][:1], item["meaning"][:3],
+        ]
+    return keywords
@@ -0,0 +1,98 @@
+# backend/tests/test_bm25.py
+import math
+
+import pytest
+
+import services.search as search
+from services.bm25 import BM25_B, BM25_K1, COMMON_BOOST, FIRST_SENSE_WEIGHT, BM25Index
+
+ENTRIES = [
+    ("1", [["tea"], ["green tea (drink)"]], False),
+    ("2", [["black tea", "tea"]], True),
+    ("3", [["to drink"], ["tea ceremony"]], False),
+    ("4", [["water"]], True),
+    ("5", [["Café au lait"]], False),
+]
+
+
+@pytest.fixture()
+def index():
+    return BM25Index.build(ENTRIES)
+
+
+def test_postings(index):
+    t = index.terms.index("tea")
+    assert list(index.postings[index.offsets[t]:index.offsets[t + 1]]) == [0, 1, 2]
+    # First-sense words count FIRST_SENSE_WEIGHT times.
+    assert list(index.tfs[index.offsets[t]:index.offsets[t + 1]]) == [
+        FIRST_SENSE_WEIGHT + 1.0, 2 * FIRST_SENSE_WEIGHT, 1.0,
+    ]
+    assert index.doc_len[0] == FIRST_SENSE_WEIGHT + 3.0
+
+
+def test_score_formula(index):
+    n, total = 0, len(index)
+    df, tf = 3, FIRST_SENSE_WEIGHT + 1.0
+    idf = math.log(1.0 + (total - df + 0.5) / (df + 0.5))
+    norm = tf + BM25_K1 * (1.0 - BM25_B + BM25_B * index.doc_len[n] / index.avg_len)
+    assert index.scores("tea")[n] == pytest.approx(idf * tf * (BM25_K1 + 1.0) / norm)
+
+
+def test_rank(index):
+    # A sense that is just "tea" beats "tea ceremony" in a second sense.
+    assert index.rank("tea", 10)[-1] == "3"
+    assert set(index.rank("tea", 10)) == {"1", "2", "3"}
+    assert index.rank("Tea", 10) == index.rank("tea", 10)
+    assert index.rank("cafe", 10) == ["5"]
+    assert index.rank("green tea", 1) == ["1"]
+    assert index.rank("coffee", 10) == []
+    assert index.rank("tea", 2) == index.rank("tea", 10)[:2]
+
+
+def test_common_boost(index):
+    scores = index.scores("water")
+    assert dict(index.top("water", 1)) == {3: pytest.approx(scores[3] * COMMON_BOOST)}
+
+
+def test_ties_break_on_entry_order():
+    index = BM25Index.build([("9", [["tea"]], False), ("10", [["tea"]], False)])
+    assert index.rank("tea", 2) == ["9", "10"]
+
+
+def test_every_word_is_indexed(index):
+    # No stopwords or minimum token size, unlike MATCH ... AGAINST.
+    assert index.rank("to", 10) == ["3"]
+    assert index.rank("au", 10) == ["5"]
+
+
+class _Index:
+    def rank(self, keyword, limit):
+        return ["1", "2"] if keyword in ("tea", "water") else []
+
+
+def test_english_words_that_read_as_romaji_keep_both_rankings(monkeypatch):
+    monkeypatch.setattr(search, "SEARCH_ENGLISH", "bm25")
+    monkeypatch.setattr(search, "get_bm25_index", lambda: _Index())
+    monkeypatch.setattr(search, "_words_for_ids", lambda ids: [{"id": i} for i in ids])
+    monkeypatch.setattr(search, "_search_regular", lambda keyword, limit: [{"id": "2"}, {"id": "9"}])
+
+    # tea also reads as てあ: BM25 first, then the regular (romaji) matches.
+    assert search._search_uncached("tea", 10) == [{"id": "1"}, {"id": "2"}, {"id": "9"}]
+    assert search._search_uncached("tea", 2) == [{"id": "1"}, {"id": "2"}]
+    # water is not romaji: BM25 only.
+    assert search._search_uncached("water", 10) == [{"id": "1"}, {"id": "2"}]
+    # No BM25 hit: the regular search.
+    assert search._search_uncached("xyzzy", 10) == [{"id": "2"}, {"id": "9"}]
+
+
+def test_batch_merges_like_single_search(monkeypatch):
+    monkeypatch.setattr(search, "SEARCH_ENGLISH", "bm25")
+    monkeypatch.setattr(search, "get_bm25_index", lambda: _Index())
+    searches = [("tea", 10), ("water", 10), ("食べる", 10)]
+    english, rest = search._split_english_searches(searches)
+    assert english == {0: ["1", "2"], 1: ["1", "2"]}
+    assert rest == [0, 2]
+    merged = search._merge_batch_results(
+        searches, english, [{"id": "1"}, {"id": "2"}], rest, [[{"id": "9"}], [{"id": "5"}]],
+    )
+    assert merged == [[{"id": "1"}, {"id": "2"}, {"id": "9"}], [{"id": "1"}, {"id": "2"}], [{"id": "5"}]]
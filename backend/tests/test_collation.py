@@ -0,0 +1,78 @@
+# backend/tests/test_collation.py
+# Keywords whose matches depend on utf8mb4_unicode_ci. The expected orders are what
+# services.search._SEARCH_SQL returns on MySQL for these entries, worked out from
+# its ORDER BY: the collation makes は = ば = ハ and や = ゃ (exact / prefix reading
+# matches, equal primary_headword in the tie-break) and café = cafe (gloss matches).
+import json
+
+import pytest
+
+import import_task
+from conftest import index_from_rows
+from services.dictionary_snapshot import Snapshot, write_snapshot
+from services.normalize import fold_collation
+from services.sqlite_dictionary import SqliteDictionary
+
+
+def word(entry_id, kanji, kana, gloss, common=False):
+    return {
+        "id": entry_id,
+        "kanji": [{"common": common, "text": kanji, "tags": []}] if kanji else [],
+        "kana": [{"common": common, "text": kana, "tags": [], "appliesToKanji": ["*"]}],
+        "sense": [{"gloss": [{"lang": "eng", "text": gloss}], "partOfSpeech": ["n"]}],
+    }
+
+
+WORDS = [
+    word("10", None, "ばし", "pier"),
+    word("20", "箸", "はし", "chopsticks"),
+    word("30", None, "はし", "edge"),
+    word("40", None, "カフェオレ", "café au lait"),
+    word("50", None, "カフェテリア", "cafeteria"),
+    word("60", "客", "きゃく", "guest", common=True),
+    word("70", "規約", "きやく", "agreement"),
+]
+
+EXPECTED = {
+    # All three readings equal ハシ: 箸 has the shortest headword; はし and ばし tie
+    # on primary_headword under the collation, so the lower id comes first.
+    "ハシ": ["20", "10", "30"],
+    "はし": ["20", "10", "30"],
+    # きゃく is an exact reading match too, and the common entry.
+    "きやく": ["60", "70"],
+    # café au lait has cafe as a whole gloss word.
+    "cafe": ["40", "50"],
+    "CAFÉ": ["40", "50"],
+}
+
+
+@pytest.fixture(scope="module")
+def engines(tmp_path_factory):
+    path = tmp_path_factory.mktemp("collation")
+    jmdict = str(path / "jmdict.json")
+    with open(jmdict, "w", encoding="utf-8") as f:
+        json.dump({"version": "test", "words": WORDS}, f, ensure_ascii=False)
+
+    index = index_from_rows(import_task._build_rows(list(import_task.iter_word_texts(jmdict))))
+    write_snapshot(index, str(path / "dictionary.snapshot"), "1")
+    snapshot = Snapshot(str(path / "dictionary.snapshot")).index()
+    import_task.run_sqlite_export(jmdict, str(path / "jmdict.sqlite3"))
+    store = SqliteDictionary(str(path / "jmdict.sqlite3"))
+    return {
+        "memory": lambda keyword: [index.entry_ids[n] for n in index.rank(keyword, 10)],
+        "snapshot": lambda keyword: [snapshot.entry_ids[n] for n in snapshot.rank(keyword, 10)],
+        "sqlite": lambda keyword: store.rank(keyword, 10),
+    }
+
+
+@pytest.mark.parametrize("engine", ["memory", "snapshot", "sqlite"])
+@pytest.mark.parametrize("keyword", list(EXPECTED))
+def test_rank_follows_the_collation(engines, engine, keyword):
+    assert engines[engine](keyword) == EXPECTED[keyword]
+
+
+def test_fold_collation():
+    assert fold_collation("ば") == fold_collation("パ") == fold_collation("ﾊﾟ") == "は"
+    assert fold_collation("キャク") == "きやく"
+    assert fold_collation("Café") == fold_collation("ＣＡＦＥ") == "cafe"
+    assert fold_collation("食べる") == "食へる"
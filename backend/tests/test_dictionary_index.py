@@ -0,0 +1,109 @@
+# backend/tests/test_dictionary_index.py
+import math
+import re
+
+from services.dictionary_index import FT_MAX_TOKEN_SIZE, FT_MIN_TOKEN_SIZE, FT_STOPWORDS, _TOKEN_RE
+from services.normalize import fold_collation, normalize_reading, query_readings
+
+
+class Scan:
+    """The ORDER BY of services.search._SEARCH_SQL evaluated entry by entry on the
+    importer rows, without any of the index structures: what DictionaryIndex.rank
+    has to reproduce. Columns compare as fold_collation() keys (utf8mb4_unicode_ci)."""
+
+    def __init__(self, index, rows):
+        self.index = index
+        number = {entry_id: n for n, entry_id in enumerate(index.entry_ids)}
+        self.kanji = [[] for _ in range(len(index))]
+        self.readings = [[] for _ in range(len(index))]
+        self.norms = [[] for _ in range(len(index))]
+        for entry_id, text, _ in rows.kanji:
+            self.kanji[number[entry_id]].append(fold_collation(text))
+        for entry_id, text, _ in rows.reading:
+            self.readings[number[entry_id]].append(fold_collation(text))
+            self.norms[number[entry_id]].append(normalize_reading(text))
+        self.glosses = [""] * len(index)
+        for entry_id, gloss_text in rows.defs:
+            self.glosses[number[entry_id]] = fold_collation(gloss_text)
+        self.tokens = [_TOKEN_RE.findall(gloss) for gloss in self.glosses]
+        self.df = {}
+        for tokens in self.tokens:
+            for term in set(tokens):
+                self.df[term] = self.df.get(term, 0) + 1
+
+    def rank(self, keyword, limit):
+        index = self.index
+        kw = fold_collation(keyword)
+        kana_norm, romaji_kana = query_readings(keyword)
+        ft_terms = [
+            term for term in set(_TOKEN_RE.findall(kw))
+            if FT_MIN_TOKEN_SIZE <= len(term) <= FT_MAX_TOKEN_SIZE and term not in FT_STOPWORDS and term in self.df
+        ]
+        exact_word = re.compile(r"(^|[^0-9a-z])" + re.escape(kw) + r"([^0-9a-z]|$)")
+
+        keys = []
+        for n in range(len(index)):
+            k_forms, r_forms, norms = self.kanji[n], self.readings[n], self.norms[n]
+            gloss = self.glosses[n]
+            ft = sum(self.tokens[n].count(t) * math.log10(len(index) / self.df[t]) ** 2 for t in ft_terms)
+            flags = (
+                kw in k_forms,
+                kw in r_forms or bool(kana_norm and kana_norm in norms),
+                any(kw.startswith(f) for f in k_forms),
+                any(kw.startswith(f) for f in r_forms),
+                any(f.startswith(kw) for f in k_forms),
+                any(f.startswith(kw) for f in r_forms)
+                or bool(kana_norm and any(f.startswith(kana_norm) for f in norms)),
+            )
+            romaji = (bool(romaji_kana and romaji_kana in norms),
+                      bool(romaji_kana and any(f.startswith(romaji_kana) for f in norms)))
+            like = kw in gloss
+            if not (any(flags) or any(romaji) or like or ft):
+                continue
+            headword = index.headwords[n]
+            keys.append((
+                *(not flag for flag in flags),
+                -index.is_common[n],
+                exact_word.search(gloss) is None,
+                not gloss.startswith(kw),
+                *(not flag for flag in romaji),
+                -ft,
+                not like,
+                len(headword),
+                fold_collation(headword),
+                n,
+            ))
+        return [key[-1] for key in sorted(keys)[:limit]]
+
+
+def test_rank_matches_full_scan(dictionary_index, dictionary_rows, query_keywords):
+    scan = Scan(dictionary_index, dictionary_rows)
+    # The scan is slow; every third keyword covers each kind of query.
+    for keyword in query_keywords[::3]:
+        assert dictionary_index.rank(keyword, 20) == scan.rank(keyword, 20), keyword
+
+
+def test_exact_headword_ranks_first(dictionary_index):
+    n = dictionary_index.rank("日本", 5)[0]
+    assert dictionary_index.headwords[n] == "日本"
+    assert dictionary_index.search("日本", 1)[0]["id"] == dictionary_index.entry_ids[n]
+
+
+def test_katakana_and_romaji_find_hiragana_readings(dictionary_index):
+    n = dictionary_index.rank("たべる", 1)[0]
+    assert dictionary_index.rank("タベル", 1) == [n]
+    assert dictionary_index.rank("ﾀﾍﾞﾙ", 1) == [n]
+    assert n in dictionary_index.rank("taberu", 10)
+
+
+def test_unknown_id_has_no_number(dictionary_index):
+    assert dictionary_index.find_number(dictionary_index.entry_ids[0]) == 0
+    assert dictionary_index.find_number("no-such-entry") is None
+
+
+def test_prefix_entries_longest_first(dictionary_index):
+    matches = dictionary_index.prefix_entries("食べ物を食べる")
+    lengths = [length for length, _ in matches]
+    assert lengths == sorted(lengths, reverse=True)
+    assert len({n for _, n in matches}) == len(matches)
+    assert "食べ物" in {dictionary_index.headwords[n] for _, n in matches}
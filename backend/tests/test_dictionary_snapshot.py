@@ -0,0 +1,84 @@
+# backend/tests/test_dictionary_snapshot.py
+import pytest
+
+import services.dictionary_snapshot as dictionary_snapshot
+from db_config import DICTIONARY_VERSION_KEY, SNAPSHOT_CHECKSUM_KEY
+from services.dictionary_snapshot import Snapshot, write_snapshot
+
+
+@pytest.fixture(scope="module")
+def snapshot_file(tmp_path_factory, dictionary_index):
+    path = str(tmp_path_factory.mktemp("snapshot") / "dictionary.snapshot")
+    checksum = write_snapshot(dictionary_index, path, "7")
+    return path, checksum
+
+
+@pytest.fixture(scope="module")
+def mapped(snapshot_file):
+    return Snapshot(snapshot_file[0]).index()
+
+
+def test_header(snapshot_file, dictionary_index):
+    path, checksum = snapshot_file
+    snapshot = Snapshot(path)
+    assert snapshot.dictionary_version == "7"
+    assert snapshot.checksum == checksum
+    assert snapshot.header["entry_count"] == len(dictionary_index)
+    assert snapshot.verify()
+
+
+def test_round_trip(mapped, dictionary_index):
+    assert list(mapped.entry_ids) == list(dictionary_index.entry_ids)
+    assert list(mapped.headwords) == list(dictionary_index.headwords)
+    assert bytes(mapped.is_common) == dictionary_index.is_common
+    assert list(mapped.kanji_forms) == list(dictionary_index.kanji_forms)
+    assert list(mapped.reading_entries) == list(dictionary_index.reading_entries)
+    assert list(mapped.gloss_terms) == list(dictionary_index.gloss_terms)
+    assert list(mapped.gloss_tf) == list(dictionary_index.gloss_tf)
+    assert mapped.word(10) == dictionary_index.word(10)
+    for ch in ["食", "日", "無い"]:
+        assert list(mapped.char_entries.get(ch, ())) == list(dictionary_index.char_entries.get(ch, ()))
+
+
+def test_same_ranking_as_dictionary_index(mapped, dictionary_index, query_keywords):
+    for keyword in query_keywords:
+        assert mapped.rank(keyword, 20) == dictionary_index.rank(keyword, 20), keyword
+    for text in ["食べ物を", "日本"]:
+        assert mapped.prefix_entries(text) == dictionary_index.prefix_entries(text)
+    assert mapped.contains_chars("食") == dictionary_index.contains_chars("食")
+
+
+def test_terms_containing(mapped, dictionary_index):
+    for needle in ["ea", "tion", "x", "zzz", "a"]:
+        expected = [t for t, term in enumerate(dictionary_index.gloss_terms) if needle in term]
+        assert mapped.gloss_terms.indices_containing(needle) == expected
+
+
+def test_corrupt_file_fails_verify(tmp_path, dictionary_index):
+    path = str(tmp_path / "dictionary.snapshot")
+    write_snapshot(dictionary_index, path, "7")
+    with open(path, "r+b") as f:
+        f.seek(-64, 2)
+        f.write(b"\xff" * 8)
+    assert not Snapshot(path).verify()
+
+
+def test_not_a_snapshot(tmp_path):
+    path = tmp_path / "dictionary.snapshot"
+    path.write_bytes(b"not a snapshot at all")
+    with pytest.raises(ValueError):
+        Snapshot(str(path))
+
+
+def test_loaded_only_when_current(snapshot_file, monkeypatch):
+    path, checksum = snapshot_file
+    meta = {DICTIONARY_VERSION_KEY: "7", SNAPSHOT_CHECKSUM_KEY: checksum}
+    monkeypatch.setattr(dictionary_snapshot, "get_dictionary_meta", meta.get)
+    assert dictionary_snapshot.load_current_snapshot(path) is not None
+
+    meta[DICTIONARY_VERSION_KEY] = "8"
+    assert dictionary_snapshot.load_current_snapshot(path) is None
+    meta[DICTIONARY_VERSION_KEY] = "7"
+    meta[SNAPSHOT_CHECKSUM_KEY] = "0" * 40
+    assert dictionary_snapshot.load_current_snapshot(path) is None
+    assert dictionary_snapshot.load_current_snapshot(path + ".missing") is None
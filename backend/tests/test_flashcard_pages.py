@@ -0,0 +1,193 @@
+# backend/tests/test_flashcard_pages.py
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import mysql.connector
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import routers.lists as lists_router
+import services.flashcard_service as flashcard_service
+from services.flashcard_service import (
+    _decode_list_cursor,
+    _encode_list_cursor,
+    _list_page,
+    _list_page_query,
+    _row_to_list_item,
+)
+
+START = datetime(2026, 3, 1, 12, 0, 0)
+WORD = {
+    "id": "1358280", "kanji": "食べる", "kana": "たべる", "is_common": True,
+    "senses": [{"glosses": ["to eat"], "parts_of_speech": ["v1"]}, {"glosses": ["to live on"]}],
+}
+
+
+def card_row(flashcard_id, created_at, word_data=True):
+    row = (flashcard_id, 1, "1358280", None, 0, 0, 2.5, 0, 0, START, None, created_at)
+    return row + ((json.dumps(WORD), None) if word_data else ())
+
+
+# Cards created in bursts: several share a created_at, so the id breaks ties.
+ROWS = [card_row(i, START + timedelta(seconds=i // 4)) for i in range(1, 24)]
+
+
+def fetch(rows, cursor, limit):
+    """What MySQL returns for _list_page_query: newest first, after the cursor, limit + 1."""
+    sql, params = _list_page_query(1, limit, cursor, "full")
+    ordered = sorted(rows, key=lambda row: (row[11], row[0]), reverse=True)
+    if cursor:
+        created_at, flashcard_id = _decode_list_cursor(cursor)
+        assert params[1:4] == (created_at, created_at, flashcard_id)
+        ordered = [row for row in ordered if (row[11], row[0]) < (created_at, flashcard_id)]
+    assert params[-1] == limit + 1
+    return ordered[:params[-1]]
+
+
+def test_list_cursor_round_trip():
+    cursor = _encode_list_cursor(datetime(2026, 3, 1, 12, 0, 5, 123456), 42)
+    assert "=" not in cursor
+    assert _decode_list_cursor(cursor) == (datetime(2026, 3, 1, 12, 0, 5, 123456), 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "garbage!", "e30", "eyJjIjogIngiLCAiaWQiOiAxfQ"])
+def test_invalid_list_cursor(cursor):
+    with pytest.raises(ValueError):
+        _decode_list_cursor(cursor)
+
+
+@pytest.mark.parametrize("limit", [1, 4, 5, 23, 100])
+def test_pages_cover_the_list_once(limit):
+    seen = []
+    cursor = None
+    while True:
+        page = _list_page(fetch(ROWS, cursor, limit), limit, "full")
+        assert len(page["items"]) <= limit
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == sorted((row[0] for row in ROWS), reverse=True)
+
+
+def test_word_data_modes():
+    full = _row_to_list_item(ROWS[0], "full")
+    assert full["word_data"] == WORD
+    assert full["created_at"] == ROWS[0][11]
+    assert _row_to_list_item(ROWS[0], "slim")["word_data"] == {
+        "kanji": "食べる", "kana": "たべる", "is_common": True, "gloss": "to eat",
+    }
+    none = _row_to_list_item(card_row(1, START, word_data=False), "none")
+    assert "word_data" not in none
+    with pytest.raises(ValueError):
+        _list_page_query(1, 10, None, "everything")
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    async def execute(self, sql, params=()):
+        pass
+
+    async def fetchmany(self, size):
+        chunk, self.rows = self.rows[:size], self.rows[size:]
+        return chunk
+
+    async def fetchall(self):
+        return await self.fetchmany(len(self.rows))
+
+    async def close(self):
+        pass
+
+
+def _client(monkeypatch, connection):
+    monkeypatch.setattr(flashcard_service, "async_connection", connection)
+    app = FastAPI()
+    app.include_router(lists_router.router)
+    return TestClient(app)
+
+
+def test_stream_is_ndjson(monkeypatch):
+    monkeypatch.setattr(flashcard_service, "STREAM_FETCH_SIZE", 5)
+
+    class Connection:
+        async def cursor(self):
+            return _Cursor(ROWS)
+
+    @asynccontextmanager
+    async def connection():
+        yield Connection()
+
+    response = _client(monkeypatch, connection).get("/api/lists/1/flashcards/stream?word_data=slim")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == [row[0] for row in ROWS]
+    assert lines[0]["word_data"]["gloss"] == "to eat"
+
+
+def test_stream_of_empty_list(monkeypatch):
+    class Connection:
+        async def cursor(self):
+            return _Cursor([])
+
+    @asynccontextmanager
+    async def connection():
+        yield Connection()
+
+    response = _client(monkeypatch, connection).get("/api/lists/1/flashcards/stream")
+    assert response.status_code == 200
+    assert response.text == ""
+
+
+def test_stream_connection_error_is_503(monkeypatch):
+    @asynccontextmanager
+    async def connection():
+        raise mysql.connector.errors.InterfaceError("server has gone away")
+        yield
+
+    response = _client(monkeypatch, connection).get("/api/lists/1/flashcards/stream")
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Database connection error"}
+
+
+def test_unsent_stream_holds_no_connection(monkeypatch):
+    # The route probes the database, then returns a response that opens its own
+    # connection only when iterated; one that is never sent must not keep one checked out.
+    checked_out = []
+
+    class Connection:
+        async def cursor(self):
+            return _Cursor(ROWS)
+
+    @asynccontextmanager
+    async def connection():
+        checked_out.append(1)
+        try:
+            yield Connection()
+        finally:
+            checked_out.pop()
+
+    monkeypatch.setattr(flashcard_service, "async_connection", connection)
+
+    async def respond():
+        response = await lists_router.api_stream_flashcards(1, "slim")
+        return len(checked_out), response
+
+    held, response = asyncio.run(respond())
+    assert held == 0
+
+    async def first_chunk():
+        chunk = await response.body_iterator.__anext__()
+        held = len(checked_out)
+        await response.body_iterator.aclose()
+        return chunk, held
+
+    chunk, held = asyncio.run(first_chunk())
+    assert json.loads(chunk.splitlines()[0])["id"] == ROWS[0][0]
+    assert held == 1
+    assert checked_out == []
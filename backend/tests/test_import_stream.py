@@ -0,0 +1,59 @@
+# backend/tests/test_import_stream.py
+import json
+
+import pytest
+
+from import_task import _chunked, iter_word_texts
+
+WORDS = [
+    {"id": "1", "kanji": [{"text": "食べる", "common": True}], "sense": [{"gloss": [{"text": "to eat \"food\""}]}]},
+    {"id": "2", "kanji": [], "kana": [{"text": "ある"}], "n": 12345, "ok": True, "none": None},
+    {"id": "3", "sense": [{"gloss": [{"text": "a, b; c ] } ["}]}]},
+]
+
+
+def write_jmdict(path, data, indent=None):
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=indent), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_chars", [1, 2, 7, 64, 1 << 20])
+def test_yields_each_word_across_chunk_boundaries(tmp_path, chunk_chars):
+    path = write_jmdict(tmp_path / "jm.json", {"version": "3.6.1", "tags": {"n": "noun"}, "words": WORDS})
+    texts = list(iter_word_texts(path, chunk_chars=chunk_chars))
+    assert [json.loads(text) for text in texts] == WORDS
+
+
+def test_words_before_and_after_other_keys(tmp_path):
+    data = {"words": WORDS[:1], "tags": {"v1": "verb"}, "dictDate": "2024-01-01"}
+    path = write_jmdict(tmp_path / "jm.json", data, indent=2)
+    assert [json.loads(text) for text in iter_word_texts(path, chunk_chars=5)] == WORDS[:1]
+
+
+def test_number_cut_at_chunk_boundary(tmp_path):
+    path = tmp_path / "jm.json"
+    path.write_text('{"words": [123456789, {"id": "x"}]}', encoding="utf-8")
+    assert list(iter_word_texts(str(path), chunk_chars=14)) == ["123456789", '{"id": "x"}']
+
+
+def test_empty_words(tmp_path):
+    path = write_jmdict(tmp_path / "jm.json", {"words": []})
+    assert list(iter_word_texts(path)) == []
+
+
+def test_malformed_file(tmp_path):
+    path = tmp_path / "jm.json"
+    path.write_text('["words"]', encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_word_texts(str(path)))
+
+
+def test_matches_json_load(jmdict_path):
+    with open(jmdict_path, encoding="utf-8") as f:
+        words = json.load(f)["words"]
+    assert [json.loads(text) for text in iter_word_texts(jmdict_path, chunk_chars=4096)] == words
+
+
+def test_chunked():
+    assert list(_chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(_chunked([], 3)) == []
@@ -0,0 +1,71 @@
+# backend/tests/test_normalize.py
+import pytest
+
+from services.normalize import normalize_reading, query_readings, romaji_to_hiragana
+
+
+@pytest.mark.parametrize("romaji, kana", [
+    ("taberu", "たべる"),
+    ("TABERU", "たべる"),
+    ("ｔａｂｅｒｕ", "たべる"),
+    ("kitte", "きって"),
+    ("matcha", "まっちゃ"),
+    ("shinbun", "しんぶん"),
+    ("shimbun", "しんぶん"),
+    ("konnichiha", "こんにちは"),
+    ("kin'en", "きんえん"),
+    ("kinnen", "きんねん"),
+    ("hon", "ほん"),
+    ("sinbun", "しんぶん"),
+    ("kyou", "きょう"),
+    ("tōkyō", "とうきょう"),
+    ("tôkyô", "とうきょう"),
+    ("ōkii", "おうきい"),
+    ("chotto matte", "ちょっとまって"),
+    ("ko-hi-", "こうひい"),
+    ("konpyu-ta-", "こんぴゅうたあ"),
+    ("sewa-suru", "せわする"),
+    ("koshō-suru", "こしょうする"),
+    ("chekku-suru", "ちぇっくする"),
+    ("zu", "ず"),
+    ("du", "ず"),
+])
+def test_romaji_to_hiragana(romaji, kana):
+    assert romaji_to_hiragana(romaji) == kana
+
+
+@pytest.mark.parametrize("text", ["", "eat!", "xyz", "たべる", "q", "123"])
+def test_not_romaji(text):
+    assert romaji_to_hiragana(text) is None
+
+
+def test_matches_the_reading_key():
+    # Both sides of the reading_norm lookup fold the same way.
+    for romaji, reading in [("kōhī", "コーヒー"), ("ra-men", "ラーメン"), ("oosaka", "おおさか")]:
+        assert romaji_to_hiragana(romaji) == normalize_reading(reading)
+
+
+def test_vocab_romaji_reads_as_furigana(vocab):
+    misses = []
+    for item in vocab:
+        reading = item["furigana"] or item["word"]
+        expected = {normalize_reading(r.replace("・", "")) for r in reading.split("/")}
+        if romaji_to_hiragana(item["romaji"]) not in expected:
+            misses.append(item["romaji"])
+    # Items with several spellings ("nan / nani") or notes in place of a word; keep them rare.
+    assert len(misses) < 0.01 * len(vocab), misses[:20]
+    assert not [m for m in misses if m.endswith("-suru")]
+
+
+def test_normalize_reading():
+    assert normalize_reading("タベル") == "たべる"
+    assert normalize_reading("ﾀﾍﾞﾙ") == "たべる"
+    assert normalize_reading("コーヒー") == normalize_reading("こうひい")
+    assert normalize_reading("ぢ") == normalize_reading("じ")
+
+
+def test_query_readings():
+    assert query_readings("タベル") == ("たべる", None)
+    assert query_readings("taberu") == (None, "たべる")
+    assert query_readings("食べる") == (None, None)
+    assert query_readings("eat!") == (None, None)
@@ -0,0 +1,159 @@
+# backend/tests/test_schedule_review.py
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+import services.flashcard_service as flashcard_service
+from db_config import MEMORIZED_INTERVAL_DAYS, MEMORIZED_REPETITIONS, STUDY_LOG_UPSERT_SQL
+from services.flashcard_service import (
+    DEFAULT_EASE,
+    MAX_INTERVAL_DAYS,
+    MIN_EASE,
+    RELEARN_DELAY,
+    schedule_review,
+)
+from services.study_log_buffer import StudyLogBuffer, _upsert_query
+
+NOW = datetime(2026, 1, 1, 9, 30)
+DB_NOW = datetime(2026, 1, 1, 0, 30)
+NEW_CARD = {"interval_days": 0, "ease_factor": DEFAULT_EASE, "repetitions": 0, "lapses": 0}
+
+
+def review(state, *grades):
+    for grade in grades:
+        state = schedule_review(state, grade, NOW)
+    return state
+
+
+def test_passing_intervals():
+    first = review(NEW_CARD, 4)
+    assert (first["interval_days"], first["repetitions"]) == (1, 1)
+    assert first["due_at"] == NOW + timedelta(days=1)
+    assert first["last_reviewed_at"] == NOW
+    assert first["is_memorized"]
+    assert review(NEW_CARD, 4, 4)["interval_days"] == 6
+    assert review(NEW_CARD, 4, 4, 4)["interval_days"] == 15
+
+
+def test_ease_follows_the_grade():
+    assert review(NEW_CARD, 5)["ease_factor"] == 2.6
+    assert review(NEW_CARD, 4)["ease_factor"] == 2.5
+    assert review(NEW_CARD, 3)["ease_factor"] == 2.36
+    assert review(NEW_CARD, 0)["ease_factor"] == 1.7
+
+
+def test_ease_never_below_minimum():
+    state = review(NEW_CARD, 0, 0, 0, 0, 0)
+    assert state["ease_factor"] == MIN_EASE
+
+
+def test_fail_restarts_and_counts_a_lapse():
+    learned = review(NEW_CARD, 4, 4, 4)
+    failed = schedule_review(learned, 2, NOW)
+    assert failed["interval_days"] == 0
+    assert failed["repetitions"] == 0
+    assert failed["lapses"] == 1
+    assert failed["due_at"] == NOW + RELEARN_DELAY
+    assert not failed["is_memorized"]
+    # Failing a card that was never learned is not a lapse.
+    assert review(NEW_CARD, 1)["lapses"] == 0
+    # Relearning starts over at one day.
+    assert schedule_review(failed, 4, NOW)["interval_days"] == 1
+
+
+def test_interval_always_grows_and_is_capped():
+    slow = {"interval_days": 10, "ease_factor": MIN_EASE, "repetitions": 5, "lapses": 0}
+    assert schedule_review(slow, 3, NOW)["interval_days"] > 10
+    huge = {"interval_days": MAX_INTERVAL_DAYS, "ease_factor": 2.5, "repetitions": 9, "lapses": 0}
+    assert schedule_review(huge, 5, NOW)["interval_days"] == MAX_INTERVAL_DAYS
+
+
+@pytest.mark.parametrize("grade, clamped", [(-3, 0), (9, 5)])
+def test_grade_is_clamped(grade, clamped):
+    assert schedule_review(NEW_CARD, grade, NOW) == schedule_review(NEW_CARD, clamped, NOW)
+
+
+def test_missing_state_is_a_new_card():
+    assert schedule_review({}, 4, NOW) == schedule_review(NEW_CARD, 4, NOW)
+    # ease_factor comes back from MySQL as a Decimal.
+    assert schedule_review({**NEW_CARD, "ease_factor": Decimal("2.50")}, 4, NOW) == schedule_review(NEW_CARD, 4, NOW)
+
+
+def test_migration_state_of_memorized_cards():
+    # setup_database gives already-memorized cards the state of three passing reviews.
+    state = review(NEW_CARD, 4, 4, 4)
+    assert (state["interval_days"], state["repetitions"]) == (MEMORIZED_INTERVAL_DAYS, MEMORIZED_REPETITIONS)
+
+
+class _ReviewCursor:
+    def __init__(self, executed):
+        self.executed = executed
+        self.rows = []
+
+    async def execute(self, sql, params=()):
+        self.executed.append(sql)
+        if "FOR UPDATE" in sql:
+            self.rows = [(7, 0, Decimal("2.50"), 0, 0, DB_NOW)]
+
+    async def fetchall(self):
+        return self.rows
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def async_review(monkeypatch):
+    executed = []
+
+    class Connection:
+        async def cursor(self):
+            return _ReviewCursor(executed)
+
+        async def commit(self):
+            pass
+
+    @asynccontextmanager
+    async def connection():
+        yield Connection()
+
+    buffer = StudyLogBuffer(interval=5)
+    monkeypatch.setattr(flashcard_service, "async_connection", connection)
+    monkeypatch.setattr(flashcard_service, "get_study_log_buffer", lambda: buffer)
+
+    def run(now=NOW):
+        result = asyncio.run(flashcard_service.review_flashcards_async([(7, 4)], now=now))
+        assert [card["id"] for card in result["results"]] == [7]
+        return executed, buffer, result["results"][0]
+    return run
+
+
+def test_async_review_without_a_flusher_writes_the_study_log(async_review):
+    # The buffer is enabled but nothing would ever flush it.
+    executed, buffer, _ = async_review()
+    assert STUDY_LOG_UPSERT_SQL in executed
+    assert buffer.pending() == 0
+
+
+def test_async_review_buffers_the_study_log_while_the_flusher_runs(async_review, monkeypatch):
+    monkeypatch.setattr(StudyLogBuffer, "running", True)
+    executed, buffer, _ = async_review()
+    assert STUDY_LOG_UPSERT_SQL not in executed
+    assert buffer.pending() == 1
+
+
+def test_flush_upserts_every_day_in_one_statement():
+    sql, params = _upsert_query([(date(2026, 1, 1), 3), (date(2026, 1, 2), 1)])
+    assert sql == STUDY_LOG_UPSERT_SQL.replace("VALUES (%s, %s)", "VALUES (%s, %s), (%s, %s)")
+    assert params == [date(2026, 1, 1), 3, date(2026, 1, 2), 1]
+
+
+def test_reviews_are_scheduled_on_the_database_clock(async_review):
+    # due_at is compared with NOW() by /due, so it is computed from the time MySQL
+    # returned with the locked states, not from the app server's clock.
+    _, _, card = async_review(now=None)
+    assert card["last_reviewed_at"] == DB_NOW
+    assert card["due_at"] == DB_NOW + timedelta(days=1)
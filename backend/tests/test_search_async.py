@@ -0,0 +1,112 @@
+# backend/tests/test_search_async.py
+import asyncio
+import threading
+
+import pytest
+
+import import_task
+import services.dictionary_index as dictionary_index_module
+import services.search as search
+from services.sqlite_dictionary import SqliteDictionary
+
+
+class _NoCache:
+    enabled = False
+
+
+class _Recorder:
+    """Wraps an index or SQLite store and records the threads its methods were called on."""
+
+    def __init__(self, index):
+        self.index = index
+        self.threads = set()
+
+    def __getattr__(self, name):
+        attr = getattr(self.index, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            self.threads.add(threading.get_ident())
+            return attr(*args, **kwargs)
+        return call
+
+
+@pytest.fixture
+def memory_engine(monkeypatch, dictionary_index):
+    recorder = _Recorder(dictionary_index)
+    monkeypatch.setattr(search, "SEARCH_ENGINE", "memory")
+    monkeypatch.setattr(search, "get_search_cache", _NoCache)
+    monkeypatch.setattr(search, "get_ranking_cache", _NoCache)
+    monkeypatch.setattr(search, "get_dictionary_index", lambda: recorder)
+    monkeypatch.setattr(dictionary_index_module, "_index", recorder)
+    return recorder
+
+
+@pytest.fixture(scope="module")
+def sqlite_store(tmp_path_factory, jmdict_path):
+    path = str(tmp_path_factory.mktemp("sqlite") / "jmdict.sqlite3")
+    import_task.run_sqlite_export(jmdict_path, path, batch_size=500)
+    return SqliteDictionary(path)
+
+
+@pytest.fixture
+def sqlite_engine(monkeypatch, sqlite_store):
+    recorder = _Recorder(sqlite_store)
+    monkeypatch.setattr(search, "SEARCH_ENGINE", "sqlite")
+    monkeypatch.setattr(search, "get_search_cache", _NoCache)
+    monkeypatch.setattr(search, "get_ranking_cache", _NoCache)
+    monkeypatch.setattr(search, "get_sqlite_dictionary", lambda: recorder)
+    return recorder
+
+
+def run_on_loop(coroutine):
+    """Result of coroutine, and the thread the event loop ran on."""
+    async def main():
+        return await coroutine, threading.get_ident()
+    return asyncio.run(main())
+
+
+ASYNC_CALLS = [
+    lambda: search.search_entries_async("たべる", 10),
+    lambda: search.search_entries_batch_async([("食べる", 5), ("water", 5)]),
+    lambda: search.search_page_async("eat", 10),
+    lambda: search.find_prefix_words_async("食べ物を", 5),
+    lambda: search.search_contains_async("食", 5),
+]
+
+
+@pytest.mark.parametrize("call", ASYNC_CALLS)
+def test_index_work_runs_off_the_event_loop(memory_engine, call):
+    result, loop_thread = run_on_loop(call())
+    assert result
+    assert memory_engine.threads
+    assert loop_thread not in memory_engine.threads
+
+
+@pytest.mark.parametrize("call", ASYNC_CALLS)
+def test_sqlite_queries_run_off_the_event_loop(sqlite_engine, call):
+    result, loop_thread = run_on_loop(call())
+    assert result
+    assert sqlite_engine.threads
+    assert loop_thread not in sqlite_engine.threads
+
+
+def test_async_results_match_sync(memory_engine):
+    assert run_on_loop(search.search_entries_async("たべる", 10))[0] == search.search_entries("たべる", 10)
+    assert run_on_loop(search.search_page_async("eat", 5))[0] == search.search_page("eat", 5)
+
+
+def test_bm25_scoring_runs_off_the_event_loop(monkeypatch):
+    threads = set()
+
+    class Index:
+        def rank(self, keyword, limit):
+            threads.add(threading.get_ident())
+            return ["1"]
+
+    monkeypatch.setattr(search, "SEARCH_ENGLISH", "bm25")
+    monkeypatch.setattr(search, "get_bm25_index", Index)
+    ranked, loop_thread = run_on_loop(search._english_ranked_ids_async("water", 10))
+    assert ranked == ["1"]
+    assert threads and loop_thread not in threads
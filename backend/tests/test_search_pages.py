@@ -0,0 +1,62 @@
+# backend/tests/test_search_pages.py
+import pytest
+
+from services.search import _decode_cursor, _encode_cursor, _page_result, _page_start
+
+RANKED = [str(1000 + n) for n in range(25)]
+
+
+def test_cursor_round_trip():
+    cursor = _encode_cursor("Taberu", 10, "1009")
+    assert "=" not in cursor
+    assert _decode_cursor(cursor) == {"q": "taberu", "n": 10, "id": "1009"}
+
+
+def test_cursor_round_trip_non_ascii_keyword():
+    assert _decode_cursor(_encode_cursor("食べる", 3, "42"))["q"] == "食べる"
+
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", "e30", "WzFd", "é"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        _decode_cursor(cursor)
+
+
+def test_pages_cover_the_ranking_once():
+    seen = []
+    cursor = None
+    while True:
+        start = _page_start(RANKED, "eat", 0, cursor)
+        page, cursor = _page_result(RANKED, "eat", start, 10)
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert seen == RANKED
+
+
+def test_offset_without_cursor():
+    assert _page_start(RANKED, "eat", 5, None) == 5
+    assert _page_start(RANKED, "eat", -3, None) == 0
+
+
+def test_cursor_of_another_keyword():
+    cursor = _encode_cursor("drink", 10, RANKED[9])
+    with pytest.raises(ValueError):
+        _page_start(RANKED, "eat", 0, cursor)
+
+
+def test_cursor_resumes_after_last_seen_entry_when_ranking_changed():
+    cursor = _encode_cursor("eat", 10, RANKED[9])
+    # Two entries inserted ahead of it: continue after the entry, not at position 10.
+    reranked = ["new1", "new2"] + RANKED
+    assert _page_start(reranked, "eat", 0, cursor) == 12
+    # The entry is gone: same position, clamped to the ranking.
+    without = RANKED[:9] + RANKED[10:]
+    assert _page_start(without, "eat", 0, cursor) == 10
+    assert _page_start(RANKED[:4], "eat", 0, cursor) == 4
+
+
+def test_last_page_has_no_cursor():
+    page, cursor = _page_result(RANKED, "eat", 20, 10)
+    assert page == RANKED[20:]
+    assert cursor is None
@@ -0,0 +1,123 @@
+# backend/tests/test_seed_jlpt.py
+import pytest
+
+from seed_jlpt import _FormIndex, _forms, word_forms
+from services.flashcard_service import _bulk_added_query, _classify_bulk, _split_inserted, _unique_ids
+
+
+@pytest.mark.parametrize("text, forms", [
+    ("食べる", ["食べる"]),
+    ("アイデア / アイディア", ["アイデア", "アイディア"]),
+    ("お・金持ち", ["お金持ち", "金持ち"]),
+    ("ああ（感）", ["ああ"]),
+    ("やる（=あげる）", ["やる"]),
+    ("千（1000", ["千"]),
+    ("", []),
+    (None, []),
+])
+def test_forms(text, forms):
+    assert _forms(text) == forms
+
+
+def test_forms_keep_parenthesized_okurigana():
+    assert _forms("あたたか(い)", keep_parenthesized=True) == ["あたたか", "あたたかい"]
+    assert _forms("せわ・する", keep_parenthesized=True) == ["せわする", "する"]
+
+
+def test_word_forms():
+    assert word_forms({"word": "食べる", "furigana": "たべる"}) == (["食べる"], ["たべる"])
+    # Kana-only words: the word is the reading, whatever the furigana field says.
+    assert word_forms({"word": "けれど", "furigana": "（接）"}) == ([], ["けれど"])
+    assert word_forms({"word": "ミュージック", "furigana": ""}) == ([], ["ミュージック"])
+
+
+def form_index(rows):
+    index = _FormIndex()
+    for row in rows:
+        index.add(*row)
+    return index
+
+
+def test_resolve_prefers_the_entry_with_the_reading():
+    index = form_index([
+        ("k", "生", "10", 1, "生"),
+        ("k", "生", "20", 0, "生"),
+        ("r", "なま", "20", 0, "生"),
+        ("r", "せい", "10", 0, "生"),
+    ])
+    assert index.resolve(["生"], ["なま"]) == "20"
+    assert index.resolve(["生"], ["せい"]) == "10"
+    # Unknown reading: the common entry, then the lowest id.
+    assert index.resolve(["生"], ["うまれ"]) == "10"
+
+
+def test_resolve_kana_word_to_the_kana_entry():
+    index = form_index([
+        ("r", "けれど", "30", 0, "けれど"),
+        ("r", "けれど", "5", 0, "希"),
+    ])
+    assert index.resolve([], ["けれど"]) == "30"
+
+
+def test_resolve_katakana_reading_through_the_normalized_key():
+    index = form_index([("r", "タバコ", "40", 0, "タバコ")])
+    assert index.resolve([], ["たばこ"]) == "40"
+    assert index.resolve([], ["さけ"]) is None
+    assert index.resolve(["酒"], ["さけ"]) is None
+
+
+def test_resolve_fixture_vocab(dictionary_rows, vocab):
+    # The fixture stores each vocab item's word and furigana verbatim, so single-form
+    # items must resolve to an entry spelled the same way.
+    headwords = {entry_id: headword for entry_id, headword, *_ in dictionary_rows.entries}
+    index = _FormIndex()
+    for entry_id, text, is_common in dictionary_rows.kanji:
+        index.add("k", text, entry_id, is_common, headwords[entry_id])
+    for entry_id, text, _ in dictionary_rows.reading:
+        index.add("r", text, entry_id, 0, headwords[entry_id])
+    single = [
+        item for item in vocab[:800]
+        if _forms(item["word"]) == [item["word"]] and _forms(item["furigana"]) in ([], [item["furigana"]])
+    ]
+    assert len(single) > 500
+    for item in single:
+        kanji, readings = word_forms(item)
+        entry_id = index.resolve(kanji, readings)
+        assert entry_id is not None, item["word"]
+        assert set(_forms(headwords[entry_id])) & set(kanji or readings), item["word"]
+
+
+def test_unique_ids_keeps_request_order():
+    assert _unique_ids(["3", " 1 ", "3", "", "2", 1]) == ["3", "1", "2"]
+
+
+def test_classify_bulk():
+    rows = [("1", None), ("2", 77)]
+    assert _classify_bulk(["1", "2", "9"], rows) == (["1"], [{"entry_id": "2", "id": 77}], ["9"])
+
+
+def test_split_inserted_moves_concurrent_inserts_to_duplicates():
+    rows = [(10, "a"), (5, "b"), (11, "c")]
+    assert _split_inserted(["a", "b", "c"], [(10, "a"), (11, "b"), (12, "c")], 3, 10)[1] == []
+    assert _split_inserted(["a", "b", "c"], rows, 2, 10) == ([(10, "a"), (11, "c")], [{"entry_id": "b", "id": 5}])
+    assert _split_inserted(["a", "b"], [(6, "a"), (5, "b")], 0, 0) == (
+        [], [{"entry_id": "a", "id": 6}, {"entry_id": "b", "id": 5}],
+    )
+
+
+def test_split_inserted_reports_every_skipped_id():
+    # "b" was skipped by the INSERT IGNORE but its card is gone from the read.
+    assert _split_inserted(["a", "b", "c"], [(10, "a"), (11, "c")], 2, 10) == (
+        [(10, "a"), (11, "c")], [{"entry_id": "b", "id": None}],
+    )
+    # A card another request added after this statement has an id above its block.
+    assert _split_inserted(["a", "b"], [(20, "a"), (23, "b")], 1, 20) == (
+        [(20, "a")], [{"entry_id": "b", "id": 23}],
+    )
+
+
+def test_added_cards_are_read_with_a_locking_read():
+    # A plain SELECT in REPEATABLE READ would not see cards committed after the lookup.
+    sql, params = _bulk_added_query(3, ["a", "b"])
+    assert sql.split()[-2:] == ["FOR", "SHARE"]
+    assert params == (3, "a", "b")
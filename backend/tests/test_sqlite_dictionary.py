@@ -0,0 +1,89 @@
+# backend/tests/test_sqlite_dictionary.py
+import json
+
+import pytest
+
+import import_task
+import services.search as search
+import services.sqlite_dictionary as sqlite_dictionary
+import services.suggest as suggest
+from services.bm25 import BM25Index
+from services.dictionary_index import _TOKEN_RE
+from services.sqlite_dictionary import SqliteDictionary
+from services.suggest import KIND_GLOSS, KIND_KANJI, KIND_READING, MIN_GLOSS_WORD_LENGTH, SuggestIndex
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory, jmdict_path):
+    path = str(tmp_path_factory.mktemp("sqlite") / "jmdict.sqlite3")
+    import_task.run_sqlite_export(jmdict_path, path, batch_size=500)
+    return SqliteDictionary(path)
+
+
+def test_same_ranking_as_dictionary_index(store, dictionary_index, query_keywords):
+    for keyword in query_keywords:
+        expected = [dictionary_index.entry_ids[n] for n in dictionary_index.rank(keyword, 20)]
+        assert store.rank(keyword, 20) == expected, keyword
+
+
+def test_search_returns_word_data(store, dictionary_index):
+    assert store.search("water", 5) == dictionary_index.search("water", 5)
+
+
+def test_words_for_ids(store, dictionary_index):
+    ids = [dictionary_index.entry_ids[n] for n in (5, 1, 3)]
+    words = store.words_for_ids(ids + ["no-such-entry"])
+    assert [word["id"] for word in words] == ids
+    assert words[0] == dictionary_index.word(5)
+
+
+def test_prefix_and_contains_match_dictionary_index(store, dictionary_index):
+    for text in ["食べ物を", "日本", "たべる", "xyz"]:
+        expected = [(length, dictionary_index.entry_ids[n]) for length, n in dictionary_index.prefix_entries(text)]
+        assert store.prefix_entries(text) == expected
+    for text in ["食", "日本", "生"]:
+        assert store.contains_chars(text) == [dictionary_index.word(n) for n in dictionary_index.contains_chars(text)]
+
+
+def test_suggest_terms_same_as_mysql_build(store, dictionary_rows):
+    batch = dictionary_rows
+    common = {entry_id for entry_id, _, is_common in batch.kanji if is_common}
+    # What SuggestIndex.from_mysql reads from the entry tables.
+    items = [(text, KIND_KANJI, entry_id in common) for entry_id, text, _ in batch.kanji]
+    items += [(text, KIND_READING, entry_id in common) for entry_id, text, _ in batch.reading]
+    for entry_id, gloss in batch.defs:
+        for word in set(_TOKEN_RE.findall(gloss.lower())):
+            if len(word) >= MIN_GLOSS_WORD_LENGTH:
+                items.append((word, KIND_GLOSS, entry_id in common))
+    expected = SuggestIndex.build(items)
+    built = SuggestIndex.from_sqlite(store)
+    assert built.terms == expected.terms
+    assert built.kinds == expected.kinds
+    assert built.common == expected.common
+    assert built.top == expected.top
+    for prefix in ["ta", "eat", "食", "た", "wat"]:
+        assert built.suggest(prefix) == expected.suggest(prefix)
+
+
+def test_bm25_same_as_mysql_build(store, dictionary_rows):
+    batch = dictionary_rows
+    common = {entry_id for entry_id, _, is_common in batch.kanji if is_common}
+    words = {entry_id: json.loads(word_data) for entry_id, _, _, word_data, _ in batch.entries}
+    expected = BM25Index.build(
+        (entry_id, [sense.get("glosses") or [] for sense in words[entry_id].get("senses") or []], entry_id in common)
+        for entry_id in sorted(words)
+    )
+    built = BM25Index.from_sqlite(store)
+    assert built.entry_ids == expected.entry_ids
+    assert built.terms == expected.terms
+    assert list(built.postings) == list(expected.postings)
+    assert list(built.tfs) == list(expected.tfs)
+    assert built.is_common == expected.is_common
+
+
+def test_sqlite_engine_builds_suggestions_from_the_file(store, monkeypatch):
+    monkeypatch.setattr(search, "SEARCH_ENGINE", "sqlite")
+    monkeypatch.setattr(sqlite_dictionary, "_sqlite_dictionary", store)
+    monkeypatch.setattr(suggest, "_suggest_index", None)
+    monkeypatch.setattr(SuggestIndex, "from_mysql", classmethod(lambda cls: pytest.fail("read MySQL")))
+    assert suggest.suggest("wat")